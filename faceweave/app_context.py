@@ -1,16 +1,52 @@
-import os
-import sys
+import inspect
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterator
 
 from faceweave.typing import AppContext
 
+APP_CONTEXT : ContextVar[AppContext] = ContextVar('app_context', default = 'cli')
+
 
 def detect_app_context() -> AppContext:
-	frame = sys._getframe(1)
-
-	while frame:
-		if os.path.join('faceweave', 'jobs') in frame.f_code.co_filename:
-			return 'cli'
-		if os.path.join('faceweave', 'uis') in frame.f_code.co_filename:
-			return 'ui'
-		frame = frame.f_back
-	return 'cli'
+	return APP_CONTEXT.get()
+
+
+@contextmanager
+def use_app_context(app_context : AppContext) -> Iterator[None]:
+	token = APP_CONTEXT.set(app_context)
+
+	try:
+		yield
+	finally:
+		APP_CONTEXT.reset(token)
+
+
+def scope_app_context(app_context : AppContext) -> Callable[[Callable[..., Any]], Any]:
+	def decorator(function : Callable[..., Any]) -> Any:
+		if inspect.isgeneratorfunction(function):
+			@wraps(function)
+			def generator_wrapper(*args : Any, **kwargs : Any) -> Iterator[Any]:
+				yield from iterate_app_context(app_context, function(*args, **kwargs))
+
+			return generator_wrapper
+
+		@wraps(function)
+		def wrapper(*args : Any, **kwargs : Any) -> Any:
+			with use_app_context(app_context):
+				return function(*args, **kwargs)
+
+		return wrapper
+
+	return decorator
+
+
+def iterate_app_context(app_context : AppContext, iterator : Iterator[Any]) -> Iterator[Any]:
+	while True:
+		with use_app_context(app_context):
+			try:
+				value = next(iterator)
+			except StopIteration:
+				return
+		yield value
@@ -47,6 +47,9 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	# face landmarker
 	apply_state_item('face_landmarker_model', args.get('face_landmarker_model'))
 	apply_state_item('face_landmarker_score', args.get('face_landmarker_score'))
+	# face tracker
+	apply_state_item('face_tracker_interval', args.get('face_tracker_interval'))
+	apply_state_item('face_tracker_verify_interval', args.get('face_tracker_verify_interval'))
 	# face selector
 	state_manager.init_item('face_selector_mode', args.get('face_selector_mode'))
 	state_manager.init_item('face_selector_order', args.get('face_selector_order'))
@@ -62,11 +65,14 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('face_mask_blur', args.get('face_mask_blur'))
 	apply_state_item('face_mask_padding', normalize_padding(args.get('face_mask_padding')))
 	apply_state_item('face_mask_regions', args.get('face_mask_regions'))
+	apply_state_item('face_mask_interval', args.get('face_mask_interval'))
 	# frame extraction
 	apply_state_item('trim_frame_start', args.get('trim_frame_start'))
 	apply_state_item('trim_frame_end', args.get('trim_frame_end'))
 	apply_state_item('temp_frame_format', args.get('temp_frame_format'))
 	apply_state_item('keep_temp', args.get('keep_temp'))
+	apply_state_item('video_process_mode', args.get('video_process_mode'))
+	apply_state_item('duplicate_frame_threshold', args.get('duplicate_frame_threshold'))
 	# output creation
 	apply_state_item('output_image_quality', args.get('output_image_quality'))
 	if is_image(args.get('target_path')):
@@ -106,9 +112,15 @@ def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('execution_providers', args.get('execution_providers'))
 	apply_state_item('execution_thread_count', args.get('execution_thread_count'))
 	apply_state_item('execution_queue_count', args.get('execution_queue_count'))
+	apply_state_item('execution_batch_size', args.get('execution_batch_size'))
+	apply_state_item('execution_batch_timeout', args.get('execution_batch_timeout'))
+	apply_state_item('execution_concurrency_policy', args.get('execution_concurrency_policy'))
+	apply_state_item('execution_mode', args.get('execution_mode'))
 	# memory
 	apply_state_item('video_memory_strategy', args.get('video_memory_strategy'))
 	apply_state_item('system_memory_limit', args.get('system_memory_limit'))
+	apply_state_item('cache_memory_limit', args.get('cache_memory_limit'))
+	apply_state_item('crop_cache_tolerance', args.get('crop_cache_tolerance'))
 	# misc
 	apply_state_item('skip_download', args.get('skip_download'))
 	apply_state_item('log_level', args.get('log_level'))
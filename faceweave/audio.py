@@ -1,17 +1,17 @@
-from functools import lru_cache
 from typing import Any, List, Optional
 
 import numpy
 import scipy
 from numpy._typing import NDArray
 
+from faceweave.cache_manager import estimate_size, static_cache
 from faceweave.ffmpeg import read_audio_buffer
 from faceweave.filesystem import is_audio
 from faceweave.typing import Audio, AudioFrame, Fps, Mel, MelFilterBank, Spectrogram
 from faceweave.voice_extractor import batch_extract_voice
 
 
-@lru_cache(maxsize = 128)
+@static_cache('static_audio', estimate_size)
 def read_static_audio(audio_path : str, fps : Fps) -> Optional[List[AudioFrame]]:
 	return read_audio(audio_path, fps)
 
@@ -30,7 +30,7 @@ def read_audio(audio_path : str, fps : Fps) -> Optional[List[AudioFrame]]:
 	return None
 
 
-@lru_cache(maxsize = 128)
+@static_cache('static_voice', estimate_size)
 def read_static_voice(audio_path : str, fps : Fps) -> Optional[List[AudioFrame]]:
 	return read_voice(audio_path, fps)
 
@@ -0,0 +1,143 @@
+import sys
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy
+
+from faceweave import state_manager
+from faceweave.typing import CacheEntry, CacheKey, CacheSet, CacheStatistics, SizeEstimator
+
+CACHE_ENTRIES : OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+CACHE_SET : CacheSet = {}
+CACHE_LOCK : threading.Lock = threading.Lock()
+
+
+def register_cache(cache_name : str, size_estimator : SizeEstimator) -> None:
+	with CACHE_LOCK:
+		if cache_name not in CACHE_SET:
+			CACHE_SET[cache_name] =\
+			{
+				'size_estimator': size_estimator,
+				'size': 0,
+				'hits': 0,
+				'misses': 0,
+				'evictions': 0
+			}
+
+
+def get_cache_item(cache_name : str, cache_key : Hashable) -> Tuple[bool, Any]:
+	with CACHE_LOCK:
+		cache_entry = CACHE_ENTRIES.get((cache_name, cache_key))
+
+		if cache_entry:
+			CACHE_ENTRIES.move_to_end((cache_name, cache_key))
+			CACHE_SET[cache_name]['hits'] += 1
+			return True, cache_entry.get('value')
+		CACHE_SET[cache_name]['misses'] += 1
+	return False, None
+
+
+def set_cache_item(cache_name : str, cache_key : Hashable, value : Any) -> None:
+	cache_size = CACHE_SET[cache_name]['size_estimator'](value)
+
+	with CACHE_LOCK:
+		remove_cache_entry(cache_name, cache_key)
+		CACHE_ENTRIES[(cache_name, cache_key)] =\
+		{
+			'value': value,
+			'size': cache_size
+		}
+		CACHE_SET[cache_name]['size'] += cache_size
+		evict_cache_entries()
+
+
+def remove_cache_item(cache_name : str, cache_key : Hashable) -> None:
+	with CACHE_LOCK:
+		remove_cache_entry(cache_name, cache_key)
+
+
+def get_cache_items(cache_name : str) -> Dict[Hashable, Any]:
+	with CACHE_LOCK:
+		return { cache_key: cache_entry.get('value') for (entry_name, cache_key), cache_entry in CACHE_ENTRIES.items() if entry_name == cache_name }
+
+
+def clear_cache(cache_name : str) -> None:
+	with CACHE_LOCK:
+		for entry_name, cache_key in list(CACHE_ENTRIES.keys()):
+			if entry_name == cache_name:
+				remove_cache_entry(entry_name, cache_key)
+
+
+def remove_cache_entry(cache_name : str, cache_key : Hashable) -> None:
+	cache_entry = CACHE_ENTRIES.pop((cache_name, cache_key), None)
+
+	if cache_entry:
+		CACHE_SET[cache_name]['size'] -= cache_entry.get('size')
+
+
+def evict_cache_entries() -> None:
+	cache_memory_limit = get_cache_memory_limit()
+
+	if cache_memory_limit:
+		while len(CACHE_ENTRIES) > 1 and calc_cache_size() > cache_memory_limit:
+			(cache_name, cache_key), _ = next(iter(CACHE_ENTRIES.items()))
+			remove_cache_entry(cache_name, cache_key)
+			CACHE_SET[cache_name]['evictions'] += 1
+
+
+def get_cache_memory_limit() -> Optional[int]:
+	cache_memory_limit = state_manager.get_item('cache_memory_limit')
+
+	if cache_memory_limit:
+		return cache_memory_limit * 1024 ** 3
+	return None
+
+
+def calc_cache_size() -> int:
+	return sum(cache.get('size') for cache in CACHE_SET.values())
+
+
+def get_cache_statistics() -> Dict[str, CacheStatistics]:
+	cache_statistics : Dict[str, CacheStatistics] = {}
+
+	with CACHE_LOCK:
+		for cache_name, cache in CACHE_SET.items():
+			cache_statistics[cache_name] =\
+			{
+				'size': cache.get('size'),
+				'hits': cache.get('hits'),
+				'misses': cache.get('misses'),
+				'evictions': cache.get('evictions')
+			}
+	return cache_statistics
+
+
+def estimate_size(value : Any) -> int:
+	if isinstance(value, numpy.ndarray):
+		return value.nbytes
+	if isinstance(value, (list, tuple)):
+		return sys.getsizeof(value) + sum(estimate_size(item) for item in value)
+	if isinstance(value, dict):
+		return sys.getsizeof(value) + sum(estimate_size(item) for item in value.values())
+	return sys.getsizeof(value)
+
+
+def static_cache(cache_name : str, size_estimator : SizeEstimator) -> Callable[[Callable[..., Any]], Any]:
+	register_cache(cache_name, size_estimator)
+
+	def decorator(function : Callable[..., Any]) -> Any:
+		@wraps(function)
+		def wrapper(*args : Any) -> Any:
+			has_value, value = get_cache_item(cache_name, args)
+
+			if not has_value:
+				value = function(*args)
+				set_cache_item(cache_name, args, value)
+			return value
+
+		wrapper.cache_clear = lambda: clear_cache(cache_name) #type:ignore[attr-defined]
+		return wrapper
+
+	return decorator
@@ -1,10 +1,9 @@
-from functools import lru_cache
-
 import cv2
 import numpy
 from tqdm import tqdm
 
 from faceweave import inference_manager, state_manager, wording
+from faceweave.cache_manager import estimate_size, static_cache
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.filesystem import resolve_relative_path
 from faceweave.thread_helper import conditional_thread_semaphore
@@ -91,13 +90,13 @@ def prepare_frame(vision_frame : VisionFrame) -> VisionFrame:
         return vision_frame
 
 
-@lru_cache(maxsize = None)
+@static_cache('analyse_image', estimate_size)
 def analyse_image(image_path : str) -> bool:
         frame = read_image(image_path)
         return analyse_frame(frame)
 
 
-@lru_cache(maxsize = None)
+@static_cache('analyse_video', estimate_size)
 def analyse_video(video_path : str, start_frame : int, end_frame : int) -> bool:
         video_frame_total = count_video_frame_total(video_path)
         video_fps = detect_video_fps(video_path)
@@ -1,31 +1,36 @@
 import shutil
 import signal
 import sys
+from functools import partial
 from time import time
 
 import numpy
 
 from faceweave import content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, process_manager, state_manager, voice_extractor, wording
+from faceweave.app_context import use_app_context
 from faceweave.args import apply_args, collect_job_args, reduce_step_args
 from faceweave.common_helper import get_first
 from faceweave.content_analyser import analyse_image, analyse_video
+from faceweave.crop_cache import reset_crop_cache_statistics
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.exit_helper import conditional_exit, graceful_exit, hard_exit
-from faceweave.face_analyser import get_average_face, get_many_faces, get_one_face
+from faceweave.face_analyser import get_average_face, get_many_faces, get_one_face, release_frame_faces
 from faceweave.face_selector import sort_and_filter_faces
-from faceweave.face_store import append_reference_face, clear_reference_faces, get_reference_faces
+from faceweave.face_store import append_reference_face, clear_reference_faces, clear_static_faces, get_reference_faces
 from faceweave.ffmpeg import copy_image, extract_frames, finalize_image, merge_video, replace_audio, restore_audio
 from faceweave.filesystem import filter_audio_paths, is_image, is_video, list_directory, resolve_relative_path
+from faceweave.frame_deduplicator import clear_frame_groups, group_duplicate_frames, reuse_duplicate_frames
 from faceweave.jobs import job_helper, job_manager, job_runner
 from faceweave.jobs.job_list import compose_job_list
 from faceweave.memory import limit_system_memory
-from faceweave.processors.core import get_processors_modules
+from faceweave.processors.core import get_processors_modules, is_geometry_preserving, multi_process_frames, multi_process_stream, process_chain_frames
+from faceweave.processors.process_pool import clear_process_pools
 from faceweave.program import create_program
 from faceweave.program_helper import validate_args
 from faceweave.statistics import conditional_log_statistics
 from faceweave.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, get_temp_frame_paths, move_temp_file
-from faceweave.typing import Args, ErrorCode
-from faceweave.vision import get_video_frame, pack_resolution, read_image, read_static_images, restrict_image_resolution, restrict_video_fps, restrict_video_resolution, unpack_resolution
+from faceweave.typing import Args, ErrorCode, Fps
+from faceweave.vision import get_video_frame, pack_resolution, read_image, read_static_image, read_static_images, restrict_image_resolution, restrict_video_fps, restrict_video_resolution, unpack_resolution
 
 
 def cli() -> None:
@@ -62,9 +67,10 @@ def route(args : Args) -> None:
 
 		if not common_pre_check() or not processors_pre_check():
 			return conditional_exit(2)
-		for ui_layout in ui.get_ui_layouts_modules(state_manager.get_item('ui_layouts')):
-			if not ui_layout.pre_check():
-				return conditional_exit(2)
+		with use_app_context('ui'):
+			for ui_layout in ui.get_ui_layouts_modules(state_manager.get_item('ui_layouts')):
+				if not ui_layout.pre_check():
+					return conditional_exit(2)
 		ui.launch()
 	if state_manager.get_item('command') == 'headless-run':
 		if not job_manager.init_jobs(state_manager.get_item('jobs_path')):
@@ -115,14 +121,20 @@ def processors_pre_check() -> bool:
 
 def conditional_process() -> ErrorCode:
 	start_time = time()
+	clear_static_faces()
+	clear_frame_groups()
+	reset_crop_cache_statistics()
 	for processor_module in get_processors_modules(state_manager.get_item('processors')):
 		if not processor_module.pre_process('output'):
 			return 2
 	conditional_append_reference_faces()
-	if is_image(state_manager.get_item('target_path')):
-		return process_image(start_time)
-	if is_video(state_manager.get_item('target_path')):
-		return process_video(start_time)
+	try:
+		if is_image(state_manager.get_item('target_path')):
+			return process_image(start_time)
+		if is_video(state_manager.get_item('target_path')):
+			return process_video(start_time)
+	finally:
+		clear_process_pools()
 	return 0
 
 
@@ -141,7 +153,7 @@ def conditional_append_reference_faces() -> None:
 
 		if source_face and reference_face:
 			for processor_module in get_processors_modules(state_manager.get_item('processors')):
-				abstract_reference_frame = processor_module.get_reference_frame(source_face, reference_face, reference_frame)
+				abstract_reference_frame = processor_module.get_reference_frame(source_face, reference_face, reference_frame.copy())
 				if numpy.any(abstract_reference_frame):
 					abstract_reference_faces = sort_and_filter_faces(get_many_faces([ abstract_reference_frame ]))
 					abstract_reference_face = get_one_face(abstract_reference_faces, state_manager.get_item('reference_face_position'))
@@ -326,6 +338,9 @@ def process_image(start_time : float) -> ErrorCode:
 		logger.info(wording.get('processing'), processor_module.__name__)
 		processor_module.process_image(state_manager.get_item('source_paths'), temp_file_path, temp_file_path)
 		processor_module.post_process()
+		if not is_geometry_preserving(processor_module):
+			clear_static_faces()
+	release_frame_faces(read_static_image(temp_file_path), 0)
 	if is_process_stopping():
 		process_manager.end()
 		return 4
@@ -360,44 +375,15 @@ def process_video(start_time : float) -> ErrorCode:
 	# create temp
 	logger.debug(wording.get('creating_temp'), __name__)
 	create_temp_directory(state_manager.get_item('target_path'))
-	# extract frames
 	process_manager.start()
 	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
 	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
-	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
-	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps):
-		logger.debug(wording.get('extracting_frames_succeed'), __name__)
-	else:
-		if is_process_stopping():
-			process_manager.end()
-			return 4
-		logger.error(wording.get('extracting_frames_failed'), __name__)
-		process_manager.end()
-		return 1
-	# process frames
-	temp_frame_paths = get_temp_frame_paths(state_manager.get_item('target_path'))
-	if temp_frame_paths:
-		for processor_module in get_processors_modules(state_manager.get_item('processors')):
-			logger.info(wording.get('processing'), processor_module.__name__)
-			processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
-			processor_module.post_process()
-		if is_process_stopping():
-			return 4
-	else:
-		logger.error(wording.get('temp_frames_not_found'), __name__)
-		process_manager.end()
-		return 1
-	# merge video
-	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
-	if merge_video(state_manager.get_item('target_path'), state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps')):
-		logger.debug(wording.get('merging_video_succeed'), __name__)
+	if state_manager.get_item('video_process_mode') == 'stream':
+		error_code = stream_video(temp_video_resolution, temp_video_fps)
 	else:
-		if is_process_stopping():
-			process_manager.end()
-			return 4
-		logger.error(wording.get('merging_video_failed'), __name__)
-		process_manager.end()
-		return 1
+		error_code = extract_process_merge_video(temp_video_resolution, temp_video_fps)
+	if error_code:
+		return error_code
 	# handle audio
 	if state_manager.get_item('skip_audio'):
 		logger.info(wording.get('skipping_audio'), __name__)
@@ -438,6 +424,73 @@ def process_video(start_time : float) -> ErrorCode:
 	return 0
 
 
+def extract_process_merge_video(temp_video_resolution : str, temp_video_fps : Fps) -> ErrorCode:
+	# extract frames
+	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps):
+		logger.debug(wording.get('extracting_frames_succeed'), __name__)
+	else:
+		if is_process_stopping():
+			process_manager.end()
+			return 4
+		logger.error(wording.get('extracting_frames_failed'), __name__)
+		process_manager.end()
+		return 1
+	# process frames
+	temp_frame_paths = get_temp_frame_paths(state_manager.get_item('target_path'))
+	if temp_frame_paths:
+		group_duplicate_frames(temp_frame_paths)
+		if state_manager.get_item('video_process_mode') == 'fused':
+			processor_modules = get_processors_modules(state_manager.get_item('processors'))
+			logger.info(wording.get('processing'), __name__)
+			multi_process_frames(state_manager.get_item('source_paths'), temp_frame_paths, partial(process_chain_frames, state_manager.get_item('processors')))
+			for processor_module in processor_modules:
+				processor_module.post_process()
+		else:
+			for processor_module in get_processors_modules(state_manager.get_item('processors')):
+				logger.info(wording.get('processing'), processor_module.__name__)
+				processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
+				processor_module.post_process()
+				if not is_geometry_preserving(processor_module):
+					clear_static_faces()
+		if is_process_stopping():
+			return 4
+		reuse_duplicate_frames()
+	else:
+		logger.error(wording.get('temp_frames_not_found'), __name__)
+		process_manager.end()
+		return 1
+	# merge video
+	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
+	if merge_video(state_manager.get_item('target_path'), state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps')):
+		logger.debug(wording.get('merging_video_succeed'), __name__)
+	else:
+		if is_process_stopping():
+			process_manager.end()
+			return 4
+		logger.error(wording.get('merging_video_failed'), __name__)
+		process_manager.end()
+		return 1
+	return 0
+
+
+def stream_video(temp_video_resolution : str, temp_video_fps : Fps) -> ErrorCode:
+	# stream video
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	logger.info(wording.get('streaming_video').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+	if multi_process_stream(state_manager.get_item('source_paths'), state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), processor_modules):
+		logger.debug(wording.get('streaming_video_succeed'), __name__)
+	else:
+		if is_process_stopping():
+			return 4
+		logger.error(wording.get('streaming_video_failed'), __name__)
+		process_manager.end()
+		return 1
+	for processor_module in processor_modules:
+		processor_module.post_process()
+	return 0
+
+
 def is_process_stopping() -> bool:
 	if process_manager.is_stopping():
 		process_manager.end()
@@ -0,0 +1,64 @@
+import threading
+from typing import Any, Hashable, List, Optional
+
+import cv2
+import numpy
+
+from faceweave import state_manager
+from faceweave.cache_manager import estimate_size, get_cache_item, register_cache, set_cache_item
+from faceweave.typing import CropCacheStatistics, FaceLandmark5, VisionFrame
+
+CROP_CACHE_STATISTICS : CropCacheStatistics =\
+{
+	'hits': 0,
+	'misses': 0
+}
+CROP_CACHE_LOCK : threading.Lock = threading.Lock()
+CROP_LANDMARK_STEP : int = 4
+register_cache('crop_outputs', estimate_size)
+
+
+def create_crop_key(crop_scope : List[Any], face_landmark_5 : FaceLandmark5) -> Optional[Hashable]:
+	crop_cache_tolerance = state_manager.get_item('crop_cache_tolerance')
+
+	if isinstance(crop_cache_tolerance, int):
+		face_landmark_key = numpy.round(face_landmark_5 / CROP_LANDMARK_STEP).astype(numpy.int32).tobytes()
+		return tuple(crop_scope) + (face_landmark_key,)
+	return None
+
+
+def create_crop_fingerprint(crop_vision_frame : VisionFrame) -> VisionFrame:
+	crop_vision_frame = cv2.cvtColor(crop_vision_frame, cv2.COLOR_BGR2GRAY)
+	return cv2.resize(crop_vision_frame, (32, 32), interpolation = cv2.INTER_AREA).astype(numpy.int16)
+
+
+def get_crop_output(crop_key : Optional[Hashable], crop_vision_frame : VisionFrame) -> Optional[VisionFrame]:
+	if crop_key:
+		_, crop_output = get_cache_item('crop_outputs', crop_key)
+
+		if crop_output and numpy.max(numpy.abs(crop_output[0] - create_crop_fingerprint(crop_vision_frame))) <= state_manager.get_item('crop_cache_tolerance'):
+			with CROP_CACHE_LOCK:
+				CROP_CACHE_STATISTICS['hits'] += 1
+			return crop_output[1]
+		with CROP_CACHE_LOCK:
+			CROP_CACHE_STATISTICS['misses'] += 1
+	return None
+
+
+def set_crop_output(crop_key : Optional[Hashable], crop_vision_frame : VisionFrame, crop_output_frame : VisionFrame) -> None:
+	if crop_key:
+		set_cache_item('crop_outputs', crop_key, (create_crop_fingerprint(crop_vision_frame), numpy.round(crop_output_frame).clip(0, 255).astype(numpy.uint8)))
+
+
+def get_crop_cache_hit_rate() -> float:
+	crop_cache_total = CROP_CACHE_STATISTICS.get('hits') + CROP_CACHE_STATISTICS.get('misses')
+
+	if crop_cache_total:
+		return round(CROP_CACHE_STATISTICS.get('hits') / crop_cache_total, 2)
+	return 0.0
+
+
+def reset_crop_cache_statistics() -> None:
+	with CROP_CACHE_LOCK:
+		CROP_CACHE_STATISTICS['hits'] = 0
+		CROP_CACHE_STATISTICS['misses'] = 0
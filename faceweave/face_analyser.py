@@ -1,35 +1,193 @@
-from typing import List, Optional
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy
 
 from faceweave import state_manager
 from faceweave.common_helper import get_first
-from faceweave.face_classifier import classify_face
-from faceweave.face_detector import detect_faces, detect_rotated_faces
+from faceweave.face_classifier import classify_many_faces
+from faceweave.face_detector import detect_many_faces, detect_many_rotated_faces
 from faceweave.face_helper import apply_nms, convert_to_face_landmark_5, estimate_face_angle, get_nms_threshold
-from faceweave.face_landmarker import detect_face_landmarks, estimate_face_landmark_68_5
-from faceweave.face_recognizer import calc_embedding
-from faceweave.face_store import get_static_faces, set_static_faces
-from faceweave.typing import BoundingBox, Face, FaceLandmark5, FaceLandmarkSet, FaceScoreSet, Score, VisionFrame
+from faceweave.face_landmarker import detect_many_face_landmarks, estimate_many_face_landmarks_68_5
+from faceweave.face_recognizer import calc_many_embeddings
+from faceweave.face_store import get_static_faces, remove_static_faces, remove_track_identity, set_static_faces
+from faceweave.face_tracker import create_frame_thumbnail, has_untracked_change, is_keyframe, is_scene_cut, match_track_ids, track_bounding_box
+from faceweave.filesystem import is_image
+from faceweave.typing import Age, Angle, BoundingBox, Embedding, Face, FaceAnalysis, FaceAttribute, FaceLandmark5, FaceLandmark68, FaceLandmarkSet, FaceScoreSet, Gender, Race, Score, TrackId, VisionFrame
 
+FACE_ATTRIBUTES : List[FaceAttribute] = [ 'landmark', 'embedding', 'classification' ]
 
-def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5]) -> List[Face]:
-	faces = []
+
+class LazyFace(Face):
+	face_analysis : FaceAnalysis
+	face_index : int
+
+	def __new__(cls, face_analysis : FaceAnalysis, face_index : int) -> 'LazyFace':
+		lazy_face = super().__new__(cls, face_analysis.get('bounding_boxes')[face_index], *[ None ] * (len(Face._fields) - 1))
+		lazy_face.face_analysis = face_analysis
+		lazy_face.face_index = face_index
+		return lazy_face
+
+	def __iter__(self) -> Iterator[Any]:
+		return iter([ getattr(self, field) for field in Face._fields ])
+
+	def __reduce__(self) -> Tuple[Any, Tuple[Any, ...]]:
+		return Face, tuple(self)
+
+	def _asdict(self) -> Dict[str, Any]:
+		return dict(zip(Face._fields, self))
+
+	def _replace(self, **kwargs : Any) -> Face: #type:ignore[override]
+		return Face(**{ **self._asdict(), **kwargs })
+
+	@property
+	def score_set(self) -> FaceScoreSet:
+		return analyse_face_attribute(self.face_analysis, 'landmark', self.face_index)[1]
+
+	@property
+	def landmark_set(self) -> FaceLandmarkSet:
+		return analyse_face_attribute(self.face_analysis, 'landmark', self.face_index)[0]
+
+	@property
+	def angle(self) -> Angle:
+		return analyse_face_attribute(self.face_analysis, 'landmark', self.face_index)[2]
+
+	@property
+	def embedding(self) -> Embedding:
+		return analyse_face_attribute(self.face_analysis, 'embedding', self.face_index)[0]
+
+	@property
+	def normed_embedding(self) -> Embedding:
+		return analyse_face_attribute(self.face_analysis, 'embedding', self.face_index)[1]
+
+	@property
+	def gender(self) -> Gender:
+		return analyse_face_attribute(self.face_analysis, 'classification', self.face_index)[0]
+
+	@property
+	def age(self) -> Age:
+		return analyse_face_attribute(self.face_analysis, 'classification', self.face_index)[1]
+
+	@property
+	def race(self) -> Race:
+		return analyse_face_attribute(self.face_analysis, 'classification', self.face_index)[2]
+
+
+def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5], previous_faces : List[Face]) -> List[Face]:
 	nms_threshold = get_nms_threshold(state_manager.get_item('face_detector_model'), state_manager.get_item('face_detector_angles'))
 	keep_indices = apply_nms(bounding_boxes, face_scores, state_manager.get_item('face_detector_score'), nms_threshold)
+	bounding_boxes = [ bounding_boxes[index] for index in keep_indices ]
+	face_landmarks_5 = [ face_landmarks_5[index] for index in keep_indices ]
+	previous_faces = [ previous_face for previous_face in previous_faces if isinstance(previous_face, LazyFace) ]
+	previous_track_ids = [ get_face_track_id(previous_face) for previous_face in previous_faces ]
+	track_ids = match_track_ids(bounding_boxes, face_landmarks_5, [ previous_face.bounding_box for previous_face in previous_faces ], [ get_face_landmark_5(previous_face) for previous_face in previous_faces ], previous_track_ids)
+
+	for previous_track_id in set(previous_track_ids) - set(track_ids):
+		remove_track_identity(previous_track_id)
+	face_analysis = create_face_analysis(vision_frame, create_frame_thumbnail(vision_frame), bounding_boxes, [ face_scores[index] for index in keep_indices ], face_landmarks_5, track_ids)
+	return [ LazyFace(face_analysis, face_index) for face_index in range(len(bounding_boxes)) ]
+
+
+def track_faces(vision_frame : VisionFrame, previous_faces : List[Face]) -> Optional[List[Face]]:
+	previous_faces = [ previous_face for previous_face in previous_faces if isinstance(previous_face, LazyFace) ]
+
+	if not previous_faces:
+		return None
+	frame_thumbnail = create_frame_thumbnail(vision_frame)
+	previous_frame_thumbnail = get_first([ previous_face.face_analysis.get('frame_thumbnail') for previous_face in previous_faces if isinstance(previous_face, LazyFace) ])
+	frame_height, frame_width = vision_frame.shape[:2]
+
+	if is_scene_cut(frame_thumbnail, previous_frame_thumbnail) or has_untracked_change(frame_thumbnail, previous_frame_thumbnail, [ previous_face.bounding_box for previous_face in previous_faces ], (frame_width, frame_height)):
+		return None
+	many_face_landmarks_68 = detect_many_face_landmarks(vision_frame, [ previous_face.bounding_box for previous_face in previous_faces ], [ previous_face.angle for previous_face in previous_faces ])
+
+	if all(face_landmark_score_68 >= state_manager.get_item('face_landmarker_score') for _, face_landmark_score_68 in many_face_landmarks_68):
+		bounding_boxes = [ track_bounding_box(previous_face.bounding_box, previous_face.landmark_set.get('68'), face_landmark_68) for previous_face, (face_landmark_68, _) in zip(previous_faces, many_face_landmarks_68) ]
+		face_scores = [ get_face_detector_score(previous_face) for previous_face in previous_faces ]
+		face_landmarks_5 = [ convert_to_face_landmark_5(face_landmark_68) for face_landmark_68, _ in many_face_landmarks_68 ]
+		face_analysis = create_face_analysis(vision_frame, frame_thumbnail, bounding_boxes, face_scores, face_landmarks_5, [ get_face_track_id(previous_face) for previous_face in previous_faces ])
+		face_analysis['face_attributes']['landmark'] = dict(enumerate(create_face_landmarks(face_landmarks_5, estimate_many_face_landmarks_68_5(face_landmarks_5), face_scores, many_face_landmarks_68)))
+		return [ LazyFace(face_analysis, face_index) for face_index in range(len(bounding_boxes)) ]
+	return None
+
+
+def create_face_analysis(vision_frame : VisionFrame, frame_thumbnail : VisionFrame, bounding_boxes : List[BoundingBox], face_scores : List[Score], face_landmarks_5 : List[FaceLandmark5], track_ids : List[TrackId]) -> FaceAnalysis:
+	return\
+	{
+		'vision_frame': vision_frame,
+		'frame_thumbnail': frame_thumbnail,
+		'bounding_boxes': bounding_boxes,
+		'face_scores': face_scores,
+		'face_landmarks_5': face_landmarks_5,
+		'track_ids': track_ids,
+		'face_indices': list(range(len(bounding_boxes))),
+		'face_attributes': {},
+		'lock': threading.RLock()
+	}
+
+
+def plan_face_analysis(faces : List[Face]) -> None:
+	face_analyses = { id(face.face_analysis): face.face_analysis for face in faces if isinstance(face, LazyFace) }
+
+	for face_analysis in face_analyses.values():
+		with face_analysis.get('lock'):
+			face_analysis['face_indices'] = [ face.face_index for face in faces if isinstance(face, LazyFace) and face.face_analysis is face_analysis ]
+
+
+def release_frame_faces(vision_frame : VisionFrame, frame_number : Optional[int]) -> None:
+	if isinstance(frame_number, int):
+		remove_static_faces(vision_frame, frame_number - 1)
+
+		if is_image(state_manager.get_item('target_path')) or is_keyframe(frame_number + 1):
+			remove_static_faces(vision_frame, frame_number)
+
+
+def release_many_frame_faces(vision_frame : Optional[VisionFrame], frame_numbers : List[Optional[int]]) -> None:
+	if vision_frame is not None:
+		for frame_number in frame_numbers:
+			release_frame_faces(vision_frame, frame_number)
+
 
-	for index in keep_indices:
-		bounding_box = bounding_boxes[index]
-		face_score = face_scores[index]
-		face_landmark_5 = face_landmarks_5[index]
+def analyse_face_attribute(face_analysis : FaceAnalysis, face_attribute : FaceAttribute, face_index : int) -> Any:
+	with face_analysis.get('lock'):
+		face_results = face_analysis.get('face_attributes').setdefault(face_attribute, {})
+
+		if face_index not in face_results:
+			if face_index not in face_analysis.get('face_indices'):
+				face_analysis['face_indices'] = list(range(len(face_analysis.get('bounding_boxes'))))
+			face_indices = [ index for index in face_analysis.get('face_indices') if index not in face_results ]
+
+			if face_attribute == 'landmark':
+				face_results.update(zip(face_indices, analyse_face_landmarks(face_analysis, face_indices)))
+			if face_attribute == 'embedding':
+				face_results.update(zip(face_indices, calc_many_embeddings(face_analysis.get('vision_frame'), get_face_landmarks_5_68(face_analysis, face_indices))))
+			if face_attribute == 'classification':
+				face_results.update(zip(face_indices, classify_many_faces(face_analysis.get('vision_frame'), get_face_landmarks_5_68(face_analysis, face_indices))))
+			if all(len(face_analysis.get('face_attributes').get(attribute, {})) == len(face_analysis.get('bounding_boxes')) for attribute in FACE_ATTRIBUTES):
+				face_analysis['vision_frame'] = None
+		return face_results.get(face_index)
+
+
+def analyse_face_landmarks(face_analysis : FaceAnalysis, face_indices : List[int]) -> List[Tuple[FaceLandmarkSet, FaceScoreSet, Angle]]:
+	vision_frame = face_analysis.get('vision_frame')
+	bounding_boxes = [ face_analysis.get('bounding_boxes')[index] for index in face_indices ]
+	face_scores = [ face_analysis.get('face_scores')[index] for index in face_indices ]
+	face_landmarks_5 = [ face_analysis.get('face_landmarks_5')[index] for index in face_indices ]
+	face_landmarks_68_5 = estimate_many_face_landmarks_68_5(face_landmarks_5)
+	many_face_landmarks_68 = [ (face_landmark_68_5, 0.0) for face_landmark_68_5 in face_landmarks_68_5 ]
+
+	if bounding_boxes and state_manager.get_item('face_landmarker_score') > 0:
+		face_angles = [ estimate_face_angle(face_landmark_68_5) for face_landmark_68_5 in face_landmarks_68_5 ]
+		many_face_landmarks_68 = detect_many_face_landmarks(vision_frame, bounding_boxes, face_angles)
+	return create_face_landmarks(face_landmarks_5, face_landmarks_68_5, face_scores, many_face_landmarks_68)
+
+
+def create_face_landmarks(face_landmarks_5 : List[FaceLandmark5], face_landmarks_68_5 : List[FaceLandmark68], face_scores : List[Score], many_face_landmarks_68 : List[Tuple[FaceLandmark68, Score]]) -> List[Tuple[FaceLandmarkSet, FaceScoreSet, Angle]]:
+	face_landmarks = []
+
+	for face_landmark_5, face_landmark_68_5, face_score, (face_landmark_68, face_landmark_score_68) in zip(face_landmarks_5, face_landmarks_68_5, face_scores, many_face_landmarks_68):
 		face_landmark_5_68 = face_landmark_5
-		face_landmark_68_5 = estimate_face_landmark_68_5(face_landmark_5_68)
-		face_landmark_68 = face_landmark_68_5
-		face_landmark_score_68 = 0.0
-		face_angle = estimate_face_angle(face_landmark_68_5)
 
-		if state_manager.get_item('face_landmarker_score') > 0:
-			face_landmark_68, face_landmark_score_68 = detect_face_landmarks(vision_frame, bounding_box, face_angle)
 		if face_landmark_score_68 > state_manager.get_item('face_landmarker_score'):
 			face_landmark_5_68 = convert_to_face_landmark_5(face_landmark_68)
 
@@ -45,25 +203,36 @@ def create_faces(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox],
 			'detector': face_score,
 			'landmarker': face_landmark_score_68
 		}
-		embedding, normed_embedding = calc_embedding(vision_frame, face_landmark_set.get('5/68'))
-		gender, age, race = classify_face(vision_frame, face_landmark_set.get('5/68'))
-		faces.append(Face(
-			bounding_box = bounding_box,
-			score_set = face_score_set,
-			landmark_set = face_landmark_set,
-			angle = face_angle,
-			embedding = embedding,
-			normed_embedding = normed_embedding,
-			gender = gender,
-			age = age,
-			race = race
-		))
-	return faces
+		face_landmarks.append((face_landmark_set, face_score_set, estimate_face_angle(face_landmark_68_5)))
+	return face_landmarks
+
+
+def get_face_landmarks_5_68(face_analysis : FaceAnalysis, face_indices : List[int]) -> List[FaceLandmark5]:
+	return [ analyse_face_attribute(face_analysis, 'landmark', index)[0].get('5/68') for index in face_indices ]
+
+
+def get_face_track_id(face : Face) -> Optional[TrackId]:
+	if isinstance(face, LazyFace):
+		return face.face_analysis.get('track_ids')[face.face_index]
+	return None
+
+
+def get_face_landmark_5(face : Face) -> FaceLandmark5:
+	if isinstance(face, LazyFace):
+		return face.face_analysis.get('face_landmarks_5')[face.face_index]
+	return face.landmark_set.get('5')
+
+
+def get_face_detector_score(face : Face) -> Score:
+	if isinstance(face, LazyFace):
+		return face.face_analysis.get('face_scores')[face.face_index]
+	return face.score_set.get('detector')
 
 
 def get_one_face(faces : List[Face], position : int = 0) -> Optional[Face]:
 	if faces:
 		position = min(position, len(faces) - 1)
+		plan_face_analysis([ faces[position] ])
 		return faces[position]
 	return None
 
@@ -93,32 +262,71 @@ def get_average_face(faces : List[Face]) -> Optional[Face]:
 	return None
 
 
-def get_many_faces(vision_frames : List[VisionFrame]) -> List[Face]:
+def get_many_faces(vision_frames : List[VisionFrame], frame_number : Optional[int] = None) -> List[Face]:
 	many_faces : List[Face] = []
 
-	for vision_frame in vision_frames:
+	for faces in get_many_frame_faces(vision_frames, [ frame_number ] * len(vision_frames)):
+		many_faces.extend(faces)
+	return many_faces
+
+
+def get_many_frame_faces(vision_frames : List[VisionFrame], frame_numbers : List[Optional[int]]) -> List[List[Face]]:
+	many_frame_faces : List[List[Face]] = [ [] for _ in vision_frames ]
+	detect_indices = []
+	track_indices = []
+
+	for index, (vision_frame, frame_number) in enumerate(zip(vision_frames, frame_numbers)):
 		if numpy.any(vision_frame):
-			static_faces = get_static_faces(vision_frame)
-			if static_faces:
-				many_faces.extend(static_faces)
+			static_faces = get_static_faces(vision_frame, frame_number)
+			if static_faces is not None:
+				many_frame_faces[index] = static_faces
+			elif is_keyframe(frame_number) or state_manager.get_item('face_landmarker_score') <= 0 or frame_number - 1 not in frame_numbers[:index] and get_static_faces(vision_frame, frame_number - 1) is None:
+				detect_indices.append(index)
 			else:
-				all_bounding_boxes = []
-				all_face_scores = []
-				all_face_landmarks_5 = []
-
-				for face_detector_angle in state_manager.get_item('face_detector_angles'):
-					if face_detector_angle == 0:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_faces(vision_frame)
-					else:
-						bounding_boxes, face_scores, face_landmarks_5 = detect_rotated_faces(vision_frame, face_detector_angle)
-					all_bounding_boxes.extend(bounding_boxes)
-					all_face_scores.extend(face_scores)
-					all_face_landmarks_5.extend(face_landmarks_5)
-
-				if all_bounding_boxes and all_face_scores and all_face_landmarks_5 and state_manager.get_item('face_detector_score') > 0:
-					faces = create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5)
-
-					if faces:
-						many_faces.extend(faces)
-						set_static_faces(vision_frame, faces)
-	return many_faces
+				track_indices.append(index)
+
+	many_detections : Dict[int, Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]] = {}
+
+	if detect_indices:
+		many_detections = dict(zip(detect_indices, detect_many_frame_faces([ vision_frames[index] for index in detect_indices ])))
+
+	for index in sorted(detect_indices + track_indices):
+		faces = None
+
+		if index in track_indices:
+			faces = track_faces(vision_frames[index], get_previous_faces(vision_frames[index], frame_numbers[index]))
+		if faces is None:
+			analysis_vision_frame = vision_frames[index] if isinstance(frame_numbers[index], int) else vision_frames[index].copy()
+			faces = create_frame_faces(analysis_vision_frame, get_previous_faces(vision_frames[index], frame_numbers[index]), many_detections.get(index) or get_first(detect_many_frame_faces([ vision_frames[index] ])))
+		many_frame_faces[index] = faces
+		set_static_faces(vision_frames[index], faces, frame_numbers[index])
+	return many_frame_faces
+
+
+def detect_many_frame_faces(vision_frames : List[VisionFrame]) -> List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]]:
+	many_detections : List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]] = [ ([], [], []) for _ in vision_frames ]
+
+	for face_detector_angle in state_manager.get_item('face_detector_angles'):
+		if face_detector_angle == 0:
+			angle_detections = detect_many_faces(vision_frames)
+		else:
+			angle_detections = detect_many_rotated_faces(vision_frames, face_detector_angle)
+		for many_detection, (bounding_boxes, face_scores, face_landmarks_5) in zip(many_detections, angle_detections):
+			many_detection[0].extend(bounding_boxes)
+			many_detection[1].extend(face_scores)
+			many_detection[2].extend(face_landmarks_5)
+	return many_detections
+
+
+def create_frame_faces(vision_frame : VisionFrame, previous_faces : List[Face], many_detection : Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]) -> List[Face]:
+	all_bounding_boxes, all_face_scores, all_face_landmarks_5 = many_detection
+
+	if all_bounding_boxes and all_face_scores and all_face_landmarks_5 and state_manager.get_item('face_detector_score') > 0:
+		return create_faces(vision_frame, all_bounding_boxes, all_face_scores, all_face_landmarks_5, previous_faces)
+	return []
+
+
+def get_previous_faces(vision_frame : VisionFrame, frame_number : Optional[int]) -> List[Face]:
+	if isinstance(frame_number, int):
+		return get_static_faces(vision_frame, frame_number - 1) or []
+	return []
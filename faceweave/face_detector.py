@@ -7,8 +7,7 @@ from faceweave import inference_manager, state_manager
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_helper import create_rotated_matrix_and_size, create_static_anchors, distance_to_bounding_box, distance_to_face_landmark_5, normalize_bounding_box, transform_bounding_box, transform_points
 from faceweave.filesystem import resolve_relative_path
-from faceweave.thread_helper import thread_semaphore
-from faceweave.typing import Angle, BoundingBox, Detection, DownloadSet, FaceLandmark5, InferencePool, ModelSet, Score, VisionFrame
+from faceweave.typing import Angle, BoundingBox, DownloadSet, FaceLandmark5, InferenceOutputs, InferencePool, ModelSet, Score, VisionFrame
 from faceweave.vision import resize_frame_resolution, unpack_resolution
 
 MODEL_SET : ModelSet =\
@@ -107,197 +106,220 @@ def pre_check() -> bool:
 	return conditional_download_hashes(download_directory_path, model_hashes) and conditional_download_sources(download_directory_path, model_sources)
 
 
-def detect_faces(vision_frame : VisionFrame) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	all_bounding_boxes : List[BoundingBox] = []
-	all_face_scores : List[Score] = []
-	all_face_landmarks_5 : List[FaceLandmark5] = []
+def detect_many_faces(vision_frames : List[VisionFrame]) -> List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]]:
+	many_detections : List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]] = [ ([], [], []) for _ in vision_frames ]
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'retinaface' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_retinaface(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		for many_detection, (bounding_boxes, face_scores, face_landmarks_5) in zip(many_detections, detect_with_retinaface(vision_frames, state_manager.get_item('face_detector_size'))):
+			many_detection[0].extend(bounding_boxes)
+			many_detection[1].extend(face_scores)
+			many_detection[2].extend(face_landmarks_5)
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'scrfd' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_scrfd(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		for many_detection, (bounding_boxes, face_scores, face_landmarks_5) in zip(many_detections, detect_with_scrfd(vision_frames, state_manager.get_item('face_detector_size'))):
+			many_detection[0].extend(bounding_boxes)
+			many_detection[1].extend(face_scores)
+			many_detection[2].extend(face_landmarks_5)
 
 	if state_manager.get_item('face_detector_model') in [ 'many', 'yoloface' ]:
-		bounding_boxes, face_scores, face_landmarks_5 = detect_with_yoloface(vision_frame, state_manager.get_item('face_detector_size'))
-		all_bounding_boxes.extend(bounding_boxes)
-		all_face_scores.extend(face_scores)
-		all_face_landmarks_5.extend(face_landmarks_5)
+		for many_detection, (bounding_boxes, face_scores, face_landmarks_5) in zip(many_detections, detect_with_yoloface(vision_frames, state_manager.get_item('face_detector_size'))):
+			many_detection[0].extend(bounding_boxes)
+			many_detection[1].extend(face_scores)
+			many_detection[2].extend(face_landmarks_5)
 
-	all_bounding_boxes = [ normalize_bounding_box(all_bounding_box) for all_bounding_box in all_bounding_boxes ]
-	return all_bounding_boxes, all_face_scores, all_face_landmarks_5
+	for bounding_boxes, _, _ in many_detections:
+		bounding_boxes[:] = [ normalize_bounding_box(bounding_box) for bounding_box in bounding_boxes ]
+	return many_detections
 
 
-def detect_rotated_faces(vision_frame : VisionFrame, angle : Angle) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
-	rotated_vision_frame = cv2.warpAffine(vision_frame, rotated_matrix, rotated_size)
-	rotated_inverse_matrix = cv2.invertAffineTransform(rotated_matrix)
-	bounding_boxes, face_scores, face_landmarks_5 = detect_faces(rotated_vision_frame)
-	bounding_boxes = [ transform_bounding_box(bounding_box, rotated_inverse_matrix) for bounding_box in bounding_boxes ]
-	face_landmarks_5 = [ transform_points(face_landmark_5, rotated_inverse_matrix) for face_landmark_5 in face_landmarks_5 ]
-	return bounding_boxes, face_scores, face_landmarks_5
+def detect_many_rotated_faces(vision_frames : List[VisionFrame], angle : Angle) -> List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]]:
+	many_detections = []
+	rotated_vision_frames = []
+	rotated_inverse_matrices = []
 
+	for vision_frame in vision_frames:
+		rotated_matrix, rotated_size = create_rotated_matrix_and_size(angle, vision_frame.shape[:2][::-1])
+		rotated_vision_frames.append(cv2.warpAffine(vision_frame, rotated_matrix, rotated_size))
+		rotated_inverse_matrices.append(cv2.invertAffineTransform(rotated_matrix))
 
-def detect_with_retinaface(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+	for rotated_inverse_matrix, (bounding_boxes, face_scores, face_landmarks_5) in zip(rotated_inverse_matrices, detect_many_faces(rotated_vision_frames)):
+		bounding_boxes = [ transform_bounding_box(bounding_box, rotated_inverse_matrix) for bounding_box in bounding_boxes ]
+		face_landmarks_5 = [ transform_points(face_landmark_5, rotated_inverse_matrix) for face_landmark_5 in face_landmarks_5 ]
+		many_detections.append((bounding_boxes, face_scores, face_landmarks_5))
+	return many_detections
+
+
+def detect_with_retinaface(vision_frames : List[VisionFrame], face_detector_size : str) -> List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]]:
+	many_detections = []
 	feature_strides = [ 8, 16, 32 ]
 	feature_map_channel = 3
 	anchor_total = 2
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detection = forward_with_retinaface(detect_vision_frame)
-
-	for index, feature_stride in enumerate(feature_strides):
-		keep_indices = numpy.where(detection[index] >= state_manager.get_item('face_detector_score'))[0]
-
-		if numpy.any(keep_indices):
-			stride_height = face_detector_height // feature_stride
-			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_box_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmark_5_raw = detection[index + feature_map_channel * 2] * feature_stride
-
-			for bounding_box in distance_to_bounding_box(anchors, bounding_box_raw)[keep_indices]:
-				bounding_boxes.append(numpy.array(
-				[
-					bounding_box[0] * ratio_width,
-					bounding_box[1] * ratio_height,
-					bounding_box[2] * ratio_width,
-					bounding_box[3] * ratio_height,
-				]))
-
-			for score in detection[index][keep_indices]:
-				face_scores.append(score[0])
-
-			for face_landmark_5 in distance_to_face_landmark_5(anchors, face_landmark_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_5 * [ ratio_width, ratio_height ])
-
-	return bounding_boxes, face_scores, face_landmarks_5
-
-
-def detect_with_scrfd(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
+	temp_vision_frames = [ resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height)) for vision_frame in vision_frames ]
+	detect_vision_frames = [ prepare_detect_frame(temp_vision_frame, face_detector_size) for temp_vision_frame in temp_vision_frames ]
+	detections = forward_with_retinaface(detect_vision_frames)
+
+	for vision_frame, temp_vision_frame, detection in zip(vision_frames, temp_vision_frames, detections):
+		bounding_boxes = []
+		face_scores = []
+		face_landmarks_5 = []
+		ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
+		ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
+		detection_outputs = [ output.reshape(-1, output.shape[-1]) for output in detection ]
+
+		for index, feature_stride in enumerate(feature_strides):
+			keep_indices = numpy.where(detection_outputs[index] >= state_manager.get_item('face_detector_score'))[0]
+
+			if numpy.any(keep_indices):
+				stride_height = face_detector_height // feature_stride
+				stride_width = face_detector_width // feature_stride
+				anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
+				bounding_box_raw = detection_outputs[index + feature_map_channel] * feature_stride
+				face_landmark_5_raw = detection_outputs[index + feature_map_channel * 2] * feature_stride
+
+				for bounding_box in distance_to_bounding_box(anchors, bounding_box_raw)[keep_indices]:
+					bounding_boxes.append(numpy.array(
+					[
+						bounding_box[0] * ratio_width,
+						bounding_box[1] * ratio_height,
+						bounding_box[2] * ratio_width,
+						bounding_box[3] * ratio_height,
+					]))
+
+				for score in detection_outputs[index][keep_indices]:
+					face_scores.append(score[0])
+
+				for face_landmark_5 in distance_to_face_landmark_5(anchors, face_landmark_5_raw)[keep_indices]:
+					face_landmarks_5.append(face_landmark_5 * [ ratio_width, ratio_height ])
+
+		many_detections.append((bounding_boxes, face_scores, face_landmarks_5))
+	return many_detections
+
+
+def detect_with_scrfd(vision_frames : List[VisionFrame], face_detector_size : str) -> List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]]:
+	many_detections = []
 	feature_strides = [ 8, 16, 32 ]
 	feature_map_channel = 3
 	anchor_total = 2
 	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detection = forward_with_scrfd(detect_vision_frame)
-
-	for index, feature_stride in enumerate(feature_strides):
-		keep_indices = numpy.where(detection[index] >= state_manager.get_item('face_detector_score'))[0]
+	temp_vision_frames = [ resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height)) for vision_frame in vision_frames ]
+	detect_vision_frames = [ prepare_detect_frame(temp_vision_frame, face_detector_size) for temp_vision_frame in temp_vision_frames ]
+	detections = forward_with_scrfd(detect_vision_frames)
+
+	for vision_frame, temp_vision_frame, detection in zip(vision_frames, temp_vision_frames, detections):
+		bounding_boxes = []
+		face_scores = []
+		face_landmarks_5 = []
+		ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
+		ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
+		detection_outputs = [ output.reshape(-1, output.shape[-1]) for output in detection ]
+
+		for index, feature_stride in enumerate(feature_strides):
+			keep_indices = numpy.where(detection_outputs[index] >= state_manager.get_item('face_detector_score'))[0]
+
+			if numpy.any(keep_indices):
+				stride_height = face_detector_height // feature_stride
+				stride_width = face_detector_width // feature_stride
+				anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
+				bounding_box_raw = detection_outputs[index + feature_map_channel] * feature_stride
+				face_landmark_5_raw = detection_outputs[index + feature_map_channel * 2] * feature_stride
+
+				for bounding_box in distance_to_bounding_box(anchors, bounding_box_raw)[keep_indices]:
+					bounding_boxes.append(numpy.array(
+					[
+						bounding_box[0] * ratio_width,
+						bounding_box[1] * ratio_height,
+						bounding_box[2] * ratio_width,
+						bounding_box[3] * ratio_height,
+					]))
+
+				for score in detection_outputs[index][keep_indices]:
+					face_scores.append(score[0])
+
+				for face_landmark_5 in distance_to_face_landmark_5(anchors, face_landmark_5_raw)[keep_indices]:
+					face_landmarks_5.append(face_landmark_5 * [ ratio_width, ratio_height ])
+
+		many_detections.append((bounding_boxes, face_scores, face_landmarks_5))
+	return many_detections
+
+
+def detect_with_yoloface(vision_frames : List[VisionFrame], face_detector_size : str) -> List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]]:
+	many_detections = []
+	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
+	temp_vision_frames = [ resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height)) for vision_frame in vision_frames ]
+	detect_vision_frames = [ prepare_detect_frame(temp_vision_frame, face_detector_size) for temp_vision_frame in temp_vision_frames ]
+	detections = forward_with_yoloface(detect_vision_frames)
+
+	for vision_frame, temp_vision_frame, detection in zip(vision_frames, temp_vision_frames, detections):
+		bounding_boxes = []
+		face_scores = []
+		face_landmarks_5 = []
+		ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
+		ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
+		detection_output = numpy.squeeze(detection).T
+		bounding_box_raw, score_raw, face_landmark_5_raw = numpy.split(detection_output, [ 4, 5 ], axis = 1)
+		keep_indices = numpy.where(score_raw > state_manager.get_item('face_detector_score'))[0]
 
 		if numpy.any(keep_indices):
-			stride_height = face_detector_height // feature_stride
-			stride_width = face_detector_width // feature_stride
-			anchors = create_static_anchors(feature_stride, anchor_total, stride_height, stride_width)
-			bounding_box_raw = detection[index + feature_map_channel] * feature_stride
-			face_landmark_5_raw = detection[index + feature_map_channel * 2] * feature_stride
+			bounding_box_raw, face_landmark_5_raw, score_raw = bounding_box_raw[keep_indices], face_landmark_5_raw[keep_indices], score_raw[keep_indices]
 
-			for bounding_box in distance_to_bounding_box(anchors, bounding_box_raw)[keep_indices]:
+			for bounding_box in bounding_box_raw:
 				bounding_boxes.append(numpy.array(
 				[
-					bounding_box[0] * ratio_width,
-					bounding_box[1] * ratio_height,
-					bounding_box[2] * ratio_width,
-					bounding_box[3] * ratio_height,
+					(bounding_box[0] - bounding_box[2] / 2) * ratio_width,
+					(bounding_box[1] - bounding_box[3] / 2) * ratio_height,
+					(bounding_box[0] + bounding_box[2] / 2) * ratio_width,
+					(bounding_box[1] + bounding_box[3] / 2) * ratio_height,
 				]))
 
-			for score in detection[index][keep_indices]:
-				face_scores.append(score[0])
+			face_scores = score_raw.ravel().tolist()
+			face_landmark_5_raw[:, 0::3] = (face_landmark_5_raw[:, 0::3]) * ratio_width
+			face_landmark_5_raw[:, 1::3] = (face_landmark_5_raw[:, 1::3]) * ratio_height
 
-			for face_landmark_5 in distance_to_face_landmark_5(anchors, face_landmark_5_raw)[keep_indices]:
-				face_landmarks_5.append(face_landmark_5 * [ ratio_width, ratio_height ])
+			for face_landmark_5 in face_landmark_5_raw:
+				face_landmarks_5.append(numpy.array(face_landmark_5.reshape(-1, 3)[:, :2]))
 
-	return bounding_boxes, face_scores, face_landmarks_5
+		many_detections.append((bounding_boxes, face_scores, face_landmarks_5))
+	return many_detections
 
 
-def detect_with_yoloface(vision_frame : VisionFrame, face_detector_size : str) -> Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]:
-	bounding_boxes = []
-	face_scores = []
-	face_landmarks_5 = []
-	face_detector_width, face_detector_height = unpack_resolution(face_detector_size)
-	temp_vision_frame = resize_frame_resolution(vision_frame, (face_detector_width, face_detector_height))
-	ratio_height = vision_frame.shape[0] / temp_vision_frame.shape[0]
-	ratio_width = vision_frame.shape[1] / temp_vision_frame.shape[1]
-	detect_vision_frame = prepare_detect_frame(temp_vision_frame, face_detector_size)
-	detection = forward_with_yoloface(detect_vision_frame)
-	detection = numpy.squeeze(detection).T
-	bounding_box_raw, score_raw, face_landmark_5_raw = numpy.split(detection, [ 4, 5 ], axis = 1)
-	keep_indices = numpy.where(score_raw > state_manager.get_item('face_detector_score'))[0]
-
-	if numpy.any(keep_indices):
-		bounding_box_raw, face_landmark_5_raw, score_raw = bounding_box_raw[keep_indices], face_landmark_5_raw[keep_indices], score_raw[keep_indices]
-
-		for bounding_box in bounding_box_raw:
-			bounding_boxes.append(numpy.array(
-			[
-				(bounding_box[0] - bounding_box[2] / 2) * ratio_width,
-				(bounding_box[1] - bounding_box[3] / 2) * ratio_height,
-				(bounding_box[0] + bounding_box[2] / 2) * ratio_width,
-				(bounding_box[1] + bounding_box[3] / 2) * ratio_height,
-			]))
-
-		face_scores = score_raw.ravel().tolist()
-		face_landmark_5_raw[:, 0::3] = (face_landmark_5_raw[:, 0::3]) * ratio_width
-		face_landmark_5_raw[:, 1::3] = (face_landmark_5_raw[:, 1::3]) * ratio_height
-
-		for face_landmark_5 in face_landmark_5_raw:
-			face_landmarks_5.append(numpy.array(face_landmark_5.reshape(-1, 3)[:, :2]))
-
-	return bounding_boxes, face_scores, face_landmarks_5
-
-
-def forward_with_retinaface(detect_vision_frame : VisionFrame) -> Detection:
+def forward_with_retinaface(detect_vision_frames : List[VisionFrame]) -> List[InferenceOutputs]:
 	face_detector = get_inference_pool().get('retinaface')
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
+	detections = inference_manager.run_batch(face_detector,
+	[
 		{
 			'input': detect_vision_frame
-		})
+		} for detect_vision_frame in detect_vision_frames
+	])
 
-	return detection
+	return detections
 
 
-def forward_with_scrfd(detect_vision_frame : VisionFrame) -> Detection:
+def forward_with_scrfd(detect_vision_frames : List[VisionFrame]) -> List[InferenceOutputs]:
 	face_detector = get_inference_pool().get('scrfd')
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
+	detections = inference_manager.run_batch(face_detector,
+	[
 		{
 			'input': detect_vision_frame
-		})
+		} for detect_vision_frame in detect_vision_frames
+	])
 
-	return detection
+	return detections
 
 
-def forward_with_yoloface(detect_vision_frame : VisionFrame) -> Detection:
+def forward_with_yoloface(detect_vision_frames : List[VisionFrame]) -> List[InferenceOutputs]:
 	face_detector = get_inference_pool().get('yoloface')
 
-	with thread_semaphore():
-		detection = face_detector.run(None,
+	detections = inference_manager.run_batch(face_detector,
+	[
 		{
 			'input': detect_vision_frame
-		})
+		} for detect_vision_frame in detect_vision_frames
+	])
 
-	return detection
+	return detections
 
 
 def prepare_detect_frame(temp_vision_frame : VisionFrame, face_detector_size : str) -> VisionFrame:
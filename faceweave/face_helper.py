@@ -5,7 +5,7 @@ import cv2
 import numpy
 from cv2.typing import Size
 
-from faceweave.typing import Anchors, Angle, BoundingBox, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, Mask, Matrix, Points, Scale, Score, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
+from faceweave.typing import Anchors, Angle, BoundingBox, Distance, FaceDetectorModel, FaceLandmark5, FaceLandmark68, Mask, Matrix, PastePatch, Points, Scale, Score, Translation, VisionFrame, WarpTemplate, WarpTemplateSet
 
 WARP_TEMPLATES : WarpTemplateSet =\
 {
@@ -75,15 +75,35 @@ def warp_face_by_translation(temp_vision_frame : VisionFrame, translation : Tran
 
 
 def paste_back(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
+	return paste_back_many(temp_vision_frame, [ (crop_vision_frame, crop_mask, affine_matrix) ])
+
+
+def paste_back_many(temp_vision_frame : VisionFrame, paste_patches : List[PastePatch]) -> VisionFrame:
+	for crop_vision_frame, crop_mask, affine_matrix in paste_patches:
+		paste_back_in_place(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
+	return temp_vision_frame
+
+
+def paste_back_in_place(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
 	inverse_matrix = cv2.invertAffineTransform(affine_matrix)
-	temp_size = temp_vision_frame.shape[:2][::-1]
-	inverse_mask = cv2.warpAffine(crop_mask, inverse_matrix, temp_size).clip(0, 1)
-	inverse_vision_frame = cv2.warpAffine(crop_vision_frame, inverse_matrix, temp_size, borderMode = cv2.BORDER_REPLICATE)
-	paste_vision_frame = temp_vision_frame.copy()
-	paste_vision_frame[:, :, 0] = inverse_mask * inverse_vision_frame[:, :, 0] + (1 - inverse_mask) * temp_vision_frame[:, :, 0]
-	paste_vision_frame[:, :, 1] = inverse_mask * inverse_vision_frame[:, :, 1] + (1 - inverse_mask) * temp_vision_frame[:, :, 1]
-	paste_vision_frame[:, :, 2] = inverse_mask * inverse_vision_frame[:, :, 2] + (1 - inverse_mask) * temp_vision_frame[:, :, 2]
-	return paste_vision_frame
+	x1, y1, x2, y2 = calc_paste_area(inverse_matrix, crop_vision_frame.shape[:2][::-1], temp_vision_frame.shape[:2][::-1])
+
+	if x2 > x1 and y2 > y1:
+		paste_size = (x2 - x1, y2 - y1)
+		inverse_matrix[:, 2] = inverse_matrix[:, 2] - (x1, y1)
+		inverse_mask = cv2.warpAffine(crop_mask.astype(numpy.float32), inverse_matrix, paste_size).clip(0, 1)[:, :, numpy.newaxis]
+		inverse_vision_frame = cv2.warpAffine(crop_vision_frame, inverse_matrix, paste_size, borderMode = cv2.BORDER_REPLICATE).astype(numpy.float32)
+		paste_vision_frame = temp_vision_frame[y1:y2, x1:x2].astype(numpy.float32)
+		temp_vision_frame[y1:y2, x1:x2] = inverse_mask * (inverse_vision_frame - paste_vision_frame) + paste_vision_frame
+	return temp_vision_frame
+
+
+def calc_paste_area(inverse_matrix : Matrix, crop_size : Size, temp_size : Size) -> Tuple[int, int, int, int]:
+	crop_points = numpy.array([ [ 0, 0 ], [ crop_size[0], 0 ], [ 0, crop_size[1] ], [ crop_size[0], crop_size[1] ] ], dtype = numpy.float32)
+	paste_points = cv2.transform(crop_points[numpy.newaxis], inverse_matrix)[0]
+	x1, y1 = numpy.floor(paste_points.min(axis = 0)).astype(int) - 1
+	x2, y2 = numpy.ceil(paste_points.max(axis = 0)).astype(int) + 1
+	return max(x1, 0), max(y1, 0), min(x2, temp_size[0]), min(y2, temp_size[1])
 
 
 @lru_cache(maxsize = None)
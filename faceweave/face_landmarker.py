@@ -1,14 +1,15 @@
-from typing import Tuple
+from typing import List, Optional, Tuple
 
 import cv2
 import numpy
+from cv2.typing import Size
 
 from faceweave import inference_manager, state_manager
+from faceweave.common_helper import get_first
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_helper import create_rotated_matrix_and_size, estimate_matrix_by_face_landmark_5, transform_points, warp_face_by_translation
 from faceweave.filesystem import resolve_relative_path
-from faceweave.thread_helper import conditional_thread_semaphore
-from faceweave.typing import Angle, BoundingBox, DownloadSet, FaceLandmark5, FaceLandmark68, InferencePool, ModelSet, Prediction, Score, VisionFrame
+from faceweave.typing import Angle, BoundingBox, DownloadSet, FaceLandmark5, FaceLandmark68, InferencePool, Matrix, ModelSet, Prediction, Score, VisionFrame
 
 MODEL_SET : ModelSet =\
 {
@@ -112,42 +113,69 @@ def pre_check() -> bool:
 
 
 def detect_face_landmarks(vision_frame : VisionFrame, bounding_box : BoundingBox, face_angle : Angle) -> Tuple[FaceLandmark68, Score]:
-	face_landmark_2dfan4 = None
-	face_landmark_peppa_wutz = None
-	face_landmark_score_2dfan4 = 0.0
-	face_landmark_score_peppa_wutz = 0.0
+	return get_first(detect_many_face_landmarks(vision_frame, [ bounding_box ], [ face_angle ]))
+
+
+def detect_many_face_landmarks(vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
+	many_face_landmarks_2dfan4 : List[Tuple[Optional[FaceLandmark68], Score]] = [ (None, 0.0) for _ in bounding_boxes ]
+	many_face_landmarks_peppa_wutz : List[Tuple[Optional[FaceLandmark68], Score]] = [ (None, 0.0) for _ in bounding_boxes ]
+	many_face_landmarks = []
 
 	if state_manager.get_item('face_landmarker_model') in [ 'many', '2dfan4' ]:
-		face_landmark_2dfan4, face_landmark_score_2dfan4 = detect_with_2dfan4(vision_frame, bounding_box, face_angle)
+		many_face_landmarks_2dfan4 = detect_many_with_2dfan4(vision_frame, bounding_boxes, face_angles)
 	if state_manager.get_item('face_landmarker_model') in [ 'many', 'peppa_wutz' ]:
-		face_landmark_peppa_wutz, face_landmark_score_peppa_wutz = detect_with_peppa_wutz(vision_frame, bounding_box, face_angle)
+		many_face_landmarks_peppa_wutz = detect_many_with_peppa_wutz(vision_frame, bounding_boxes, face_angles)
 
-	if face_landmark_score_2dfan4 > face_landmark_score_peppa_wutz - 0.2:
-		return face_landmark_2dfan4, face_landmark_score_2dfan4
-	return face_landmark_peppa_wutz, face_landmark_score_peppa_wutz
+	for (face_landmark_2dfan4, face_landmark_score_2dfan4), (face_landmark_peppa_wutz, face_landmark_score_peppa_wutz) in zip(many_face_landmarks_2dfan4, many_face_landmarks_peppa_wutz):
+		if face_landmark_score_2dfan4 > face_landmark_score_peppa_wutz - 0.2:
+			many_face_landmarks.append((face_landmark_2dfan4, face_landmark_score_2dfan4))
+		else:
+			many_face_landmarks.append((face_landmark_peppa_wutz, face_landmark_score_peppa_wutz))
+	return many_face_landmarks
 
 
-def detect_with_2dfan4(temp_vision_frame: VisionFrame, bounding_box: BoundingBox, face_angle: Angle) -> Tuple[FaceLandmark68, Score]:
+def detect_many_with_2dfan4(temp_vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
 	model_size = MODEL_SET.get('2dfan4').get('size')
-	scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
-	translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
-	rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
-	crop_vision_frame, affine_matrix = warp_face_by_translation(temp_vision_frame, translation, scale, model_size)
-	crop_vision_frame = cv2.warpAffine(crop_vision_frame, rotated_matrix, rotated_size)
-	crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
-	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0
-	face_landmark_68, face_heatmap = forward_with_2dfan4(crop_vision_frame)
-	face_landmark_68 = face_landmark_68[:, :, :2][0] / 64 * 256
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
-	face_landmark_score_68 = numpy.amax(face_heatmap, axis = (2, 3))
-	face_landmark_score_68 = numpy.mean(face_landmark_score_68)
-	face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.9 ], [ 0, 1 ])
-	return face_landmark_68, face_landmark_score_68
+	many_face_landmarks = []
+	crop_vision_frames = []
+	crop_matrices = []
+
+	for bounding_box, face_angle in zip(bounding_boxes, face_angles):
+		crop_vision_frame, affine_matrix, rotated_matrix = prepare_crop_frame(temp_vision_frame, bounding_box, face_angle, model_size)
+		crop_vision_frames.append(crop_vision_frame)
+		crop_matrices.append((affine_matrix, rotated_matrix))
+
+	for (affine_matrix, rotated_matrix), (face_landmark_68, face_heatmap) in zip(crop_matrices, forward_with_2dfan4(crop_vision_frames)):
+		face_landmark_68 = face_landmark_68[:, :, :2][0] / 64 * 256
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
+		face_landmark_score_68 = numpy.amax(face_heatmap, axis = (2, 3))
+		face_landmark_score_68 = numpy.mean(face_landmark_score_68)
+		many_face_landmarks.append((face_landmark_68, float(numpy.interp(face_landmark_score_68, [ 0, 0.9 ], [ 0, 1 ]))))
+	return many_face_landmarks
+
+
+def detect_many_with_peppa_wutz(temp_vision_frame : VisionFrame, bounding_boxes : List[BoundingBox], face_angles : List[Angle]) -> List[Tuple[FaceLandmark68, Score]]:
+	model_size = MODEL_SET.get('peppa_wutz').get('size')
+	many_face_landmarks = []
+	crop_vision_frames = []
+	crop_matrices = []
 
+	for bounding_box, face_angle in zip(bounding_boxes, face_angles):
+		crop_vision_frame, affine_matrix, rotated_matrix = prepare_crop_frame(temp_vision_frame, bounding_box, face_angle, model_size)
+		crop_vision_frames.append(crop_vision_frame)
+		crop_matrices.append((affine_matrix, rotated_matrix))
 
-def detect_with_peppa_wutz(temp_vision_frame : VisionFrame, bounding_box : BoundingBox, face_angle : Angle) -> Tuple[FaceLandmark68, Score]:
-	model_size = MODEL_SET.get('peppa_wutz').get('size')
+	for (affine_matrix, rotated_matrix), prediction in zip(crop_matrices, forward_with_peppa_wutz(crop_vision_frames)):
+		face_landmark_68 = prediction.reshape(-1, 3)[:, :2] / 64 * model_size[0]
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
+		face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
+		face_landmark_score_68 = prediction.reshape(-1, 3)[:, 2].mean()
+		many_face_landmarks.append((face_landmark_68, float(numpy.interp(face_landmark_score_68, [ 0, 0.95 ], [ 0, 1 ]))))
+	return many_face_landmarks
+
+
+def prepare_crop_frame(temp_vision_frame : VisionFrame, bounding_box : BoundingBox, face_angle : Angle, model_size : Size) -> Tuple[VisionFrame, Matrix, Matrix]:
 	scale = 195 / numpy.subtract(bounding_box[2:], bounding_box[:2]).max().clip(1, None)
 	translation = (model_size[0] - numpy.add(bounding_box[2:], bounding_box[:2]) * scale) * 0.5
 	rotated_matrix, rotated_size = create_rotated_matrix_and_size(face_angle, model_size)
@@ -156,13 +184,7 @@ def detect_with_peppa_wutz(temp_vision_frame : VisionFrame, bounding_box : Bound
 	crop_vision_frame = conditional_optimize_contrast(crop_vision_frame)
 	crop_vision_frame = crop_vision_frame.transpose(2, 0, 1).astype(numpy.float32) / 255.0
 	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
-	prediction = forward_with_peppa_wutz(crop_vision_frame)
-	face_landmark_68 = prediction.reshape(-1, 3)[:, :2] / 64 * model_size[0]
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(rotated_matrix))
-	face_landmark_68 = transform_points(face_landmark_68, cv2.invertAffineTransform(affine_matrix))
-	face_landmark_score_68 = prediction.reshape(-1, 3)[:, 2].mean()
-	face_landmark_score_68 = numpy.interp(face_landmark_score_68, [ 0, 0.95 ], [ 0, 1 ])
-	return face_landmark_68, face_landmark_score_68
+	return crop_vision_frame, affine_matrix, rotated_matrix
 
 
 def conditional_optimize_contrast(crop_vision_frame : VisionFrame) -> VisionFrame:
@@ -174,44 +196,60 @@ def conditional_optimize_contrast(crop_vision_frame : VisionFrame) -> VisionFram
 
 
 def estimate_face_landmark_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark68:
-	affine_matrix = estimate_matrix_by_face_landmark_5(face_landmark_5, 'ffhq_512', (1, 1))
-	face_landmark_5 = cv2.transform(face_landmark_5.reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
-	face_landmark_68_5 = forward_fan_68_5(face_landmark_5)
-	face_landmark_68_5 = cv2.transform(face_landmark_68_5.reshape(1, -1, 2), cv2.invertAffineTransform(affine_matrix)).reshape(-1, 2)
-	return face_landmark_68_5
+	return get_first(estimate_many_face_landmarks_68_5([ face_landmark_5 ]))
+
 
+def estimate_many_face_landmarks_68_5(face_landmarks_5 : List[FaceLandmark5]) -> List[FaceLandmark68]:
+	many_face_landmarks_68_5 = []
+	affine_matrices = []
+	temp_face_landmarks_5 = []
 
-def forward_with_2dfan4(crop_vision_frame : VisionFrame) -> Tuple[Prediction, Prediction]:
+	for face_landmark_5 in face_landmarks_5:
+		affine_matrix = estimate_matrix_by_face_landmark_5(face_landmark_5, 'ffhq_512', (1, 1))
+		face_landmark_5 = cv2.transform(face_landmark_5.reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
+		affine_matrices.append(affine_matrix)
+		temp_face_landmarks_5.append(face_landmark_5)
+
+	for affine_matrix, face_landmark_68_5 in zip(affine_matrices, forward_fan_68_5(temp_face_landmarks_5)):
+		face_landmark_68_5 = cv2.transform(face_landmark_68_5.reshape(1, -1, 2), cv2.invertAffineTransform(affine_matrix)).reshape(-1, 2)
+		many_face_landmarks_68_5.append(face_landmark_68_5)
+	return many_face_landmarks_68_5
+
+
+def forward_with_2dfan4(crop_vision_frames : List[VisionFrame]) -> List[Tuple[Prediction, Prediction]]:
 	face_landmarker = get_inference_pool().get('2dfan4')
 
-	with conditional_thread_semaphore():
-		prediction = face_landmarker.run(None,
+	predictions = inference_manager.run_batch(face_landmarker,
+	[
 		{
-			'input': [ crop_vision_frame ]
-		})
+			'input': crop_vision_frame
+		} for crop_vision_frame in crop_vision_frames
+	])
 
-	return prediction
+	return [ (face_landmark_68, face_heatmap) for face_landmark_68, face_heatmap in predictions ]
 
 
-def forward_with_peppa_wutz(crop_vision_frame : VisionFrame) -> Prediction:
+def forward_with_peppa_wutz(crop_vision_frames : List[VisionFrame]) -> List[Prediction]:
 	face_landmarker = get_inference_pool().get('peppa_wutz')
 
-	with conditional_thread_semaphore():
-		prediction = face_landmarker.run(None,
+	predictions = inference_manager.run_batch(face_landmarker,
+	[
 		{
 			'input': crop_vision_frame
-		})[0]
+		} for crop_vision_frame in crop_vision_frames
+	])
 
-	return prediction
+	return [ prediction[0] for prediction in predictions ]
 
 
-def forward_fan_68_5(face_landmark_5 : FaceLandmark5) -> FaceLandmark68:
+def forward_fan_68_5(face_landmarks_5 : List[FaceLandmark5]) -> List[FaceLandmark68]:
 	face_landmarker = get_inference_pool().get('fan_68_5')
 
-	with conditional_thread_semaphore():
-		face_landmark_68_5 = face_landmarker.run(None,
+	predictions = inference_manager.run_batch(face_landmarker,
+	[
 		{
-			'input': [ face_landmark_5 ]
-		})[0][0]
+			'input': numpy.expand_dims(face_landmark_5, axis = 0).astype(numpy.float32)
+		} for face_landmark_5 in face_landmarks_5
+	])
 
-	return face_landmark_68_5
+	return [ prediction[0][0] for prediction in predictions ]
@@ -1,15 +1,17 @@
-from functools import lru_cache
-from typing import Dict, List, Tuple
+from functools import lru_cache, partial
+from typing import Callable, Dict, List, Optional, Tuple
 
 import cv2
 import numpy
 from cv2.typing import Size
 
-from faceweave import inference_manager
+from faceweave import inference_manager, state_manager
+from faceweave.cache_manager import estimate_size, get_cache_item, register_cache, set_cache_item
 from faceweave.download import conditional_download_hashes, conditional_download_sources
+from faceweave.face_analyser import LazyFace, get_face_track_id
+from faceweave.face_helper import merge_matrix, transform_points
 from faceweave.filesystem import resolve_relative_path
-from faceweave.thread_helper import conditional_thread_semaphore
-from faceweave.typing import DownloadSet, FaceLandmark68, FaceMaskRegion, InferencePool, Mask, ModelSet, Padding, VisionFrame
+from faceweave.typing import DownloadSet, Face, FaceLandmark68, FaceMaskRegion, InferencePool, Mask, Matrix, ModelSet, Padding, VisionFrame
 
 MODEL_SET : ModelSet =\
 {
@@ -67,6 +69,9 @@ FACE_MASK_REGIONS : Dict[FaceMaskRegion, int] =\
 	'upper-lip': 12,
 	'lower-lip': 13
 }
+FACE_MASK_RESIDUAL_LIMIT : float = 0.02
+register_cache('face_masks', estimate_size)
+register_cache('track_face_masks', estimate_size)
 
 
 def get_inference_pool() -> InferencePool:
@@ -140,6 +145,71 @@ def create_region_mask(crop_vision_frame : VisionFrame, face_mask_regions : List
 	return region_mask
 
 
+def get_occlusion_mask(target_face : Face, crop_vision_frame : VisionFrame, affine_matrix : Matrix) -> Mask:
+	return get_face_mask([ 'occlusion' ], target_face, crop_vision_frame, affine_matrix, create_occlusion_mask)
+
+
+def get_region_mask(target_face : Face, crop_vision_frame : VisionFrame, affine_matrix : Matrix, face_mask_regions : List[FaceMaskRegion]) -> Mask:
+	return get_face_mask([ 'region', *face_mask_regions ], target_face, crop_vision_frame, affine_matrix, partial(create_region_mask, face_mask_regions = face_mask_regions))
+
+
+def get_face_mask(mask_scope : List[str], target_face : Face, crop_vision_frame : VisionFrame, affine_matrix : Matrix, create_mask : Callable[[VisionFrame], Mask]) -> Mask:
+	crop_size = crop_vision_frame.shape[:2][::-1]
+	mask_key = tuple(mask_scope) + (target_face.landmark_set.get('5/68').tobytes(),)
+	has_face_mask, face_mask = get_cache_item('face_masks', mask_key)
+
+	if has_face_mask:
+		crop_mask, crop_matrix = face_mask
+
+		if crop_mask.shape[:2][::-1] == crop_size and numpy.array_equal(crop_matrix, affine_matrix):
+			return crop_mask
+		combined_matrix = merge_matrix([ affine_matrix, cv2.invertAffineTransform(crop_matrix) ])
+		return cv2.warpAffine(crop_mask, combined_matrix, crop_size, borderMode = cv2.BORDER_REPLICATE)
+	crop_mask = propagate_face_mask(mask_scope, target_face, crop_size, affine_matrix)
+
+	if crop_mask is None:
+		crop_mask = create_mask(crop_vision_frame)
+		set_track_face_mask(mask_scope, target_face, crop_mask, affine_matrix)
+	set_cache_item('face_masks', mask_key, (crop_mask, affine_matrix))
+	return crop_mask
+
+
+def propagate_face_mask(mask_scope : List[str], target_face : Face, crop_size : Size, affine_matrix : Matrix) -> Optional[Mask]:
+	face_mask_interval = state_manager.get_item('face_mask_interval')
+	track_id = get_face_track_id(target_face)
+
+	if face_mask_interval > 1 and isinstance(target_face, LazyFace) and isinstance(track_id, int):
+		track_key = tuple(mask_scope) + (track_id,)
+		has_track_face_mask, track_face_mask = get_cache_item('track_face_masks', track_key)
+
+		if has_track_face_mask:
+			crop_mask, crop_face_landmark_68, propagate_count, propagate_analysis = track_face_mask
+			face_landmark_68 = transform_points(target_face.landmark_set.get('68'), affine_matrix)
+
+			if propagate_analysis != id(target_face.face_analysis):
+				propagate_count += 1
+
+			if propagate_count < face_mask_interval:
+				propagate_matrix = cv2.estimateAffinePartial2D(crop_face_landmark_68, face_landmark_68, method = cv2.LMEDS)[0]
+
+				if propagate_matrix is not None and calc_propagate_residual(crop_face_landmark_68, face_landmark_68, propagate_matrix) / max(crop_size) <= FACE_MASK_RESIDUAL_LIMIT:
+					set_cache_item('track_face_masks', track_key, (crop_mask, crop_face_landmark_68, propagate_count, id(target_face.face_analysis)))
+					return cv2.warpAffine(crop_mask, propagate_matrix, crop_size, borderMode = cv2.BORDER_REPLICATE)
+	return None
+
+
+def set_track_face_mask(mask_scope : List[str], target_face : Face, crop_mask : Mask, affine_matrix : Matrix) -> None:
+	track_id = get_face_track_id(target_face)
+
+	if state_manager.get_item('face_mask_interval') > 1 and isinstance(target_face, LazyFace) and isinstance(track_id, int):
+		track_key = tuple(mask_scope) + (track_id,)
+		set_cache_item('track_face_masks', track_key, (crop_mask, transform_points(target_face.landmark_set.get('68'), affine_matrix), 0, id(target_face.face_analysis)))
+
+
+def calc_propagate_residual(face_landmark_68 : FaceLandmark68, other_face_landmark_68 : FaceLandmark68, propagate_matrix : Matrix) -> float:
+	return float(numpy.mean(numpy.linalg.norm(transform_points(face_landmark_68, propagate_matrix) - other_face_landmark_68, axis = 1)))
+
+
 def create_mouth_mask(face_landmark_68 : FaceLandmark68) -> Mask:
 	convex_hull = cv2.convexHull(face_landmark_68[numpy.r_[3:14, 31:36]].astype(numpy.int32))
 	mouth_mask : Mask = numpy.zeros((512, 512)).astype(numpy.float32)
@@ -152,11 +222,10 @@ def create_mouth_mask(face_landmark_68 : FaceLandmark68) -> Mask:
 def forward_occlude_face(prepare_vision_frame : VisionFrame) -> Mask:
 	face_occluder = get_inference_pool().get('face_occluder')
 
-	with conditional_thread_semaphore():
-		occlusion_mask : Mask = face_occluder.run(None,
-		{
-			'input': prepare_vision_frame
-		})[0][0]
+	occlusion_mask : Mask = inference_manager.run_inference(face_occluder,
+	{
+		'input': prepare_vision_frame
+	})[0][0]
 
 	return occlusion_mask
 
@@ -164,10 +233,9 @@ def forward_occlude_face(prepare_vision_frame : VisionFrame) -> Mask:
 def forward_parse_face(prepare_vision_frame : VisionFrame) -> Mask:
 	face_parser = get_inference_pool().get('face_parser')
 
-	with conditional_thread_semaphore():
-		region_mask : Mask = face_parser.run(None,
-		{
-			'input': prepare_vision_frame
-		})[0][0]
+	region_mask : Mask = inference_manager.run_inference(face_parser,
+	{
+		'input': prepare_vision_frame
+	})[0][0]
 
 	return region_mask
@@ -1,12 +1,12 @@
-from typing import Tuple
+from typing import List, Tuple
 
 import numpy
 
 from faceweave import inference_manager
+from faceweave.common_helper import get_first
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_helper import warp_face_by_face_landmark_5
 from faceweave.filesystem import resolve_relative_path
-from faceweave.thread_helper import conditional_thread_semaphore
 from faceweave.typing import Embedding, FaceLandmark5, InferencePool, ModelOptions, ModelSet, VisionFrame
 
 MODEL_SET : ModelSet =\
@@ -57,25 +57,37 @@ def pre_check() -> bool:
 
 
 def calc_embedding(temp_vision_frame : VisionFrame, face_landmark_5 : FaceLandmark5) -> Tuple[Embedding, Embedding]:
+	return get_first(calc_many_embeddings(temp_vision_frame, [ face_landmark_5 ]))
+
+
+def calc_many_embeddings(temp_vision_frame : VisionFrame, face_landmarks_5 : List[FaceLandmark5]) -> List[Tuple[Embedding, Embedding]]:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
-	crop_vision_frame, matrix = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_template, model_size)
-	crop_vision_frame = crop_vision_frame / 127.5 - 1
-	crop_vision_frame = crop_vision_frame[:, :, ::-1].transpose(2, 0, 1).astype(numpy.float32)
-	crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
-	embedding = forward(crop_vision_frame)
-	embedding = embedding.ravel()
-	normed_embedding = embedding / numpy.linalg.norm(embedding)
-	return embedding, normed_embedding
+	many_embeddings = []
+	crop_vision_frames = []
+
+	for face_landmark_5 in face_landmarks_5:
+		crop_vision_frame, _ = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, model_template, model_size)
+		crop_vision_frame = crop_vision_frame / 127.5 - 1
+		crop_vision_frame = crop_vision_frame[:, :, ::-1].transpose(2, 0, 1).astype(numpy.float32)
+		crop_vision_frame = numpy.expand_dims(crop_vision_frame, axis = 0)
+		crop_vision_frames.append(crop_vision_frame)
+
+	for embedding in forward(crop_vision_frames):
+		embedding = embedding.ravel()
+		normed_embedding = embedding / numpy.linalg.norm(embedding)
+		many_embeddings.append((embedding, normed_embedding))
+	return many_embeddings
 
 
-def forward(crop_vision_frame : VisionFrame) -> Embedding:
+def forward(crop_vision_frames : List[VisionFrame]) -> List[Embedding]:
 	face_recognizer = get_inference_pool().get('face_recognizer')
 
-	with conditional_thread_semaphore():
-		embedding = face_recognizer.run(None,
+	embeddings = inference_manager.run_batch(face_recognizer,
+	[
 		{
 			'input': crop_vision_frame
-		})[0]
+		} for crop_vision_frame in crop_vision_frames
+	])
 
-	return embedding
+	return [ embedding[0] for embedding in embeddings ]
@@ -1,33 +1,90 @@
-from typing import List
+import threading
+from typing import List, Optional
 
 import numpy
 
 from faceweave import state_manager
-from faceweave.typing import Face, FaceSelectorOrder, FaceSet, Gender, Race
+from faceweave.face_analyser import LazyFace, get_face_detector_score, get_face_track_id, plan_face_analysis
+from faceweave.face_store import get_track_identity, set_track_identity
+from faceweave.typing import EmbeddingMatrix, Face, FaceDistanceMatrix, FaceMatches, FaceSelectorOrder, FaceSet, Gender, Race
+
+TRACK_IDENTITY_LOCK : threading.Lock = threading.Lock()
 
 
 def find_similar_faces(faces : List[Face], reference_faces : FaceSet, face_distance : float) -> List[Face]:
 	similar_faces : List[Face] = []
 
 	if faces and reference_faces:
+		many_face_matches = get_many_face_matches(faces, reference_faces, face_distance)
+
 		for reference_set in reference_faces:
 			if not similar_faces:
-				for reference_face in reference_faces[reference_set]:
-					for face in faces:
-						if compare_faces(face, reference_face, face_distance):
-							similar_faces.append(face)
+				face_match_matrix = numpy.array([ face_matches.get(reference_set) for face_matches in many_face_matches ], dtype = bool).reshape(len(faces), -1)
+
+				for _, face_index in numpy.argwhere(face_match_matrix.T):
+					similar_faces.append(faces[face_index])
 	return similar_faces
 
 
-def compare_faces(face : Face, reference_face : Face, face_distance : float) -> bool:
-	current_face_distance = calc_face_distance(face, reference_face)
-	return current_face_distance < face_distance
+def get_many_face_matches(faces : List[Face], reference_faces : FaceSet, face_distance : float) -> List[FaceMatches]:
+	many_face_matches = [ get_track_face_matches(face, face_distance) for face in faces ]
+	match_faces = [ face for face, face_matches in zip(faces, many_face_matches) if face_matches is None ]
+	plan_face_analysis(match_faces)
+
+	if match_faces:
+		face_embedding_matrix = create_embedding_matrix(match_faces)
+		many_face_distances = { reference_set: calc_many_face_distances(face_embedding_matrix, create_embedding_matrix(reference_faces[reference_set])) for reference_set in reference_faces }
+		match_index = 0
+
+		for index, face in enumerate(faces):
+			if many_face_matches[index] is None:
+				face_matches = { reference_set: (many_face_distances[reference_set][match_index] < face_distance).tolist() for reference_set in reference_faces }
+				track_id = get_face_track_id(face)
+
+				if isinstance(face, LazyFace) and track_id is not None:
+					with TRACK_IDENTITY_LOCK:
+						set_track_identity(track_id,
+						{
+							'face_distance': face_distance,
+							'face_matches': face_matches,
+							'verify_count': 0,
+							'verify_analysis': id(face.face_analysis)
+						})
+				many_face_matches[index] = face_matches
+				match_index += 1
+	return many_face_matches
+
+
+def get_track_face_matches(face : Face, face_distance : float) -> Optional[FaceMatches]:
+	track_id = get_face_track_id(face)
+
+	if isinstance(face, LazyFace) and track_id is not None:
+		with TRACK_IDENTITY_LOCK:
+			track_identity = get_track_identity(track_id)
+
+			if track_identity and track_identity.get('face_distance') == face_distance and track_identity.get('verify_count') < state_manager.get_item('face_tracker_verify_interval'):
+				if track_identity.get('verify_analysis') != id(face.face_analysis):
+					set_track_identity(track_id,
+					{
+						'face_distance': face_distance,
+						'face_matches': track_identity.get('face_matches'),
+						'verify_count': track_identity.get('verify_count') + 1,
+						'verify_analysis': id(face.face_analysis)
+					})
+				return track_identity.get('face_matches')
+	return None
+
+
+def create_embedding_matrix(faces : List[Face]) -> Optional[EmbeddingMatrix]:
+	if faces:
+		return numpy.ascontiguousarray(numpy.stack([ face.normed_embedding for face in faces ]))
+	return None
 
 
-def calc_face_distance(face : Face, reference_face : Face) -> float:
-	if hasattr(face, 'normed_embedding') and hasattr(reference_face, 'normed_embedding'):
-		return 1 - numpy.dot(face.normed_embedding, reference_face.normed_embedding)
-	return 0
+def calc_many_face_distances(face_embedding_matrix : EmbeddingMatrix, reference_embedding_matrix : Optional[EmbeddingMatrix]) -> FaceDistanceMatrix:
+	if reference_embedding_matrix is not None:
+		return 1 - numpy.dot(face_embedding_matrix, reference_embedding_matrix.T)
+	return numpy.zeros((len(face_embedding_matrix), 0))
 
 
 def sort_and_filter_faces(faces : List[Face]) -> List[Face]:
@@ -57,9 +114,9 @@ def sort_by_order(faces : List[Face], order : FaceSelectorOrder) -> List[Face]:
 	if order == 'large-small':
 		return sorted(faces, key = lambda face: (face.bounding_box[2] - face.bounding_box[0]) * (face.bounding_box[3] - face.bounding_box[1]), reverse = True)
 	if order == 'best-worst':
-		return sorted(faces, key = lambda face: face.score_set.get('detector'), reverse = True)
+		return sorted(faces, key = get_face_detector_score, reverse = True)
 	if order == 'worst-best':
-		return sorted(faces, key = lambda face: face.score_set.get('detector'))
+		return sorted(faces, key = get_face_detector_score)
 	return faces
 
 
@@ -1,40 +1,94 @@
 import hashlib
+import sys
 from typing import List, Optional
 
 import numpy
 
-from faceweave.typing import Face, FaceSet, FaceStore, VisionFrame
+from faceweave import state_manager
+from faceweave.cache_manager import clear_cache, estimate_size, get_cache_item, get_cache_items, register_cache, remove_cache_item, set_cache_item
+from faceweave.typing import Face, FaceSet, FaceStore, TrackId, TrackIdentity, VisionFrame
 
 FACE_STORE : FaceStore =\
 {
-	'static_faces': {},
 	'reference_faces': {}
 }
 
 
+def estimate_faces_size(faces : List[Face]) -> int:
+	from faceweave.face_analyser import LazyFace
+
+	face_analyses = { id(face.face_analysis): face.face_analysis for face in faces if isinstance(face, LazyFace) }
+	faces_size = sys.getsizeof(faces) + sum(sys.getsizeof(face) if isinstance(face, LazyFace) else estimate_size(face) for face in faces)
+
+	for face_analysis in face_analyses.values():
+		faces_size += estimate_size(face_analysis.get('vision_frame')) + estimate_size(face_analysis.get('face_attributes'))
+	return faces_size
+
+
+register_cache('static_faces', estimate_faces_size)
+register_cache('track_identities', estimate_size)
+
+
 def get_face_store() -> FaceStore:
 	return FACE_STORE
 
 
-def get_static_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
-	frame_hash = create_frame_hash(vision_frame)
-	if frame_hash in FACE_STORE['static_faces']:
-		return FACE_STORE['static_faces'][frame_hash]
+def get_static_faces(vision_frame : VisionFrame, frame_number : Optional[int] = None) -> Optional[List[Face]]:
+	frame_key = create_frame_key(vision_frame, frame_number)
+	if frame_key:
+		_, static_faces = get_cache_item('static_faces', frame_key)
+		return static_faces
 	return None
 
 
-def set_static_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
-	frame_hash = create_frame_hash(vision_frame)
-	if frame_hash:
-		FACE_STORE['static_faces'][frame_hash] = faces
+def get_static_face_set() -> FaceSet:
+	static_face_set : FaceSet = {}
 
+	for frame_key, static_faces in get_cache_items('static_faces').items():
+		static_face_set[str(frame_key)] = static_faces
+	return static_face_set
 
-def clear_static_faces() -> None:
-	FACE_STORE['static_faces'] = {}
+
+def set_static_faces(vision_frame : VisionFrame, faces : List[Face], frame_number : Optional[int] = None) -> None:
+	frame_key = create_frame_key(vision_frame, frame_number)
+	if frame_key:
+		set_cache_item('static_faces', frame_key, faces)
 
 
-def create_frame_hash(vision_frame : VisionFrame) -> Optional[str]:
-	return hashlib.sha1(vision_frame.tobytes()).hexdigest() if numpy.any(vision_frame) else None
+def remove_static_faces(vision_frame : VisionFrame, frame_number : Optional[int] = None) -> None:
+	frame_key = create_frame_key(vision_frame, frame_number)
+	if frame_key:
+		remove_cache_item('static_faces', frame_key)
+
+
+def clear_static_faces() -> None:
+	clear_cache('static_faces')
+
+
+def create_frame_key(vision_frame : VisionFrame, frame_number : Optional[int]) -> Optional[str]:
+	if isinstance(frame_number, int):
+		frame_identity = state_manager.get_item('target_path') + ':' + str(frame_number)
+	elif numpy.any(vision_frame):
+		frame_identity = create_frame_fingerprint(vision_frame)
+	else:
+		return None
+	frame_key =\
+	[
+		frame_identity,
+		'x'.join(map(str, vision_frame.shape)),
+		state_manager.get_item('face_detector_model'),
+		state_manager.get_item('face_detector_size'),
+		','.join(map(str, state_manager.get_item('face_detector_angles'))),
+		str(state_manager.get_item('face_detector_score')),
+		state_manager.get_item('face_landmarker_model'),
+		str(state_manager.get_item('face_landmarker_score')),
+		str(state_manager.get_item('face_tracker_interval'))
+	]
+	return '|'.join(frame_key)
+
+
+def create_frame_fingerprint(vision_frame : VisionFrame) -> str:
+	return hashlib.sha1(numpy.ascontiguousarray(vision_frame[::4, ::4]).tobytes()).hexdigest()
 
 
 def get_reference_faces() -> Optional[FaceSet]:
@@ -47,7 +101,26 @@ def append_reference_face(name : str, face : Face) -> None:
 	if name not in FACE_STORE['reference_faces']:
 		FACE_STORE['reference_faces'][name] = []
 	FACE_STORE['reference_faces'][name].append(face)
+	clear_track_identities()
 
 
 def clear_reference_faces() -> None:
 	FACE_STORE['reference_faces'] = {}
+	clear_track_identities()
+
+
+def get_track_identity(track_id : TrackId) -> Optional[TrackIdentity]:
+	_, track_identity = get_cache_item('track_identities', track_id)
+	return track_identity
+
+
+def set_track_identity(track_id : TrackId, track_identity : TrackIdentity) -> None:
+	set_cache_item('track_identities', track_id, track_identity)
+
+
+def remove_track_identity(track_id : TrackId) -> None:
+	remove_cache_item('track_identities', track_id)
+
+
+def clear_track_identities() -> None:
+	clear_cache('track_identities')
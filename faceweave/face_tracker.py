@@ -0,0 +1,76 @@
+import itertools
+from typing import Iterator, List, Optional
+
+import cv2
+import numpy
+
+from faceweave import state_manager
+from faceweave.typing import BoundingBox, FaceLandmark5, FaceLandmark68, Resolution, TrackId, VisionFrame
+
+TRACK_IDS : Iterator[TrackId] = itertools.count()
+
+
+def create_track_id() -> TrackId:
+	return next(TRACK_IDS)
+
+
+def is_keyframe(frame_number : Optional[int]) -> bool:
+	face_tracker_interval = state_manager.get_item('face_tracker_interval')
+	return not isinstance(frame_number, int) or face_tracker_interval < 2 or frame_number % face_tracker_interval == 0
+
+
+def create_frame_thumbnail(vision_frame : VisionFrame) -> VisionFrame:
+	frame_thumbnail = cv2.resize(vision_frame, (32, 32), interpolation = cv2.INTER_AREA)
+	return cv2.cvtColor(frame_thumbnail, cv2.COLOR_BGR2GRAY).astype(numpy.float32) / 255
+
+
+def is_scene_cut(frame_thumbnail : VisionFrame, previous_frame_thumbnail : VisionFrame) -> bool:
+	return bool(numpy.mean(numpy.abs(frame_thumbnail - previous_frame_thumbnail)) > 0.2)
+
+
+def has_untracked_change(frame_thumbnail : VisionFrame, previous_frame_thumbnail : VisionFrame, bounding_boxes : List[BoundingBox], frame_resolution : Resolution) -> bool:
+	untracked_mask = numpy.ones(frame_thumbnail.shape, dtype = bool)
+	thumbnail_scale = numpy.array(frame_thumbnail.shape[::-1]) / numpy.array(frame_resolution)
+
+	for bounding_box in bounding_boxes:
+		box_margin = (bounding_box[2:] - bounding_box[:2]) * 0.5
+		x1, y1 = numpy.floor((bounding_box[:2] - box_margin) * thumbnail_scale).clip(0).astype(int)
+		x2, y2 = numpy.ceil((bounding_box[2:] + box_margin) * thumbnail_scale).clip(0).astype(int)
+		untracked_mask[y1:y2, x1:x2] = False
+	return bool(numpy.any(numpy.abs(frame_thumbnail - previous_frame_thumbnail)[untracked_mask] > 0.25))
+
+
+def track_bounding_box(bounding_box : BoundingBox, previous_face_landmark_68 : FaceLandmark68, face_landmark_68 : FaceLandmark68) -> BoundingBox:
+	previous_center = numpy.mean(previous_face_landmark_68, axis = 0)
+	center = numpy.mean(face_landmark_68, axis = 0)
+	scale = numpy.std(face_landmark_68 - center) / max(numpy.std(previous_face_landmark_68 - previous_center), 1e-6)
+	box_center = (bounding_box[:2] + bounding_box[2:]) / 2 - previous_center
+	box_size = (bounding_box[2:] - bounding_box[:2]) / 2
+	return numpy.concatenate([ center + (box_center - box_size) * scale, center + (box_center + box_size) * scale ])
+
+
+def calc_bounding_box_iou(bounding_box : BoundingBox, other_bounding_box : BoundingBox) -> float:
+	x1, y1 = numpy.maximum(bounding_box[:2], other_bounding_box[:2])
+	x2, y2 = numpy.minimum(bounding_box[2:], other_bounding_box[2:])
+	intersection_area = max(x2 - x1, 0) * max(y2 - y1, 0)
+	union_area = numpy.prod(bounding_box[2:] - bounding_box[:2]) + numpy.prod(other_bounding_box[2:] - other_bounding_box[:2]) - intersection_area
+	return intersection_area / max(union_area, 1e-6)
+
+
+def calc_face_landmark_distance(face_landmark_5 : FaceLandmark5, previous_face_landmark_5 : FaceLandmark5, previous_bounding_box : BoundingBox) -> float:
+	box_size = numpy.sqrt(numpy.prod(previous_bounding_box[2:] - previous_bounding_box[:2]))
+	return float(numpy.mean(numpy.linalg.norm(face_landmark_5 - previous_face_landmark_5, axis = 1)) / max(box_size, 1e-6))
+
+
+def match_track_ids(bounding_boxes : List[BoundingBox], face_landmarks_5 : List[FaceLandmark5], previous_bounding_boxes : List[BoundingBox], previous_face_landmarks_5 : List[FaceLandmark5], previous_track_ids : List[TrackId]) -> List[TrackId]:
+	track_ids = [ create_track_id() for _ in bounding_boxes ]
+	track_pairs = sorted(((calc_bounding_box_iou(bounding_box, previous_bounding_box), index, previous_index) for index, bounding_box in enumerate(bounding_boxes) for previous_index, previous_bounding_box in enumerate(previous_bounding_boxes)), reverse = True)
+	matched_indices = set()
+	matched_previous_indices = set()
+
+	for track_iou, index, previous_index in track_pairs:
+		if track_iou > 0.3 and calc_face_landmark_distance(face_landmarks_5[index], previous_face_landmarks_5[previous_index], previous_bounding_boxes[previous_index]) < 0.25 and index not in matched_indices and previous_index not in matched_previous_indices:
+			track_ids[index] = previous_track_ids[previous_index]
+			matched_indices.add(index)
+			matched_previous_indices.add(previous_index)
+	return track_ids
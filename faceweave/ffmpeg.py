@@ -2,15 +2,17 @@ import os
 import shutil
 import subprocess
 import tempfile
+from io import BufferedReader
 from typing import List, Optional
 
 import filetype
+import numpy
 
 from faceweave import logger, process_manager, state_manager
 from faceweave.filesystem import remove_file
 from faceweave.temp_helper import get_temp_file_path, get_temp_frames_pattern
-from faceweave.typing import AudioBuffer, Fps, OutputVideoPreset
-from faceweave.vision import restrict_video_fps
+from faceweave.typing import AudioBuffer, Fps, OutputVideoPreset, VisionFrame
+from faceweave.vision import restrict_video_fps, unpack_resolution
 
 
 def run_ffmpeg(args : List[str]) -> subprocess.Popen[bytes]:
@@ -38,6 +40,11 @@ def open_ffmpeg(args : List[str]) -> subprocess.Popen[bytes]:
 	return subprocess.Popen(commands, stdin = subprocess.PIPE, stdout = subprocess.PIPE)
 
 
+def close_ffmpeg(process : subprocess.Popen[bytes]) -> None:
+	process.terminate()
+	process.wait()
+
+
 def log_debug(process : subprocess.Popen[bytes]) -> None:
 	_, stderr = process.communicate()
 	errors = stderr.decode().split(os.linesep)
@@ -48,28 +55,63 @@ def log_debug(process : subprocess.Popen[bytes]) -> None:
 
 
 def extract_frames(target_path : str, temp_video_resolution : str, temp_video_fps : Fps) -> bool:
-	trim_frame_start = state_manager.get_item('trim_frame_start')
-	trim_frame_end = state_manager.get_item('trim_frame_end')
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
 	commands = [ '-i', target_path, '-s', str(temp_video_resolution), '-q:v', '0' ]
-
-	if isinstance(trim_frame_start, int) and isinstance(trim_frame_end, int):
-		commands.extend([ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ':end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ])
-	elif isinstance(trim_frame_start, int):
-		commands.extend([ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ',fps=' + str(temp_video_fps) ])
-	elif isinstance(trim_frame_end, int):
-		commands.extend([ '-vf', 'trim=end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ])
-	else:
-		commands.extend([ '-vf', 'fps=' + str(temp_video_fps) ])
+	commands.extend(create_frame_filter_commands(temp_video_fps))
 	commands.extend([ '-vsync', '0', temp_frames_pattern ])
 	return run_ffmpeg(commands).returncode == 0
 
 
+def open_video_decoder(target_path : str, temp_video_resolution : str, temp_video_fps : Fps) -> subprocess.Popen[bytes]:
+	commands = [ '-i', target_path, '-s', str(temp_video_resolution) ]
+	commands.extend(create_frame_filter_commands(temp_video_fps))
+	commands.extend([ '-vsync', '0', '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-' ])
+	return open_ffmpeg(commands)
+
+
+def read_video_decoder_frame(process : subprocess.Popen[bytes], temp_video_resolution : str) -> Optional[VisionFrame]:
+	temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+	frame_buffer = bytearray(temp_video_width * temp_video_height * 3)
+
+	if isinstance(process.stdout, BufferedReader) and process.stdout.readinto(frame_buffer) == len(frame_buffer):
+		return numpy.frombuffer(frame_buffer, dtype = numpy.uint8).reshape(temp_video_height, temp_video_width, 3)
+	return None
+
+
+def create_frame_filter_commands(temp_video_fps : Fps) -> List[str]:
+	trim_frame_start = state_manager.get_item('trim_frame_start')
+	trim_frame_end = state_manager.get_item('trim_frame_end')
+
+	if isinstance(trim_frame_start, int) and isinstance(trim_frame_end, int):
+		return [ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ':end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ]
+	if isinstance(trim_frame_start, int):
+		return [ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ',fps=' + str(temp_video_fps) ]
+	if isinstance(trim_frame_end, int):
+		return [ '-vf', 'trim=end_frame=' + str(trim_frame_end) + ',fps=' + str(temp_video_fps) ]
+	return [ '-vf', 'fps=' + str(temp_video_fps) ]
+
+
 def merge_video(target_path : str, output_video_resolution : str, output_video_fps : Fps) -> bool:
 	temp_video_fps = restrict_video_fps(target_path, output_video_fps)
 	temp_file_path = get_temp_file_path(target_path)
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%08d')
-	commands = [ '-r', str(temp_video_fps), '-i', temp_frames_pattern, '-s', str(output_video_resolution), '-c:v', state_manager.get_item('output_video_encoder') ]
+	commands = [ '-r', str(temp_video_fps), '-i', temp_frames_pattern, '-s', str(output_video_resolution) ]
+	commands.extend(create_video_encoder_commands())
+	commands.extend([ '-vf', 'framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', temp_file_path ])
+	return run_ffmpeg(commands).returncode == 0
+
+
+def open_video_encoder(target_path : str, temp_video_resolution : str, output_video_resolution : str, output_video_fps : Fps) -> subprocess.Popen[bytes]:
+	temp_video_fps = restrict_video_fps(target_path, output_video_fps)
+	temp_file_path = get_temp_file_path(target_path)
+	commands = [ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', str(temp_video_resolution), '-r', str(temp_video_fps), '-i', '-', '-s', str(output_video_resolution) ]
+	commands.extend(create_video_encoder_commands())
+	commands.extend([ '-vf', 'framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', temp_file_path ])
+	return open_ffmpeg(commands)
+
+
+def create_video_encoder_commands() -> List[str]:
+	commands = [ '-c:v', state_manager.get_item('output_video_encoder') ]
 
 	if state_manager.get_item('output_video_encoder') in [ 'libx264', 'libx265' ]:
 		output_video_compression = round(51 - (state_manager.get_item('output_video_quality') * 0.51))
@@ -85,8 +127,7 @@ def merge_video(target_path : str, output_video_resolution : str, output_video_f
 		commands.extend([ '-qp_i', str(output_video_compression), '-qp_p', str(output_video_compression), '-quality', map_amf_preset(state_manager.get_item('output_video_preset')) ])
 	if state_manager.get_item('output_video_encoder') in [ 'h264_videotoolbox', 'hevc_videotoolbox' ]:
 		commands.extend([ '-q:v', str(state_manager.get_item('output_video_quality')) ])
-	commands.extend([ '-vf', 'framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', temp_file_path ])
-	return run_ffmpeg(commands).returncode == 0
+	return commands
 
 
 def concat_video(output_path : str, temp_output_paths : List[str]) -> bool:
@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Set
+
+import cv2
+import numpy
+
+from faceweave import state_manager
+from faceweave.filesystem import copy_file
+from faceweave.typing import FrameGroups, VisionFrame
+from faceweave.vision import read_image
+
+FRAME_GROUPS : FrameGroups = {}
+DUPLICATE_FRAME_PATHS : Set[str] = set()
+FRAME_DEPENDENT_PROCESSORS : List[str] = [ 'lip_syncer' ]
+
+
+def group_duplicate_frames(temp_frame_paths : List[str]) -> FrameGroups:
+	duplicate_frame_threshold = state_manager.get_item('duplicate_frame_threshold')
+	clear_frame_groups()
+
+	if isinstance(duplicate_frame_threshold, int) and not any(processor in FRAME_DEPENDENT_PROCESSORS for processor in state_manager.get_item('processors')):
+		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+			frame_fingerprints = executor.map(create_frame_fingerprint, temp_frame_paths)
+			leader_frame_path = None
+			leader_frame_fingerprint = None
+
+			for temp_frame_path, frame_fingerprint in zip(temp_frame_paths, frame_fingerprints):
+				if is_duplicate_frame_fingerprint(leader_frame_fingerprint, frame_fingerprint, duplicate_frame_threshold):
+					FRAME_GROUPS[leader_frame_path].append(temp_frame_path)
+					DUPLICATE_FRAME_PATHS.add(temp_frame_path)
+				else:
+					leader_frame_path = temp_frame_path
+					leader_frame_fingerprint = frame_fingerprint
+					FRAME_GROUPS[leader_frame_path] = []
+	return FRAME_GROUPS
+
+
+def create_frame_fingerprint(temp_frame_path : str) -> Optional[VisionFrame]:
+	vision_frame = read_image(temp_frame_path)
+
+	if numpy.any(vision_frame):
+		vision_frame = cv2.cvtColor(vision_frame, cv2.COLOR_BGR2GRAY)
+		return cv2.resize(vision_frame, (64, 64), interpolation = cv2.INTER_AREA).astype(numpy.int16)
+	return None
+
+
+def is_duplicate_frame_fingerprint(frame_fingerprint : Optional[VisionFrame], other_frame_fingerprint : Optional[VisionFrame], duplicate_frame_threshold : int) -> bool:
+	if frame_fingerprint is not None and other_frame_fingerprint is not None:
+		return bool(numpy.max(numpy.abs(frame_fingerprint - other_frame_fingerprint)) <= duplicate_frame_threshold)
+	return False
+
+
+def is_duplicate_frame(temp_frame_path : str) -> bool:
+	return temp_frame_path in DUPLICATE_FRAME_PATHS
+
+
+def reuse_duplicate_frames() -> None:
+	for leader_frame_path, temp_frame_paths in FRAME_GROUPS.items():
+		for temp_frame_path in temp_frame_paths:
+			copy_file(leader_frame_path, temp_frame_path)
+
+
+def count_duplicate_frames() -> int:
+	return len(DUPLICATE_FRAME_PATHS)
+
+
+def clear_frame_groups() -> None:
+	FRAME_GROUPS.clear()
+	DUPLICATE_FRAME_PATHS.clear()
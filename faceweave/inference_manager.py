@@ -1,21 +1,36 @@
-from functools import lru_cache
-from time import sleep
-from typing import List
+import os
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import partial
+from queue import Empty, Queue
+from time import sleep, time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
+import numpy
 import onnx
-from onnxruntime import InferenceSession
+from onnxruntime import InferenceSession, SessionOptions
 
-from faceweave import process_manager, state_manager
+from faceweave import logger, process_manager, state_manager, wording
 from faceweave.app_context import detect_app_context
+from faceweave.cache_manager import estimate_size, static_cache
+from faceweave.common_helper import get_first
 from faceweave.execution import create_execution_providers, has_execution_provider
-from faceweave.thread_helper import thread_lock
-from faceweave.typing import DownloadSet, ExecutionProviderKey, InferencePool, InferencePoolSet, ModelInitializer
+from faceweave.filesystem import is_file
+from faceweave.thread_helper import thread_lock, thread_semaphore
+from faceweave.typing import DownloadSet, ExecutionConcurrencyPolicy, ExecutionProviderKey, InferenceBatcher, InferenceBatcherSet, InferenceConcurrencySet, InferenceInputs, InferenceOutputs, InferencePool, InferencePoolSet, InferenceRequest, ModelInitializer
 
 INFERENCE_POOLS : InferencePoolSet =\
 {
 	'cli': {}, # type:ignore[typeddict-item]
 	'ui': {} # type:ignore[typeddict-item]
 }
+INFERENCE_BATCHERS : InferenceBatcherSet = {}
+INFERENCE_BATCHER_LOCK : threading.Lock = threading.Lock()
+INFERENCE_CONCURRENCIES : InferenceConcurrencySet = {}
+INFERENCE_CONCURRENCY_LOCK : threading.Lock = threading.Lock()
+INFERENCE_BATCH_SESSIONS : Dict[InferenceSession, InferenceSession] = {}
+INFERENCE_BATCH_LOCK : threading.Lock = threading.Lock()
 
 
 def get_inference_pool(model_context : str, model_sources : DownloadSet) -> InferencePool:
@@ -49,15 +64,301 @@ def clear_inference_pool(model_context : str) -> None:
 	inference_context = get_inference_context(model_context)
 
 	if INFERENCE_POOLS.get(app_context).get(inference_context):
+		for inference_session in INFERENCE_POOLS.get(app_context).get(inference_context).values():
+			clear_batch_session(inference_session)
+			stop_inference_batcher(inference_session)
+			clear_inference_concurrency(inference_session)
 		del INFERENCE_POOLS[app_context][inference_context]
 
 
 def create_inference_session(model_path : str, execution_device_id : str, execution_provider_keys : List[ExecutionProviderKey]) -> InferenceSession:
 	execution_providers = create_execution_providers(execution_device_id, execution_provider_keys)
-	return InferenceSession(model_path, providers = execution_providers)
+	concurrency_policy = resolve_concurrency_policy(execution_provider_keys)
+	concurrency_total = resolve_concurrency_total(execution_provider_keys)
+	session_options = create_session_options(concurrency_policy, concurrency_total)
+	inference_session = InferenceSession(model_path, sess_options = session_options, providers = execution_providers)
+	register_inference_concurrency(inference_session, model_path, session_options, execution_providers, concurrency_policy, create_concurrency_semaphore(execution_provider_keys, concurrency_total))
+	return inference_session
 
 
-@lru_cache(maxsize = None)
+def register_inference_concurrency(inference_session : InferenceSession, model_path : str, session_options : SessionOptions, execution_providers : List[Any], concurrency_policy : ExecutionConcurrencyPolicy, concurrency_semaphore : threading.Semaphore) -> None:
+	session_queue : Queue[InferenceSession] = Queue()
+	session_queue.put(inference_session)
+
+	with INFERENCE_CONCURRENCY_LOCK:
+		INFERENCE_CONCURRENCIES[inference_session] =\
+		{
+			'policy': concurrency_policy,
+			'semaphore': concurrency_semaphore,
+			'session_queue': session_queue,
+			'session_factory': partial(InferenceSession, model_path, sess_options = session_options, providers = execution_providers),
+			'batch_factory': partial(create_batch_session, model_path, inference_session, session_options, execution_providers)
+		}
+
+
+def create_session_options(concurrency_policy : ExecutionConcurrencyPolicy, concurrency_total : int) -> SessionOptions:
+	session_options = SessionOptions()
+
+	if concurrency_policy == 'replica':
+		session_options.intra_op_num_threads = max(1, (os.cpu_count() or 1) // concurrency_total)
+	return session_options
+
+
+def resolve_concurrency_policy(execution_provider_keys : List[ExecutionProviderKey]) -> ExecutionConcurrencyPolicy:
+	if state_manager.get_item('execution_concurrency_policy') == 'auto':
+		if execution_provider_keys == [ 'cpu' ]:
+			return 'replica'
+		return 'semaphore'
+	return state_manager.get_item('execution_concurrency_policy')
+
+
+def resolve_concurrency_total(execution_provider_keys : List[ExecutionProviderKey]) -> int:
+	if 'directml' in execution_provider_keys or 'rocm' in execution_provider_keys:
+		return 1
+	return state_manager.get_item('execution_thread_count')
+
+
+def create_concurrency_semaphore(execution_provider_keys : List[ExecutionProviderKey], concurrency_total : int) -> threading.Semaphore:
+	if 'directml' in execution_provider_keys or 'rocm' in execution_provider_keys:
+		return thread_semaphore()
+	return threading.BoundedSemaphore(concurrency_total)
+
+
+@contextmanager
+def acquire_inference_session(inference_session : InferenceSession) -> Iterator[InferenceSession]:
+	inference_concurrency = INFERENCE_CONCURRENCIES.get(inference_session)
+
+	if inference_concurrency:
+		with inference_concurrency.get('semaphore'):
+			if inference_concurrency.get('policy') == 'replica':
+				session_queue = inference_concurrency.get('session_queue')
+
+				try:
+					replica_session = session_queue.get_nowait()
+				except Empty:
+					replica_session = inference_concurrency.get('session_factory')()
+				try:
+					yield replica_session
+				finally:
+					session_queue.put(replica_session)
+			else:
+				yield inference_session
+	else:
+		yield inference_session
+
+
+def run_session(inference_session : InferenceSession, input_feed : InferenceInputs) -> InferenceOutputs:
+	with acquire_inference_session(inference_session) as replica_session:
+		return replica_session.run(None, input_feed)
+
+
+def clear_inference_concurrency(inference_session : InferenceSession) -> None:
+	with INFERENCE_CONCURRENCY_LOCK:
+		INFERENCE_CONCURRENCIES.pop(inference_session, None)
+
+
+def has_dynamic_batch(inference_session : InferenceSession) -> bool:
+	return all(not isinstance(session_input.shape[0], int) for session_input in inference_session.get_inputs())
+
+
+def get_batch_session(inference_session : InferenceSession) -> InferenceSession:
+	if has_dynamic_batch(inference_session):
+		return inference_session
+
+	with INFERENCE_BATCH_LOCK:
+		if inference_session not in INFERENCE_BATCH_SESSIONS:
+			inference_concurrency = INFERENCE_CONCURRENCIES.get(inference_session)
+			INFERENCE_BATCH_SESSIONS[inference_session] = inference_session
+
+			if inference_concurrency:
+				INFERENCE_BATCH_SESSIONS[inference_session] = inference_concurrency.get('batch_factory')()
+		return INFERENCE_BATCH_SESSIONS.get(inference_session)
+
+
+def create_batch_session(model_path : str, inference_session : InferenceSession, session_options : SessionOptions, execution_providers : List[Any]) -> InferenceSession:
+	dynamic_model_path, dynamic_session = resolve_dynamic_batch_session(model_path, inference_session, session_options, execution_providers)
+	inference_concurrency = INFERENCE_CONCURRENCIES.get(inference_session)
+
+	if dynamic_session is inference_session:
+		logger.info(wording.get('dynamic_batch_not_supported').format(model_name = os.path.basename(model_path)), __name__)
+		return inference_session
+	register_inference_concurrency(dynamic_session, dynamic_model_path, session_options, execution_providers, inference_concurrency.get('policy'), inference_concurrency.get('semaphore'))
+	return dynamic_session
+
+
+def clear_batch_session(inference_session : InferenceSession) -> None:
+	with INFERENCE_BATCH_LOCK:
+		batch_session = INFERENCE_BATCH_SESSIONS.pop(inference_session, inference_session)
+
+	if batch_session is not inference_session:
+		stop_inference_batcher(batch_session)
+		clear_inference_concurrency(batch_session)
+
+
+def resolve_dynamic_batch_session(model_path : str, inference_session : InferenceSession, session_options : SessionOptions, execution_providers : List[Any]) -> Tuple[str, InferenceSession]:
+	dynamic_model_path = os.path.splitext(model_path)[0] + '.dynamic.onnx'
+
+	try:
+		if not is_file(dynamic_model_path):
+			onnx.save(create_dynamic_batch_model(onnx.load(model_path)), dynamic_model_path)
+		dynamic_session = InferenceSession(dynamic_model_path, sess_options = session_options, providers = execution_providers)
+	except Exception:
+		return model_path, inference_session
+	if verify_dynamic_batch(inference_session, dynamic_session):
+		return dynamic_model_path, dynamic_session
+	return model_path, inference_session
+
+
+def create_dynamic_batch_model(model : onnx.ModelProto) -> onnx.ModelProto:
+	for value_info in list(model.graph.input) + list(model.graph.output):
+		value_info.type.tensor_type.shape.dim[0].dim_param = 'batch'
+	del model.graph.value_info[:]
+	return model
+
+
+def verify_dynamic_batch(inference_session : InferenceSession, dynamic_session : InferenceSession) -> bool:
+	batch_inputs = []
+
+	for _ in range(2):
+		batch_input = {}
+
+		for session_input in inference_session.get_inputs():
+			if session_input.type != 'tensor(float)':
+				return False
+			input_shape = [ 1 ] + [ dimension if isinstance(dimension, int) else 64 for dimension in session_input.shape[1:] ]
+			batch_input[session_input.name] = numpy.random.rand(*input_shape).astype(numpy.float32)
+		batch_inputs.append(batch_input)
+
+	try:
+		batch_outputs = run_merged_batch(dynamic_session, batch_inputs)
+		return all(output.shape == batch_output.shape and numpy.allclose(output, batch_output, atol = 1e-4) for batch_input, batch_output_set in zip(batch_inputs, batch_outputs) for output, batch_output in zip(inference_session.run(None, batch_input), batch_output_set))
+	except Exception:
+		return False
+
+
+def has_inference_batcher(inference_session : InferenceSession) -> bool:
+	return state_manager.get_item('execution_batch_size') > 1 and has_dynamic_batch(inference_session)
+
+
+def run_inference(inference_session : InferenceSession, input_feed : InferenceInputs) -> InferenceOutputs:
+	return get_first(run_batch(inference_session, [ input_feed ]))
+
+
+def run_batch(inference_session : InferenceSession, batch_inputs : List[InferenceInputs]) -> List[InferenceOutputs]:
+	if (len(batch_inputs) > 1 or state_manager.get_item('execution_batch_size') > 1) and all(map(is_batchable_input, batch_inputs)):
+		inference_session = get_batch_session(inference_session)
+	if has_inference_batcher(inference_session) and all(map(is_batchable_input, batch_inputs)):
+		inference_futures = [ submit_inference(inference_session, batch_input) for batch_input in batch_inputs ]
+		return [ inference_future.result() for inference_future in inference_futures ]
+	if len(batch_inputs) > 1 and has_dynamic_batch(inference_session) and all(map(is_batchable_input, batch_inputs)):
+		return run_merged_batch(inference_session, batch_inputs)
+	return [ run_session(inference_session, batch_input) for batch_input in batch_inputs ]
+
+
+def run_merged_batch(inference_session : InferenceSession, batch_inputs : List[InferenceInputs]) -> List[InferenceOutputs]:
+	batch_outputs = []
+	batch_offset = 0
+	input_feed = { input_name: numpy.concatenate([ batch_input.get(input_name) for batch_input in batch_inputs ]) for input_name in batch_inputs[0].keys() }
+	outputs = run_session(inference_session, input_feed)
+
+	for batch_input in batch_inputs:
+		batch_total = len(get_first(list(batch_input.values())))
+		batch_outputs.append([ output[batch_offset:batch_offset + batch_total] for output in outputs ])
+		batch_offset += batch_total
+	return batch_outputs
+
+
+def is_batchable_input(batch_input : InferenceInputs) -> bool:
+	return all(isinstance(input_value, numpy.ndarray) for input_value in batch_input.values())
+
+
+def create_batch_key(batch_input : InferenceInputs) -> Tuple[Any, ...]:
+	return tuple((input_name, input_value.shape[1:], input_value.dtype.str) for input_name, input_value in batch_input.items())
+
+
+def submit_inference(inference_session : InferenceSession, input_feed : InferenceInputs) -> Future[InferenceOutputs]:
+	inference_future : Future[InferenceOutputs] = Future()
+
+	with INFERENCE_BATCHER_LOCK:
+		inference_batcher = get_inference_batcher(inference_session)
+		inference_batcher.get('queue').put(
+		{
+			'input_feed': input_feed,
+			'future': inference_future
+		})
+	return inference_future
+
+
+def get_inference_batcher(inference_session : InferenceSession) -> InferenceBatcher:
+	if inference_session not in INFERENCE_BATCHERS:
+		inference_queue : Queue[Optional[InferenceRequest]] = Queue()
+		inference_thread = threading.Thread(target = process_inference_queue, args = (inference_session, inference_queue, state_manager.get_item('execution_batch_size'), state_manager.get_item('execution_batch_timeout')), daemon = True)
+		inference_thread.start()
+		INFERENCE_BATCHERS[inference_session] =\
+		{
+			'queue': inference_queue,
+			'thread': inference_thread
+		}
+	return INFERENCE_BATCHERS.get(inference_session)
+
+
+def stop_inference_batcher(inference_session : InferenceSession) -> None:
+	with INFERENCE_BATCHER_LOCK:
+		inference_batcher = INFERENCE_BATCHERS.pop(inference_session, None)
+
+		if inference_batcher:
+			inference_queue = inference_batcher.get('queue')
+
+			while not inference_queue.empty():
+				try:
+					inference_request = inference_queue.get_nowait()
+				except Empty:
+					break
+				if inference_request:
+					inference_request.get('future').set_exception(RuntimeError('inference batcher stopped'))
+			inference_queue.put(None)
+
+
+def process_inference_queue(inference_session : InferenceSession, inference_queue : Queue[Optional[InferenceRequest]], execution_batch_size : int, execution_batch_timeout : int) -> None:
+	while True:
+		inference_request = inference_queue.get()
+
+		if inference_request is None:
+			return
+		inference_requests = [ inference_request ]
+		batch_deadline = time() + execution_batch_timeout / 1000
+
+		while len(inference_requests) < execution_batch_size:
+			try:
+				inference_request = inference_queue.get(timeout = max(batch_deadline - time(), 0))
+			except Empty:
+				break
+			if inference_request is None:
+				inference_queue.put(None)
+				break
+			inference_requests.append(inference_request)
+		process_inference_requests(inference_session, inference_requests)
+
+
+def process_inference_requests(inference_session : InferenceSession, inference_requests : List[InferenceRequest]) -> None:
+	inference_groups : Dict[Tuple[Any, ...], List[InferenceRequest]] = {}
+
+	for inference_request in inference_requests:
+		batch_key = create_batch_key(inference_request.get('input_feed'))
+		inference_groups.setdefault(batch_key, []).append(inference_request)
+
+	for inference_group in inference_groups.values():
+		try:
+			batch_outputs = run_merged_batch(inference_session, [ inference_request.get('input_feed') for inference_request in inference_group ])
+		except Exception as exception:
+			for inference_request in inference_group:
+				inference_request.get('future').set_exception(exception)
+		else:
+			for inference_request, batch_output in zip(inference_group, batch_outputs):
+				inference_request.get('future').set_result(batch_output)
+
+
+@static_cache('static_model_initializer', estimate_size)
 def get_static_model_initializer(model_path : str) -> ModelInitializer:
 	model = onnx.load(model_path)
 	return onnx.numpy_helper.to_array(model.graph.initializer[-1])
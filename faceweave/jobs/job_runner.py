@@ -1,9 +1,11 @@
+from faceweave.app_context import scope_app_context
 from faceweave.ffmpeg import concat_video
 from faceweave.filesystem import is_image, is_video, move_file, remove_file
 from faceweave.jobs import job_helper, job_manager
 from faceweave.typing import JobOutputSet, JobStep, ProcessStep
 
 
+@scope_app_context('cli')
 def run_job(job_id : str, process_step : ProcessStep) -> bool:
 	queued_job_ids = job_manager.find_job_ids('queued')
 
@@ -16,6 +18,7 @@ def run_job(job_id : str, process_step : ProcessStep) -> bool:
 	return False
 
 
+@scope_app_context('cli')
 def run_jobs(process_step : ProcessStep) -> bool:
 	queued_job_ids = job_manager.find_job_ids('queued')
 
@@ -27,6 +30,7 @@ def run_jobs(process_step : ProcessStep) -> bool:
 	return False
 
 
+@scope_app_context('cli')
 def retry_job(job_id : str, process_step : ProcessStep) -> bool:
 	failed_job_ids = job_manager.find_job_ids('failed')
 
@@ -35,6 +39,7 @@ def retry_job(job_id : str, process_step : ProcessStep) -> bool:
 	return False
 
 
+@scope_app_context('cli')
 def retry_jobs(process_step : ProcessStep) -> bool:
 	failed_job_ids = job_manager.find_job_ids('failed')
 
@@ -1,4 +1,10 @@
+from typing import List
+
+import psutil
+
 from faceweave.common_helper import is_macos, is_windows
+from faceweave.execution import detect_static_execution_devices
+from faceweave.typing import ExecutionProviderKey
 
 if is_windows():
 	import ctypes
@@ -19,3 +25,13 @@ def limit_system_memory(system_memory_limit : int = 1) -> bool:
 		return True
 	except Exception:
 		return False
+
+
+def detect_available_memory(execution_device_id : str, execution_providers : List[ExecutionProviderKey]) -> int:
+	if 'cuda' in execution_providers or 'tensorrt' in execution_providers:
+		execution_devices = detect_static_execution_devices()
+
+		if int(execution_device_id) < len(execution_devices):
+			video_memory_free = execution_devices[int(execution_device_id)].get('video_memory').get('free')
+			return video_memory_free.get('value') * 1024 ** 2
+	return psutil.virtual_memory().available
@@ -1,7 +1,7 @@
 from typing import List, Sequence
 
 from faceweave.common_helper import create_float_range, create_int_range
-from faceweave.processors.typing import AgeModifierModel, ExpressionRestorerModel, FaceDebuggerItem, FaceEditorModel, FaceEnhancerModel, FaceSwapperSet, FrameColorizerModel, FrameEnhancerModel, LipSyncerModel
+from faceweave.processors.typing import AgeModifierModel, ExpressionRestorerModel, FaceDebuggerItem, FaceEditorModel, FaceEnhancerModel, FaceSwapperSet, FrameColorizerModel, FrameEnhancerModel, FrameEnhancerTileSize, LipSyncerModel
 
 age_modifier_models : List[AgeModifierModel] = [ 'styleganex_age' ]
 expression_restorer_models : List[ExpressionRestorerModel] = [ 'live_portrait' ]
@@ -23,6 +23,7 @@ face_swapper_set : FaceSwapperSet =\
 frame_colorizer_models : List[FrameColorizerModel] = [ 'ddcolor', 'ddcolor_artistic', 'deoldify', 'deoldify_artistic', 'deoldify_stable' ]
 frame_colorizer_sizes : List[str] = [ '192x192', '256x256', '384x384', '512x512' ]
 frame_enhancer_models : List[FrameEnhancerModel] = [ 'clear_reality_x4', 'lsdir_x4', 'nomos8k_sc_x4', 'real_esrgan_x2', 'real_esrgan_x2_fp16', 'real_esrgan_x4', 'real_esrgan_x4_fp16', 'real_esrgan_x8', 'real_esrgan_x8_fp16', 'real_hatgan_x4', 'span_kendata_x4', 'ultra_sharp_x4' ]
+frame_enhancer_tile_sizes : List[FrameEnhancerTileSize] = [ 'model', 'auto' ]
 lip_syncer_models : List[LipSyncerModel] = [ 'wav2lip', 'wav2lip_gan' ]
 
 age_modifier_direction_range : Sequence[int] = create_int_range(-100, 100, 1)
@@ -44,3 +45,4 @@ face_editor_head_roll_range : Sequence[float] = create_float_range(-1.0, 1.0, 0.
 face_enhancer_blend_range : Sequence[int] = create_int_range(0, 100, 1)
 frame_colorizer_blend_range : Sequence[int] = create_int_range(0, 100, 1)
 frame_enhancer_blend_range : Sequence[int] = create_int_range(0, 100, 1)
+frame_enhancer_batch_size_range : Sequence[int] = create_int_range(1, 16, 1)
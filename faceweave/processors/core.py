@@ -1,15 +1,27 @@
 import importlib
+import itertools
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from queue import Queue
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from functools import partial
+from queue import Empty, Queue
+from time import time
 from types import ModuleType
-from typing import Any, List
+from typing import Any, Deque, Dict, Iterator, List, Optional
 
 from tqdm import tqdm
 
-from faceweave import logger, state_manager, wording
+from faceweave import logger, process_manager, state_manager, wording
 from faceweave.exit_helper import hard_exit
-from faceweave.typing import ProcessFrames, QueuePayload
+from faceweave.face_analyser import get_many_frame_faces, release_frame_faces, release_many_frame_faces
+from faceweave.face_store import remove_static_faces
+from faceweave.ffmpeg import close_ffmpeg, open_video_decoder, open_video_encoder, read_video_decoder_frame
+from faceweave.frame_deduplicator import is_duplicate_frame
+from faceweave.processors.process_pool import clear_process_pools, create_frame_ring, destroy_frame_ring, get_process_pool, process_ring_payloads, process_worker_payloads, read_frame_ring, write_frame_ring
+from faceweave.typing import Fps, FrameRing, ProcessFrames, QueuePayload, UpdateProgress, VisionFrame, WorkerStatistics
+from faceweave.vision import pack_resolution, predict_video_frame_total, read_image, unpack_resolution, write_image
 
 PROCESSORS_METHODS =\
 [
@@ -26,6 +38,29 @@ PROCESSORS_METHODS =\
 	'process_image',
 	'process_video'
 ]
+FACE_PROCESSORS =\
+[
+	'age_modifier',
+	'expression_restorer',
+	'face_debugger',
+	'face_editor',
+	'face_enhancer',
+	'face_swapper',
+	'lip_syncer'
+]
+FRAME_EXECUTORS : Dict[int, ThreadPoolExecutor] = {}
+FRAME_EXECUTOR_LOCK : threading.Lock = threading.Lock()
+WORKER_STATISTICS : List[WorkerStatistics] = []
+FRAME_STAGES : Iterator[int] = itertools.count()
+GEOMETRY_PRESERVING_PROCESSORS =\
+[
+	'expression_restorer',
+	'face_debugger',
+	'face_enhancer',
+	'face_swapper',
+	'frame_colorizer',
+	'lip_syncer'
+]
 
 
 def load_processor_module(processor : str) -> Any:
@@ -59,26 +94,251 @@ def clear_processors_modules(processors : List[str]) -> None:
 		processor_module.clear_inference_pool()
 
 
+def get_frame_executor(execution_thread_count : int) -> ThreadPoolExecutor:
+	with FRAME_EXECUTOR_LOCK:
+		for thread_count in list(FRAME_EXECUTORS.keys()):
+			if thread_count != execution_thread_count:
+				FRAME_EXECUTORS.pop(thread_count).shutdown(wait = False)
+
+		if execution_thread_count not in FRAME_EXECUTORS:
+			FRAME_EXECUTORS[execution_thread_count] = ThreadPoolExecutor(max_workers = execution_thread_count, thread_name_prefix = 'frame_worker')
+		return FRAME_EXECUTORS.get(execution_thread_count)
+
+
+def get_worker_statistics() -> List[WorkerStatistics]:
+	return WORKER_STATISTICS
+
+
 def multi_process_frames(source_paths : List[str], temp_frame_paths : List[str], process_frames : ProcessFrames) -> None:
-	queue_payloads = create_queue_payloads(temp_frame_paths)
+	execution_thread_count = state_manager.get_item('execution_thread_count')
+	execution_queue_count = state_manager.get_item('execution_queue_count')
+	queue_payloads = [ queue_payload for queue_payload in create_queue_payloads(temp_frame_paths) if not is_duplicate_frame(queue_payload.get('frame_path')) ]
+
 	with tqdm(total = len(queue_payloads), desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
 		progress.set_postfix(
 		{
 			'execution_providers': state_manager.get_item('execution_providers'),
-			'execution_thread_count': state_manager.get_item('execution_thread_count'),
-			'execution_queue_count': state_manager.get_item('execution_queue_count')
+			'execution_thread_count': execution_thread_count,
+			'execution_queue_count': execution_queue_count
 		})
-		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
-			futures = []
+		start_time = time()
+
+		if state_manager.get_item('execution_mode') == 'process':
+			worker_statistics = multi_process_pool_frames(source_paths, queue_payloads, process_frames, progress.update)
+		else:
+			executor = get_frame_executor(execution_thread_count)
 			queue : Queue[QueuePayload] = create_queue(queue_payloads)
-			queue_per_future = max(len(queue_payloads) // state_manager.get_item('execution_thread_count') * state_manager.get_item('execution_queue_count'), 1)
+			futures = [ executor.submit(process_worker_frames, source_paths, queue, process_frames, progress.update) for _ in range(execution_thread_count) ]
+			worker_statistics = [ future.result() for future in futures ]
+		process_time = max(time() - start_time, 1e-6)
+
+	WORKER_STATISTICS.clear()
+	for worker_index, worker_statistic in enumerate(worker_statistics):
+		worker_statistic['utilization'] = round(worker_statistic.get('busy_time') / process_time, 2)
+		WORKER_STATISTICS.append(worker_statistic)
+		logger.debug(wording.get('worker_utilization').format(worker_index = worker_index, frame_total = worker_statistic.get('frame_total'), utilization = worker_statistic.get('utilization')), __name__)
+
+
+def multi_process_pool_frames(source_paths : List[str], queue_payloads : List[QueuePayload], process_frames : ProcessFrames, update_progress : UpdateProgress) -> List[WorkerStatistics]:
+	queue_grain = calc_queue_grain(len(queue_payloads))
+	frame_stage = next(FRAME_STAGES)
+	executor = get_process_pool()
+	futures = [ executor.submit(process_worker_payloads, process_frames, source_paths, queue_payloads[index:index + queue_grain], frame_stage) for index in range(0, len(queue_payloads), queue_grain) ]
+	worker_statistic_set : Dict[int, WorkerStatistics] = {}
+
+	for future in as_completed(futures):
+		if process_manager.is_stopping():
+			clear_process_pools()
+			break
+		worker_id, payload_statistic = future.result()
+		worker_statistic = worker_statistic_set.setdefault(worker_id,
+		{
+			'frame_total': 0,
+			'busy_time': 0.0,
+			'utilization': 0.0
+		})
+		worker_statistic['frame_total'] += payload_statistic.get('frame_total')
+		worker_statistic['busy_time'] += payload_statistic.get('busy_time')
+		update_progress(payload_statistic.get('frame_total'))
+	return list(worker_statistic_set.values())
+
+
+def process_worker_frames(source_paths : List[str], queue : Queue[QueuePayload], process_frames : ProcessFrames, update_progress : UpdateProgress) -> WorkerStatistics:
+	worker_statistic : WorkerStatistics =\
+	{
+		'frame_total': 0,
+		'busy_time': 0.0,
+		'utilization': 0.0
+	}
+
+	while not process_manager.is_stopping():
+		queue_payloads = pick_queue(queue, calc_queue_grain(queue.qsize()))
+
+		if not queue_payloads:
+			break
+		start_time = time()
+		process_frames(source_paths, queue_payloads, update_progress)
+		release_many_frame_faces(read_queue_frame(queue_payloads[0]), [ queue_payload.get('frame_number') for queue_payload in queue_payloads ])
+		worker_statistic['busy_time'] += time() - start_time
+		worker_statistic['frame_total'] += len(queue_payloads)
+	return worker_statistic
+
+
+def calc_queue_grain(queue_total : int) -> int:
+	execution_thread_count = state_manager.get_item('execution_thread_count')
+	execution_queue_count = state_manager.get_item('execution_queue_count')
+	return max(queue_total // (execution_thread_count * 4), execution_queue_count)
+
+
+def multi_process_stream(source_paths : List[str], target_path : str, temp_video_resolution : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, processor_modules : List[ModuleType]) -> bool:
+	execution_thread_count = state_manager.get_item('execution_thread_count')
+	execution_queue_count = state_manager.get_item('execution_queue_count')
+	frame_total = predict_video_frame_total(target_path, temp_video_fps, state_manager.get_item('trim_frame_start'), state_manager.get_item('trim_frame_end'))
+	video_decoder = open_video_decoder(target_path, temp_video_resolution, temp_video_fps)
+	video_encoder : Optional[subprocess.Popen[bytes]] = None
+	frame_ring : Optional[FrameRing] = None
+	futures : Deque[Future[Any]] = deque()
+	frame_number = 0
+
+	try:
+		with tqdm(total = frame_total, desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+			progress.set_postfix(
+			{
+				'execution_providers': state_manager.get_item('execution_providers'),
+				'execution_thread_count': execution_thread_count,
+				'execution_queue_count': execution_queue_count
+			})
+			if state_manager.get_item('execution_mode') == 'process':
+				temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+				executor : Executor = get_process_pool()
+				frame_ring = create_frame_ring(temp_video_width * temp_video_height * 3, (execution_thread_count * 2 + 2) * execution_queue_count)
+				process_chain = partial(process_chain_queue, [ processor_module.__name__.split('.')[-1] for processor_module in processor_modules ])
+			else:
+				executor = get_frame_executor(execution_thread_count)
+
+			while process_manager.is_processing():
+				queue_payloads = create_stream_payloads(video_decoder, temp_video_resolution, frame_number, execution_queue_count)
+				frame_number += len(queue_payloads)
+
+				if queue_payloads and frame_ring:
+					futures.append(executor.submit(process_ring_payloads, process_chain, source_paths, frame_ring.get('shared_memory').name, frame_ring.get('slot_size'), [ write_frame_ring(frame_ring, queue_payload) for queue_payload in queue_payloads ]))
+				elif queue_payloads:
+					futures.append(executor.submit(process_chain_payloads, source_paths, queue_payloads, processor_modules, progress.update))
+
+				while futures and (not queue_payloads or len(futures) > execution_thread_count * 2 or futures[0].done()):
+					for queue_payload in collect_stream_payloads(futures.popleft(), frame_ring, progress.update):
+						vision_frame = queue_payload.get('vision_frame')
+						if not video_encoder:
+							video_encoder = open_video_encoder(target_path, pack_resolution((vision_frame.shape[1], vision_frame.shape[0])), output_video_resolution, output_video_fps)
+						video_encoder.stdin.write(vision_frame.tobytes())
+
+				if not queue_payloads:
+					break
+
+		if video_encoder:
+			video_encoder.stdin.close()
+			if process_manager.is_stopping():
+				video_encoder.terminate()
+			return video_encoder.wait() == 0 and process_manager.is_processing()
+		return False
+	finally:
+		for future in futures:
+			future.cancel()
+		if state_manager.get_item('execution_mode') == 'process':
+			clear_process_pools()
+		if frame_ring:
+			destroy_frame_ring(frame_ring)
+		close_ffmpeg(video_decoder)
+		if video_encoder:
+			close_ffmpeg(video_encoder)
+
+
+def collect_stream_payloads(future : Future[Any], frame_ring : Optional[FrameRing], update_progress : UpdateProgress) -> List[QueuePayload]:
+	if frame_ring:
+		queue_payloads = read_frame_ring(frame_ring, future.result())
+		update_progress(len(queue_payloads))
+		return queue_payloads
+	return future.result()
+
+
+def create_stream_payloads(video_decoder : subprocess.Popen[bytes], temp_video_resolution : str, frame_number : int, frame_count : int) -> List[QueuePayload]:
+	queue_payloads = []
+
+	for frame_index in range(frame_count):
+		vision_frame = read_video_decoder_frame(video_decoder, temp_video_resolution)
+		if vision_frame is None:
+			break
+		queue_payload : QueuePayload =\
+		{
+			'frame_number': frame_number + frame_index,
+			'frame_path': None,
+			'vision_frame': vision_frame
+		}
+		queue_payloads.append(queue_payload)
+	return queue_payloads
+
+
+def process_chain_frames(processors : List[str], source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	processor_modules = get_processors_modules(processors)
+	execution_queue_count = state_manager.get_item('execution_queue_count')
+
+	for index in range(0, len(queue_payloads), execution_queue_count):
+		chain_payloads : List[QueuePayload] = []
+
+		for queue_payload in process_manager.manage(queue_payloads[index:index + execution_queue_count]):
+			chain_payload : QueuePayload =\
+			{
+				'frame_number': queue_payload.get('frame_number'),
+				'frame_path': None,
+				'vision_frame': read_image(queue_payload.get('frame_path'))
+			}
+			chain_payloads.append(chain_payload)
+		process_chain_payloads(source_paths, chain_payloads, processor_modules, update_progress)
+
+		for queue_payload, chain_payload in zip(queue_payloads[index:index + execution_queue_count], chain_payloads):
+			write_image(queue_payload.get('frame_path'), chain_payload.get('vision_frame'))
+
+
+def process_chain_queue(processors : List[str], source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	process_chain_payloads(source_paths, queue_payloads, get_processors_modules(processors), update_progress)
+
+
+def process_chain_payloads(source_paths : List[str], queue_payloads : List[QueuePayload], processor_modules : List[ModuleType], update_progress : UpdateProgress) -> List[QueuePayload]:
+	for processor_module in processor_modules:
+		vision_frames = [ queue_payload.get('vision_frame') for queue_payload in queue_payloads ]
+		if is_face_processor(processor_module):
+			get_many_frame_faces(vision_frames, [ queue_payload.get('frame_number') for queue_payload in queue_payloads ])
+		processor_module.process_frames(source_paths, queue_payloads, lambda _: None)
+
+		if not is_geometry_preserving(processor_module):
+			for vision_frame, queue_payload in zip(vision_frames, queue_payloads):
+				remove_static_faces(vision_frame, queue_payload.get('frame_number'))
+
+	for queue_payload in queue_payloads:
+		release_frame_faces(queue_payload.get('vision_frame'), queue_payload.get('frame_number'))
+	update_progress(len(queue_payloads))
+	return queue_payloads
+
+
+def is_face_processor(processor_module : ModuleType) -> bool:
+	return processor_module.__name__.split('.')[-1] in FACE_PROCESSORS
+
+
+def is_geometry_preserving(processor_module : ModuleType) -> bool:
+	return processor_module.__name__.split('.')[-1] in GEOMETRY_PRESERVING_PROCESSORS
+
+
+def read_queue_frame(queue_payload : QueuePayload) -> Optional[VisionFrame]:
+	if queue_payload.get('frame_path'):
+		return read_image(queue_payload.get('frame_path'))
+	return queue_payload.get('vision_frame')
 
-			while not queue.empty():
-				future = executor.submit(process_frames, source_paths, pick_queue(queue, queue_per_future), progress.update)
-				futures.append(future)
 
-			for future_done in as_completed(futures):
-				future_done.result()
+def write_queue_frame(queue_payload : QueuePayload, vision_frame : VisionFrame) -> bool:
+	if queue_payload.get('frame_path'):
+		return write_image(queue_payload.get('frame_path'), vision_frame)
+	queue_payload['vision_frame'] = vision_frame
+	return True
 
 
 def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
@@ -91,8 +351,10 @@ def create_queue(queue_payloads : List[QueuePayload]) -> Queue[QueuePayload]:
 def pick_queue(queue : Queue[QueuePayload], queue_per_future : int) -> List[QueuePayload]:
 	queues = []
 	for _ in range(queue_per_future):
-		if not queue.empty():
-			queues.append(queue.get())
+		try:
+			queues.append(queue.get_nowait())
+		except Empty:
+			break
 	return queues
 
 
@@ -104,7 +366,8 @@ def create_queue_payloads(temp_frame_paths : List[str]) -> List[QueuePayload]:
 		frame_payload : QueuePayload =\
 		{
 			'frame_number': frame_number,
-			'frame_path': frame_path
+			'frame_path': frame_path,
+			'vision_frame': None
 		}
 		queue_payloads.append(frame_payload)
 	return queue_payloads
@@ -11,19 +11,19 @@ import faceweave.jobs.job_store
 import faceweave.processors.core as processors
 from faceweave import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, wording
 from faceweave.common_helper import create_int_metavar
+from faceweave.crop_cache import create_crop_key, get_crop_output, set_crop_output
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_analyser import get_many_faces, get_one_face
-from faceweave.face_helper import merge_matrix, paste_back, warp_face_by_face_landmark_5
-from faceweave.face_masker import create_occlusion_mask, create_static_box_mask
+from faceweave.face_helper import merge_matrix, paste_back_many, warp_face_by_face_landmark_5
+from faceweave.face_masker import create_static_box_mask, get_occlusion_mask
 from faceweave.face_selector import find_similar_faces, sort_and_filter_faces
 from faceweave.face_store import get_reference_faces
 from faceweave.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
 from faceweave.processors import choices as processors_choices
 from faceweave.processors.typing import AgeModifierInputs
 from faceweave.program_helper import find_argument_group
-from faceweave.thread_helper import thread_semaphore
-from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, Mask, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import read_image, read_static_image, write_image
+from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, Mask, ModelOptions, ModelSet, PastePatch, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from faceweave.vision import read_static_image, write_image
 
 MODEL_SET : ModelSet =\
 {
@@ -115,6 +115,15 @@ def post_process() -> None:
 
 
 def modify_age(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	return modify_many_ages([ target_face ], temp_vision_frame)
+
+
+def modify_many_ages(target_faces : List[Face], temp_vision_frame : VisionFrame) -> VisionFrame:
+	paste_patches = [ create_age_patch(target_face, temp_vision_frame) for target_face in target_faces ]
+	return paste_back_many(temp_vision_frame, paste_patches)
+
+
+def create_age_patch(target_face : Face, temp_vision_frame : VisionFrame) -> PastePatch:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	crop_size = (model_size[0] // 2, model_size[1] // 2)
@@ -130,20 +139,25 @@ def modify_age(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 	]
 
 	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(crop_vision_frame)
+		occlusion_mask = get_occlusion_mask(target_face, crop_vision_frame, affine_matrix)
 		combined_matrix = merge_matrix([ extend_affine_matrix, cv2.invertAffineTransform(affine_matrix) ])
 		occlusion_mask = cv2.warpAffine(occlusion_mask, combined_matrix, model_size)
 		crop_masks.append(occlusion_mask)
 
-	crop_vision_frame = prepare_vision_frame(crop_vision_frame)
-	extend_vision_frame = prepare_vision_frame(extend_vision_frame)
-	extend_vision_frame = forward(crop_vision_frame, extend_vision_frame)
-	extend_vision_frame = normalize_extend_frame(extend_vision_frame)
-	extend_vision_frame = fix_color(extend_vision_frame_raw, extend_vision_frame)
+	crop_key = create_crop_key([ 'age_modifier', state_manager.get_item('age_modifier_model'), state_manager.get_item('age_modifier_direction') ], face_landmark_5)
+	crop_output = get_crop_output(crop_key, extend_vision_frame_raw)
+
+	if crop_output is None:
+		crop_vision_frame = prepare_vision_frame(crop_vision_frame)
+		extend_vision_frame = prepare_vision_frame(extend_vision_frame)
+		crop_output = forward(crop_vision_frame, extend_vision_frame)
+		crop_output = normalize_extend_frame(crop_output)
+		crop_output = fix_color(extend_vision_frame_raw, crop_output)
+		set_crop_output(crop_key, extend_vision_frame_raw, crop_output)
+	extend_vision_frame = crop_output
 	extend_crop_mask = cv2.pyrUp(numpy.minimum.reduce(crop_masks).clip(0, 1))
 	extend_affine_matrix *= extend_vision_frame.shape[0] / 512
-	paste_vision_frame = paste_back(temp_vision_frame, extend_vision_frame, extend_crop_mask, extend_affine_matrix)
-	return paste_vision_frame
+	return extend_vision_frame, extend_crop_mask, extend_affine_matrix
 
 
 def forward(crop_vision_frame : VisionFrame, extend_vision_frame : VisionFrame) -> VisionFrame:
@@ -158,8 +172,7 @@ def forward(crop_vision_frame : VisionFrame, extend_vision_frame : VisionFrame)
 		if age_modifier_input.name == 'direction':
 			age_modifier_inputs[age_modifier_input.name] = prepare_direction(state_manager.get_item('age_modifier_direction'))
 
-	with thread_semaphore():
-		crop_vision_frame = age_modifier.run(None, age_modifier_inputs)[0][0]
+	crop_vision_frame = inference_manager.run_inference(age_modifier, age_modifier_inputs)[0][0]
 
 	return crop_vision_frame
 
@@ -220,12 +233,11 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ], inputs.get('frame_number')))
 
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = modify_age(target_face, target_vision_frame)
+			target_vision_frame = modify_many_ages(many_faces, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'one':
 		target_face = get_one_face(many_faces)
 		if target_face:
@@ -233,8 +245,7 @@ def process_frame(inputs : AgeModifierInputs) -> VisionFrame:
 	if state_manager.get_item('face_selector_mode') == 'reference':
 		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
 		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = modify_age(similar_face, target_vision_frame)
+			target_vision_frame = modify_many_ages(similar_faces, target_vision_frame)
 	return target_vision_frame
 
 
@@ -242,22 +253,23 @@ def process_frames(source_path : List[str], queue_payloads : List[QueuePayload],
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
+			'frame_number': queue_payload.get('frame_number'),
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
-	target_vision_frame = read_static_image(target_path)
+	target_vision_frame = read_static_image(target_path).copy()
 	output_vision_frame = process_frame(
 	{
+		'frame_number': 0,
 		'reference_faces': reference_faces,
 		'target_vision_frame': target_vision_frame
 	})
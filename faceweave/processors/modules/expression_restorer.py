@@ -1,5 +1,5 @@
 from argparse import ArgumentParser
-from typing import List, Tuple
+from typing import Any, List, Tuple
 
 import cv2
 import numpy
@@ -11,8 +11,8 @@ from faceweave import config, content_analyser, face_classifier, face_detector,
 from faceweave.common_helper import create_int_metavar
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_analyser import get_many_faces, get_one_face
-from faceweave.face_helper import paste_back, warp_face_by_face_landmark_5
-from faceweave.face_masker import create_occlusion_mask, create_static_box_mask
+from faceweave.face_helper import paste_back_many, warp_face_by_face_landmark_5
+from faceweave.face_masker import create_static_box_mask, get_occlusion_mask
 from faceweave.face_selector import find_similar_faces, sort_and_filter_faces
 from faceweave.face_store import get_reference_faces
 from faceweave.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
@@ -21,9 +21,8 @@ from faceweave.processors.live_portrait import create_rotation, limit_expression
 from faceweave.processors.typing import ExpressionRestorerInputs
 from faceweave.processors.typing import LivePortraitExpression, LivePortraitFeatureVolume, LivePortraitMotionPoints, LivePortraitPitch, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitYaw
 from faceweave.program_helper import find_argument_group
-from faceweave.thread_helper import conditional_thread_semaphore, thread_semaphore
-from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import get_video_frame, read_image, read_static_image, write_image
+from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, ModelOptions, ModelSet, PastePatch, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from faceweave.vision import get_video_frame, read_static_image, write_image
 
 MODEL_SET : ModelSet =\
 {
@@ -134,10 +133,19 @@ def post_process() -> None:
 
 
 def restore_expression(source_vision_frame : VisionFrame, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	return restore_many_expressions(source_vision_frame, [ target_face ], temp_vision_frame)
+
+
+def restore_many_expressions(source_vision_frame : VisionFrame, target_faces : List[Face], temp_vision_frame : VisionFrame) -> VisionFrame:
+	source_vision_frame = cv2.resize(source_vision_frame, temp_vision_frame.shape[:2][::-1])
+	paste_patches = [ create_expression_patch(source_vision_frame, target_face, temp_vision_frame) for target_face in target_faces ]
+	return paste_back_many(temp_vision_frame, paste_patches)
+
+
+def create_expression_patch(source_vision_frame : VisionFrame, target_face : Face, temp_vision_frame : VisionFrame) -> PastePatch:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	expression_restorer_factor = float(numpy.interp(float(state_manager.get_item('expression_restorer_factor')), [ 0, 100 ], [ 0, 1.2 ]))
-	source_vision_frame = cv2.resize(source_vision_frame, temp_vision_frame.shape[:2][::-1])
 	source_crop_vision_frame, _ = warp_face_by_face_landmark_5(source_vision_frame, target_face.landmark_set.get('5/68'), model_template, model_size)
 	target_crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, model_size)
 	box_mask = create_static_box_mask(target_crop_vision_frame.shape[:2][::-1], state_manager.get_item('face_mask_blur'), (0, 0, 0, 0))
@@ -147,7 +155,7 @@ def restore_expression(source_vision_frame : VisionFrame, target_face : Face, te
 	]
 
 	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(target_crop_vision_frame)
+		occlusion_mask = get_occlusion_mask(target_face, target_crop_vision_frame, affine_matrix)
 		crop_masks.append(occlusion_mask)
 
 	source_crop_vision_frame = prepare_crop_frame(source_crop_vision_frame)
@@ -155,8 +163,7 @@ def restore_expression(source_vision_frame : VisionFrame, target_face : Face, te
 	target_crop_vision_frame = apply_restore(source_crop_vision_frame, target_crop_vision_frame, expression_restorer_factor)
 	target_crop_vision_frame = normalize_crop_frame(target_crop_vision_frame)
 	crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
-	temp_vision_frame = paste_back(temp_vision_frame, target_crop_vision_frame, crop_mask, affine_matrix)
-	return temp_vision_frame
+	return target_crop_vision_frame, crop_mask, affine_matrix
 
 
 def apply_restore(source_crop_vision_frame : VisionFrame, target_crop_vision_frame : VisionFrame, expression_restorer_factor : float) -> VisionFrame:
@@ -176,11 +183,10 @@ def apply_restore(source_crop_vision_frame : VisionFrame, target_crop_vision_fra
 def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeatureVolume:
 	feature_extractor = get_inference_pool().get('feature_extractor')
 
-	with conditional_thread_semaphore():
-		feature_volume = feature_extractor.run(None,
-		{
-			'input': crop_vision_frame
-		})[0]
+	feature_volume = inference_manager.run_inference(feature_extractor,
+	{
+		'input': crop_vision_frame
+	})[0]
 
 	return feature_volume
 
@@ -188,11 +194,11 @@ def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeat
 def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortraitPitch, LivePortraitYaw, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitExpression, LivePortraitMotionPoints]:
 	motion_extractor = get_inference_pool().get('motion_extractor')
 
-	with conditional_thread_semaphore():
-		pitch, yaw, roll, scale, translation, expression, motion_points = motion_extractor.run(None,
-		{
-			'input': crop_vision_frame
-		})
+	motion_outputs : List[Any] = inference_manager.run_inference(motion_extractor,
+	{
+		'input': crop_vision_frame
+	})
+	pitch, yaw, roll, scale, translation, expression, motion_points = motion_outputs
 
 	return pitch, yaw, roll, scale, translation, expression, motion_points
 
@@ -200,13 +206,12 @@ def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortrai
 def forward_generate_frame(feature_volume : LivePortraitFeatureVolume, source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> VisionFrame:
 	generator = get_inference_pool().get('generator')
 
-	with thread_semaphore():
-		crop_vision_frame = generator.run(None,
-		{
-			'feature_volume': feature_volume,
-			'source': source_motion_points,
-			'target': target_motion_points
-		})[0][0]
+	crop_vision_frame = inference_manager.run_inference(generator,
+	{
+		'feature_volume': feature_volume,
+		'source': source_motion_points,
+		'target': target_motion_points
+	})[0][0]
 
 	return crop_vision_frame
 
@@ -235,12 +240,11 @@ def process_frame(inputs : ExpressionRestorerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	source_vision_frame = inputs.get('source_vision_frame')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ], inputs.get('frame_number')))
 
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = restore_expression(source_vision_frame, target_face, target_vision_frame)
+			target_vision_frame = restore_many_expressions(source_vision_frame, many_faces, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'one':
 		target_face = get_one_face(many_faces)
 		if target_face:
@@ -248,8 +252,7 @@ def process_frame(inputs : ExpressionRestorerInputs) -> VisionFrame:
 	if state_manager.get_item('face_selector_mode') == 'reference':
 		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
 		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = restore_expression(source_vision_frame, similar_face, target_vision_frame)
+			target_vision_frame = restore_many_expressions(source_vision_frame, similar_faces, target_vision_frame)
 	return target_vision_frame
 
 
@@ -261,24 +264,25 @@ def process_frames(source_path : List[str], queue_payloads : List[QueuePayload],
 		if state_manager.get_item('trim_frame_start'):
 			frame_number += state_manager.get_item('trim_frame_start')
 		source_vision_frame = get_video_frame(state_manager.get_item('target_path'), frame_number)
-		target_vision_path = queue_payload.get('frame_path')
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
+			'frame_number': queue_payload.get('frame_number'),
 			'reference_faces': reference_faces,
 			'source_vision_frame': source_vision_frame,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 	source_vision_frame = read_static_image(state_manager.get_item('target_path'))
-	target_vision_frame = read_static_image(target_path)
+	target_vision_frame = read_static_image(target_path).copy()
 	output_vision_frame = process_frame(
 	{
+		'frame_number': 0,
 		'reference_faces': reference_faces,
 		'source_vision_frame': source_vision_frame,
 		'target_vision_frame': target_vision_frame
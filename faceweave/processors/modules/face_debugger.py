@@ -10,7 +10,7 @@ import faceweave.processors.core as processors
 from faceweave import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, process_manager, state_manager, wording
 from faceweave.face_analyser import get_many_faces, get_one_face
 from faceweave.face_helper import warp_face_by_face_landmark_5
-from faceweave.face_masker import create_occlusion_mask, create_region_mask, create_static_box_mask
+from faceweave.face_masker import create_static_box_mask, get_occlusion_mask, get_region_mask
 from faceweave.face_selector import find_similar_faces, sort_and_filter_faces
 from faceweave.face_store import get_reference_faces
 from faceweave.filesystem import in_directory, same_file_extension
@@ -18,7 +18,7 @@ from faceweave.processors import choices as processors_choices
 from faceweave.processors.typing import FaceDebuggerInputs
 from faceweave.program_helper import find_argument_group
 from faceweave.typing import ApplyStateItem, Args, Face, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import read_image, read_static_image, write_image
+from faceweave.vision import read_static_image, write_image
 
 
 def get_inference_pool() -> None:
@@ -100,11 +100,11 @@ def debug_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFra
 			crop_masks.append(box_mask)
 
 		if 'occlusion' in state_manager.get_item('face_mask_types'):
-			occlusion_mask = create_occlusion_mask(crop_vision_frame)
+			occlusion_mask = get_occlusion_mask(target_face, crop_vision_frame, affine_matrix)
 			crop_masks.append(occlusion_mask)
 
 		if 'region' in state_manager.get_item('face_mask_types'):
-			region_mask = create_region_mask(crop_vision_frame, state_manager.get_item('face_mask_regions'))
+			region_mask = get_region_mask(target_face, crop_vision_frame, affine_matrix, state_manager.get_item('face_mask_regions'))
 			crop_masks.append(region_mask)
 
 		crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
@@ -174,7 +174,7 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 def process_frame(inputs : FaceDebuggerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ], inputs.get('frame_number')))
 
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
@@ -196,14 +196,14 @@ def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload]
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
+			'frame_number': queue_payload.get('frame_number'),
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
@@ -212,6 +212,7 @@ def process_image(source_paths : List[str], target_path : str, output_path : str
 	target_vision_frame = read_static_image(target_path)
 	output_vision_frame = process_frame(
 	{
+		'frame_number': 0,
 		'reference_faces': reference_faces,
 		'target_vision_frame': target_vision_frame
 	})
@@ -1,5 +1,5 @@
 from argparse import ArgumentParser
-from typing import List, Tuple
+from typing import Any, List, Tuple
 
 import cv2
 import numpy
@@ -11,7 +11,7 @@ from faceweave import config, content_analyser, face_classifier, face_detector,
 from faceweave.common_helper import create_float_metavar
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_analyser import get_many_faces, get_one_face
-from faceweave.face_helper import paste_back, scale_face_landmark_5, warp_face_by_face_landmark_5
+from faceweave.face_helper import paste_back_many, scale_face_landmark_5, warp_face_by_face_landmark_5
 from faceweave.face_masker import create_static_box_mask
 from faceweave.face_selector import find_similar_faces, sort_and_filter_faces
 from faceweave.face_store import get_reference_faces
@@ -20,9 +20,8 @@ from faceweave.processors import choices as processors_choices
 from faceweave.processors.live_portrait import create_rotation, limit_euler_angles, limit_expression
 from faceweave.processors.typing import FaceEditorInputs, LivePortraitExpression, LivePortraitFeatureVolume, LivePortraitMotionPoints, LivePortraitPitch, LivePortraitRoll, LivePortraitRotation, LivePortraitScale, LivePortraitTranslation, LivePortraitYaw
 from faceweave.program_helper import find_argument_group
-from faceweave.thread_helper import conditional_thread_semaphore, thread_semaphore
-from faceweave.typing import ApplyStateItem, Args, Face, FaceLandmark68, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import read_image, read_static_image, write_image
+from faceweave.typing import ApplyStateItem, Args, Face, FaceLandmark68, InferencePool, ModelOptions, ModelSet, PastePatch, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from faceweave.vision import read_static_image, write_image
 
 MODEL_SET : ModelSet =\
 {
@@ -190,6 +189,15 @@ def post_process() -> None:
 
 
 def edit_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	return edit_many_faces([ target_face ], temp_vision_frame)
+
+
+def edit_many_faces(target_faces : List[Face], temp_vision_frame : VisionFrame) -> VisionFrame:
+	paste_patches = [ create_edit_patch(target_face, temp_vision_frame) for target_face in target_faces ]
+	return paste_back_many(temp_vision_frame, paste_patches)
+
+
+def create_edit_patch(target_face : Face, temp_vision_frame : VisionFrame) -> PastePatch:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	face_landmark_5 = scale_face_landmark_5(target_face.landmark_set.get('5/68'), 1.5)
@@ -198,8 +206,7 @@ def edit_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFram
 	crop_vision_frame = prepare_crop_frame(crop_vision_frame)
 	crop_vision_frame = apply_edit(crop_vision_frame, target_face.landmark_set.get('68'))
 	crop_vision_frame = normalize_crop_frame(crop_vision_frame)
-	temp_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, box_mask, affine_matrix)
-	return temp_vision_frame
+	return crop_vision_frame, box_mask, affine_matrix
 
 
 def apply_edit(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLandmark68) -> VisionFrame:
@@ -230,11 +237,10 @@ def apply_edit(crop_vision_frame : VisionFrame, face_landmark_68 : FaceLandmark6
 def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeatureVolume:
 	feature_extractor = get_inference_pool().get('feature_extractor')
 
-	with conditional_thread_semaphore():
-		feature_volume = feature_extractor.run(None,
-		{
-			'input': crop_vision_frame
-		})[0]
+	feature_volume = inference_manager.run_inference(feature_extractor,
+	{
+		'input': crop_vision_frame
+	})[0]
 
 	return feature_volume
 
@@ -242,11 +248,11 @@ def forward_extract_feature(crop_vision_frame : VisionFrame) -> LivePortraitFeat
 def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortraitPitch, LivePortraitYaw, LivePortraitRoll, LivePortraitScale, LivePortraitTranslation, LivePortraitExpression, LivePortraitMotionPoints]:
 	motion_extractor = get_inference_pool().get('motion_extractor')
 
-	with conditional_thread_semaphore():
-		pitch, yaw, roll, scale, translation, expression, motion_points = motion_extractor.run(None,
-		{
-			'input': crop_vision_frame
-		})
+	motion_outputs : List[Any] = inference_manager.run_inference(motion_extractor,
+	{
+		'input': crop_vision_frame
+	})
+	pitch, yaw, roll, scale, translation, expression, motion_points = motion_outputs
 
 	return pitch, yaw, roll, scale, translation, expression, motion_points
 
@@ -254,11 +260,10 @@ def forward_extract_motion(crop_vision_frame : VisionFrame) -> Tuple[LivePortrai
 def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	eye_retargeter = get_inference_pool().get('eye_retargeter')
 
-	with conditional_thread_semaphore():
-		eye_motion_points = eye_retargeter.run(None,
-		{
-			'input': eye_motion_points
-		})[0]
+	eye_motion_points = inference_manager.run_inference(eye_retargeter,
+	{
+		'input': eye_motion_points
+	})[0]
 
 	return eye_motion_points
 
@@ -266,11 +271,10 @@ def forward_retarget_eye(eye_motion_points : LivePortraitMotionPoints) -> LivePo
 def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	lip_retargeter = get_inference_pool().get('lip_retargeter')
 
-	with conditional_thread_semaphore():
-		lip_motion_points = lip_retargeter.run(None,
-		{
-			'input': lip_motion_points
-		})[0]
+	lip_motion_points = inference_manager.run_inference(lip_retargeter,
+	{
+		'input': lip_motion_points
+	})[0]
 
 	return lip_motion_points
 
@@ -278,12 +282,11 @@ def forward_retarget_lip(lip_motion_points : LivePortraitMotionPoints) -> LivePo
 def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> LivePortraitMotionPoints:
 	stitcher = get_inference_pool().get('stitcher')
 
-	with thread_semaphore():
-		motion_points = stitcher.run(None,
-		{
-			'source': source_motion_points,
-			'target': target_motion_points
-		})[0]
+	motion_points = inference_manager.run_inference(stitcher,
+	{
+		'source': source_motion_points,
+		'target': target_motion_points
+	})[0]
 
 	return motion_points
 
@@ -291,13 +294,12 @@ def forward_stitch_motion_points(source_motion_points : LivePortraitMotionPoints
 def forward_generate_frame(feature_volume : LivePortraitFeatureVolume, source_motion_points : LivePortraitMotionPoints, target_motion_points : LivePortraitMotionPoints) -> VisionFrame:
 	generator = get_inference_pool().get('generator')
 
-	with thread_semaphore():
-		crop_vision_frame = generator.run(None,
-		{
-			'feature_volume': feature_volume,
-			'source': source_motion_points,
-			'target': target_motion_points
-		})[0][0]
+	crop_vision_frame = inference_manager.run_inference(generator,
+	{
+		'feature_volume': feature_volume,
+		'source': source_motion_points,
+		'target': target_motion_points
+	})[0][0]
 
 	return crop_vision_frame
 
@@ -480,12 +482,11 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 def process_frame(inputs : FaceEditorInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ], inputs.get('frame_number')))
 
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = edit_face(target_face, target_vision_frame)
+			target_vision_frame = edit_many_faces(many_faces, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'one':
 		target_face = get_one_face(many_faces)
 		if target_face:
@@ -493,8 +494,7 @@ def process_frame(inputs : FaceEditorInputs) -> VisionFrame:
 	if state_manager.get_item('face_selector_mode') == 'reference':
 		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
 		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = edit_face(similar_face, target_vision_frame)
+			target_vision_frame = edit_many_faces(similar_faces, target_vision_frame)
 	return target_vision_frame
 
 
@@ -502,22 +502,23 @@ def process_frames(source_path : List[str], queue_payloads : List[QueuePayload],
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
+			'frame_number': queue_payload.get('frame_number'),
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
-	target_vision_frame = read_static_image(target_path)
+	target_vision_frame = read_static_image(target_path).copy()
 	output_vision_frame = process_frame(
 	{
+		'frame_number': 0,
 		'reference_faces': reference_faces,
 		'target_vision_frame': target_vision_frame
 	})
@@ -1,7 +1,6 @@
 from argparse import ArgumentParser
 from typing import List
 
-import cv2
 import numpy
 
 import faceweave.jobs.job_manager
@@ -9,19 +8,19 @@ import faceweave.jobs.job_store
 import faceweave.processors.core as processors
 from faceweave import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, wording
 from faceweave.common_helper import create_int_metavar
+from faceweave.crop_cache import create_crop_key, get_crop_output, set_crop_output
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_analyser import get_many_faces, get_one_face
-from faceweave.face_helper import paste_back, warp_face_by_face_landmark_5
-from faceweave.face_masker import create_occlusion_mask, create_static_box_mask
+from faceweave.face_helper import paste_back_many, warp_face_by_face_landmark_5
+from faceweave.face_masker import create_static_box_mask, get_occlusion_mask
 from faceweave.face_selector import find_similar_faces, sort_and_filter_faces
 from faceweave.face_store import get_reference_faces
 from faceweave.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
 from faceweave.processors import choices as processors_choices
 from faceweave.processors.typing import FaceEnhancerInputs
 from faceweave.program_helper import find_argument_group
-from faceweave.thread_helper import thread_semaphore
-from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import read_image, read_static_image, write_image
+from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, ModelOptions, ModelSet, PastePatch, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from faceweave.vision import read_static_image, write_image
 
 MODEL_SET : ModelSet =\
 {
@@ -281,6 +280,15 @@ def post_process() -> None:
 
 
 def enhance_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	return enhance_many_faces([ target_face ], temp_vision_frame)
+
+
+def enhance_many_faces(target_faces : List[Face], temp_vision_frame : VisionFrame) -> VisionFrame:
+	paste_patches = [ create_enhance_patch(target_face, temp_vision_frame) for target_face in target_faces ]
+	return paste_back_many(temp_vision_frame, paste_patches)
+
+
+def create_enhance_patch(target_face : Face, temp_vision_frame : VisionFrame) -> PastePatch:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, model_size)
@@ -291,16 +299,20 @@ def enhance_face(target_face : Face, temp_vision_frame : VisionFrame) -> VisionF
 	]
 
 	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(crop_vision_frame)
+		occlusion_mask = get_occlusion_mask(target_face, crop_vision_frame, affine_matrix)
 		crop_masks.append(occlusion_mask)
 
-	crop_vision_frame = prepare_crop_frame(crop_vision_frame)
-	crop_vision_frame = forward(crop_vision_frame)
-	crop_vision_frame = normalize_crop_frame(crop_vision_frame)
-	crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
-	paste_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
-	temp_vision_frame = blend_frame(temp_vision_frame, paste_vision_frame)
-	return temp_vision_frame
+	crop_key = create_crop_key([ 'face_enhancer', state_manager.get_item('face_enhancer_model') ], target_face.landmark_set.get('5/68'))
+	crop_output = get_crop_output(crop_key, crop_vision_frame)
+
+	if crop_output is None:
+		crop_output = prepare_crop_frame(crop_vision_frame)
+		crop_output = forward(crop_output)
+		crop_output = normalize_crop_frame(crop_output)
+		set_crop_output(crop_key, crop_vision_frame, crop_output)
+	crop_vision_frame = crop_output
+	crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1) * state_manager.get_item('face_enhancer_blend') / 100
+	return crop_vision_frame, crop_mask, affine_matrix
 
 
 def forward(crop_vision_frame : VisionFrame) -> VisionFrame:
@@ -314,8 +326,7 @@ def forward(crop_vision_frame : VisionFrame) -> VisionFrame:
 			weight = numpy.array([ 1 ]).astype(numpy.double)
 			face_enhancer_inputs[face_enhancer_input.name] = weight
 
-	with thread_semaphore():
-		crop_vision_frame = face_enhancer.run(None, face_enhancer_inputs)[0][0]
+	crop_vision_frame = inference_manager.run_inference(face_enhancer, face_enhancer_inputs)[0][0]
 
 	return crop_vision_frame
 
@@ -336,12 +347,6 @@ def normalize_crop_frame(crop_vision_frame : VisionFrame) -> VisionFrame:
 	return crop_vision_frame
 
 
-def blend_frame(temp_vision_frame : VisionFrame, paste_vision_frame : VisionFrame) -> VisionFrame:
-	face_enhancer_blend = 1 - (state_manager.get_item('face_enhancer_blend') / 100)
-	temp_vision_frame = cv2.addWeighted(temp_vision_frame, face_enhancer_blend, paste_vision_frame, 1 - face_enhancer_blend, 0)
-	return temp_vision_frame
-
-
 def get_reference_frame(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
 	return enhance_face(target_face, temp_vision_frame)
 
@@ -349,12 +354,11 @@ def get_reference_frame(source_face : Face, target_face : Face, temp_vision_fram
 def process_frame(inputs : FaceEnhancerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ], inputs.get('frame_number')))
 
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = enhance_face(target_face, target_vision_frame)
+			target_vision_frame = enhance_many_faces(many_faces, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'one':
 		target_face = get_one_face(many_faces)
 		if target_face:
@@ -362,8 +366,7 @@ def process_frame(inputs : FaceEnhancerInputs) -> VisionFrame:
 	if state_manager.get_item('face_selector_mode') == 'reference':
 		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
 		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = enhance_face(similar_face, target_vision_frame)
+			target_vision_frame = enhance_many_faces(similar_faces, target_vision_frame)
 	return target_vision_frame
 
 
@@ -371,22 +374,23 @@ def process_frames(source_path : List[str], queue_payloads : List[QueuePayload],
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
+			'frame_number': queue_payload.get('frame_number'),
 			'reference_faces': reference_faces,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
-	target_vision_frame = read_static_image(target_path)
+	target_vision_frame = read_static_image(target_path).copy()
 	output_vision_frame = process_frame(
 	{
+		'frame_number': 0,
 		'reference_faces': reference_faces,
 		'target_vision_frame': target_vision_frame
 	})
@@ -7,12 +7,14 @@ import faceweave.jobs.job_manager
 import faceweave.jobs.job_store
 import faceweave.processors.core as processors
 from faceweave import config, content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, inference_manager, logger, process_manager, state_manager, wording
+from faceweave.cache_manager import clear_cache, estimate_size, get_cache_item, register_cache, set_cache_item
 from faceweave.common_helper import get_first
+from faceweave.crop_cache import create_crop_key, get_crop_output, set_crop_output
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.execution import has_execution_provider
 from faceweave.face_analyser import get_average_face, get_many_faces, get_one_face
-from faceweave.face_helper import paste_back, warp_face_by_face_landmark_5
-from faceweave.face_masker import create_occlusion_mask, create_region_mask, create_static_box_mask
+from faceweave.face_helper import paste_back_many, warp_face_by_face_landmark_5
+from faceweave.face_masker import create_static_box_mask, get_occlusion_mask, get_region_mask
 from faceweave.face_selector import find_similar_faces, sort_and_filter_faces
 from faceweave.face_store import get_reference_faces
 from faceweave.filesystem import filter_image_paths, has_image, in_directory, is_image, is_video, resolve_relative_path, same_file_extension
@@ -21,9 +23,8 @@ from faceweave.processors import choices as processors_choices
 from faceweave.processors.pixel_boost import explode_pixel_boost, implode_pixel_boost
 from faceweave.processors.typing import FaceSwapperInputs
 from faceweave.program_helper import find_argument_group, suggest_face_swapper_pixel_boost_choices
-from faceweave.thread_helper import conditional_thread_semaphore
 from faceweave.typing import ApplyStateItem, Args, Embedding, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import read_image, read_static_image, read_static_images, unpack_resolution, write_image
+from faceweave.vision import read_static_image, read_static_images, unpack_resolution, write_image
 
 MODEL_SET : ModelSet =\
 {
@@ -294,6 +295,7 @@ MODEL_SET : ModelSet =\
 		'standard_deviation': [ 0.5, 0.5, 0.5 ]
 	}
 }
+register_cache('source_inputs', estimate_size)
 
 
 def get_inference_pool() -> InferencePool:
@@ -362,6 +364,7 @@ def post_process() -> None:
 	if state_manager.get_item('video_memory_strategy') in [ 'strict', 'moderate' ]:
 		clear_inference_pool()
 		get_static_model_initializer.cache_clear()
+		clear_cache('source_inputs')
 	if state_manager.get_item('video_memory_strategy') == 'strict':
 		content_analyser.clear_inference_pool()
 		face_classifier.clear_inference_pool()
@@ -372,71 +375,119 @@ def post_process() -> None:
 
 
 def swap_face(source_face : Face, target_face : Face, temp_vision_frame : VisionFrame) -> VisionFrame:
+	return swap_many_faces(source_face, [ target_face ], temp_vision_frame)
+
+
+def swap_many_faces(source_face : Face, target_faces : List[Face], temp_vision_frame : VisionFrame) -> VisionFrame:
 	model_template = get_model_options().get('template')
 	model_size = get_model_options().get('size')
 	pixel_boost_size = unpack_resolution(state_manager.get_item('face_swapper_pixel_boost'))
 	pixel_boost_total = pixel_boost_size[0] // model_size[0]
-	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, pixel_boost_size)
+	crop_scope = [ 'face_swapper', state_manager.get_item('face_swapper_model'), state_manager.get_item('face_swapper_pixel_boost'), *state_manager.get_item('source_paths') ]
+	affine_matrices = []
+	many_crop_masks = []
+	crop_keys = []
+	crop_vision_frames = []
+	crop_outputs = []
+	pixel_boost_vision_frames : List[VisionFrame] = []
 	temp_vision_frames = []
-	crop_masks = []
 
-	if 'box' in state_manager.get_item('face_mask_types'):
-		box_mask = create_static_box_mask(crop_vision_frame.shape[:2][::-1], state_manager.get_item('face_mask_blur'), state_manager.get_item('face_mask_padding'))
-		crop_masks.append(box_mask)
+	for target_face in target_faces:
+		crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), model_template, pixel_boost_size)
+		crop_key = create_crop_key(crop_scope, target_face.landmark_set.get('5/68'))
+		crop_output = get_crop_output(crop_key, crop_vision_frame)
+		crop_masks = []
+
+		if 'box' in state_manager.get_item('face_mask_types'):
+			box_mask = create_static_box_mask(crop_vision_frame.shape[:2][::-1], state_manager.get_item('face_mask_blur'), state_manager.get_item('face_mask_padding'))
+			crop_masks.append(box_mask)
+
+		if 'occlusion' in state_manager.get_item('face_mask_types'):
+			occlusion_mask = get_occlusion_mask(target_face, crop_vision_frame, affine_matrix)
+			crop_masks.append(occlusion_mask)
+
+		affine_matrices.append(affine_matrix)
+		many_crop_masks.append(crop_masks)
+		crop_keys.append(crop_key)
+		crop_vision_frames.append(crop_vision_frame)
+		crop_outputs.append(crop_output)
 
-	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(crop_vision_frame)
-		crop_masks.append(occlusion_mask)
+		if crop_output is None:
+			pixel_boost_vision_frames.extend(prepare_crop_frame(pixel_boost_vision_frame) for pixel_boost_vision_frame in implode_pixel_boost(crop_vision_frame, pixel_boost_total, model_size))
 
-	pixel_boost_vision_frames = implode_pixel_boost(crop_vision_frame, pixel_boost_total, model_size)
-	for pixel_boost_vision_frame in pixel_boost_vision_frames:
-		pixel_boost_vision_frame = prepare_crop_frame(pixel_boost_vision_frame)
-		pixel_boost_vision_frame = forward_swap_face(source_face, pixel_boost_vision_frame)
-		pixel_boost_vision_frame = normalize_crop_frame(pixel_boost_vision_frame)
-		temp_vision_frames.append(pixel_boost_vision_frame)
-	crop_vision_frame = explode_pixel_boost(temp_vision_frames, pixel_boost_total, model_size, pixel_boost_size)
+	if pixel_boost_vision_frames:
+		temp_vision_frames = [ normalize_crop_frame(pixel_boost_vision_frame) for pixel_boost_vision_frame in forward_swap_faces(source_face, pixel_boost_vision_frames) ]
+	paste_patches = []
 
-	if 'region' in state_manager.get_item('face_mask_types'):
-		region_mask = create_region_mask(crop_vision_frame, state_manager.get_item('face_mask_regions'))
-		crop_masks.append(region_mask)
+	for target_face, affine_matrix, crop_masks, crop_key, crop_vision_frame, crop_output in zip(target_faces, affine_matrices, many_crop_masks, crop_keys, crop_vision_frames, crop_outputs):
+		if crop_output is None:
+			crop_output = explode_pixel_boost(temp_vision_frames[:pixel_boost_total ** 2], pixel_boost_total, model_size, pixel_boost_size)
+			temp_vision_frames = temp_vision_frames[pixel_boost_total ** 2:]
+			set_crop_output(crop_key, crop_vision_frame, crop_output)
+		crop_vision_frame = crop_output
 
-	crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
-	temp_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
-	return temp_vision_frame
+		if 'region' in state_manager.get_item('face_mask_types'):
+			region_mask = get_region_mask(target_face, crop_vision_frame, affine_matrix, state_manager.get_item('face_mask_regions'))
+			crop_masks.append(region_mask)
+
+		crop_mask = numpy.minimum.reduce(crop_masks).clip(0, 1)
+		paste_patches.append((crop_vision_frame, crop_mask, affine_matrix))
+	return paste_back_many(temp_vision_frame, paste_patches)
 
 
 def forward_swap_face(source_face : Face, crop_vision_frame : VisionFrame) -> VisionFrame:
+	return get_first(forward_swap_faces(source_face, [ crop_vision_frame ]))
+
+
+def forward_swap_faces(source_face : Face, crop_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
 	face_swapper = get_inference_pool().get('face_swapper')
-	model_type = get_model_options().get('type')
 	face_swapper_inputs = {}
 
 	for face_swapper_input in face_swapper.get_inputs():
 		if face_swapper_input.name == 'source':
-			if model_type == 'blendswap' or model_type == 'uniface':
-				face_swapper_inputs[face_swapper_input.name] = prepare_source_frame(source_face)
-			else:
-				face_swapper_inputs[face_swapper_input.name] = prepare_source_embedding(source_face)
-		if face_swapper_input.name == 'target':
-			face_swapper_inputs[face_swapper_input.name] = crop_vision_frame
+			face_swapper_inputs[face_swapper_input.name] = get_source_input(source_face)
 
-	with conditional_thread_semaphore():
-		crop_vision_frame = face_swapper.run(None, face_swapper_inputs)[0][0]
+	predictions = inference_manager.run_batch(face_swapper,
+	[
+		{
+			**face_swapper_inputs,
+			'target': crop_vision_frame
+		} for crop_vision_frame in crop_vision_frames
+	])
 
-	return crop_vision_frame
+	return [ prediction[0][0] for prediction in predictions ]
 
 
 def forward_convert_embedding(embedding : Embedding) -> Embedding:
 	embedding_converter = get_inference_pool().get('embedding_converter')
 
-	with conditional_thread_semaphore():
-		embedding = embedding_converter.run(None,
-		{
-			'input': embedding
-		})[0]
+	embedding = inference_manager.run_inference(embedding_converter,
+	{
+		'input': embedding
+	})[0]
 
 	return embedding
 
 
+def get_source_input(source_face : Face) -> VisionFrame:
+	cache_key = (state_manager.get_item('face_swapper_model'), tuple(state_manager.get_item('source_paths') or []), source_face.embedding.tobytes())
+	has_source_input, source_input = get_cache_item('source_inputs', cache_key)
+
+	if not has_source_input:
+		source_input = prepare_source_input(source_face)
+		clear_cache('source_inputs')
+		set_cache_item('source_inputs', cache_key, source_input)
+	return source_input
+
+
+def prepare_source_input(source_face : Face) -> VisionFrame:
+	model_type = get_model_options().get('type')
+
+	if model_type == 'blendswap' or model_type == 'uniface':
+		return prepare_source_frame(source_face)
+	return prepare_source_embedding(source_face)
+
+
 def prepare_source_frame(source_face : Face) -> VisionFrame:
 	model_type = get_model_options().get('type')
 	source_vision_frame = read_static_image(get_first(state_manager.get_item('source_paths')))
@@ -508,12 +559,11 @@ def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	source_face = inputs.get('source_face')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ], inputs.get('frame_number')))
 
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = swap_face(source_face, target_face, target_vision_frame)
+			target_vision_frame = swap_many_faces(source_face, many_faces, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'one':
 		target_face = get_one_face(many_faces)
 		if target_face:
@@ -521,8 +571,7 @@ def process_frame(inputs : FaceSwapperInputs) -> VisionFrame:
 	if state_manager.get_item('face_selector_mode') == 'reference':
 		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
 		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = swap_face(source_face, similar_face, target_vision_frame)
+			target_vision_frame = swap_many_faces(source_face, similar_faces, target_vision_frame)
 	return target_vision_frame
 
 
@@ -533,15 +582,15 @@ def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload]
 	source_face = get_average_face(source_faces)
 
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
+			'frame_number': queue_payload.get('frame_number'),
 			'reference_faces': reference_faces,
 			'source_face': source_face,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
@@ -550,9 +599,10 @@ def process_image(source_paths : List[str], target_path : str, output_path : str
 	source_frames = read_static_images(source_paths)
 	source_faces = get_many_faces(source_frames)
 	source_face = get_average_face(source_faces)
-	target_vision_frame = read_static_image(target_path)
+	target_vision_frame = read_static_image(target_path).copy()
 	output_vision_frame = process_frame(
 	{
+		'frame_number': 0,
 		'reference_faces': reference_faces,
 		'source_face': source_face,
 		'target_vision_frame': target_vision_frame
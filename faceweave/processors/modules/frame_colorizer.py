@@ -14,9 +14,8 @@ from faceweave.filesystem import in_directory, is_image, is_video, resolve_relat
 from faceweave.processors import choices as processors_choices
 from faceweave.processors.typing import FrameColorizerInputs
 from faceweave.program_helper import find_argument_group
-from faceweave.thread_helper import thread_semaphore
 from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import read_image, read_static_image, unpack_resolution, write_image
+from faceweave.vision import read_static_image, unpack_resolution, write_image
 
 MODEL_SET : ModelSet =\
 {
@@ -194,11 +193,10 @@ def colorize_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
 def forward(color_vision_frame : VisionFrame) -> VisionFrame:
 	frame_colorizer = get_inference_pool().get('frame_colorizer')
 
-	with thread_semaphore():
-		color_vision_frame = frame_colorizer.run(None,
-		{
-			'input': color_vision_frame
-		})[0][0]
+	color_vision_frame = inference_manager.run_inference(frame_colorizer,
+	{
+		'input': color_vision_frame
+	})[0][0]
 
 	return color_vision_frame
 
@@ -260,13 +258,12 @@ def process_frame(inputs : FrameColorizerInputs) -> VisionFrame:
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
@@ -1,8 +1,12 @@
+import threading
 from argparse import ArgumentParser
-from typing import List
+from functools import lru_cache
+from time import time
+from typing import List, Tuple
 
 import cv2
 import numpy
+from cv2.typing import Size
 
 import faceweave.jobs.job_manager
 import faceweave.jobs.job_store
@@ -11,13 +15,15 @@ from faceweave import config, content_analyser, inference_manager, logger, proce
 from faceweave.common_helper import create_int_metavar
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.filesystem import in_directory, is_image, is_video, resolve_relative_path, same_file_extension
+from faceweave.memory import detect_available_memory
 from faceweave.processors import choices as processors_choices
-from faceweave.processors.typing import FrameEnhancerInputs
+from faceweave.processors.typing import FrameEnhancerInputs, FrameEnhancerModel
 from faceweave.program_helper import find_argument_group
-from faceweave.thread_helper import conditional_thread_semaphore
-from faceweave.typing import ApplyStateItem, Args, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import create_tile_frames, merge_tile_frames, read_image, read_static_image, write_image
+from faceweave.typing import ApplyStateItem, Args, ExecutionProviderKey, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from faceweave.vision import calc_tiles_per_row, create_tile_frames, crop_merge_frame, read_static_image, write_image, write_tile_frame
 
+TILE_SIZE_LOCK : threading.Lock = threading.Lock()
+TILE_BYTES_PER_PIXEL : int = 64 * 4
 MODEL_SET : ModelSet =\
 {
 	'clear_reality_x4':
@@ -296,12 +302,16 @@ def register_args(program : ArgumentParser) -> None:
 	if group_processors:
 		group_processors.add_argument('--frame-enhancer-model', help = wording.get('help.frame_enhancer_model'), default = config.get_str_value('processors.frame_enhancer_model', 'span_kendata_x4'), choices = processors_choices.frame_enhancer_models)
 		group_processors.add_argument('--frame-enhancer-blend', help = wording.get('help.frame_enhancer_blend'), type = int, default = config.get_int_value('processors.frame_enhancer_blend', '80'), choices = processors_choices.frame_enhancer_blend_range, metavar = create_int_metavar(processors_choices.frame_enhancer_blend_range))
-		faceweave.jobs.job_store.register_step_keys([ 'frame_enhancer_model', 'frame_enhancer_blend' ])
+		group_processors.add_argument('--frame-enhancer-batch-size', help = wording.get('help.frame_enhancer_batch_size'), type = int, default = config.get_int_value('processors.frame_enhancer_batch_size', '4'), choices = processors_choices.frame_enhancer_batch_size_range, metavar = create_int_metavar(processors_choices.frame_enhancer_batch_size_range))
+		group_processors.add_argument('--frame-enhancer-tile-size', help = wording.get('help.frame_enhancer_tile_size'), default = config.get_str_value('processors.frame_enhancer_tile_size', 'model'), choices = processors_choices.frame_enhancer_tile_sizes)
+		faceweave.jobs.job_store.register_step_keys([ 'frame_enhancer_model', 'frame_enhancer_blend', 'frame_enhancer_batch_size', 'frame_enhancer_tile_size' ])
 
 
 def apply_args(args : Args, apply_state_item : ApplyStateItem) -> None:
 	apply_state_item('frame_enhancer_model', args.get('frame_enhancer_model'))
 	apply_state_item('frame_enhancer_blend', args.get('frame_enhancer_blend'))
+	apply_state_item('frame_enhancer_batch_size', args.get('frame_enhancer_batch_size'))
+	apply_state_item('frame_enhancer_tile_size', args.get('frame_enhancer_tile_size'))
 
 
 def pre_check() -> bool:
@@ -327,6 +337,7 @@ def pre_process(mode : ProcessMode) -> bool:
 
 def post_process() -> None:
 	read_static_image.cache_clear()
+	calc_tile_size.cache_clear()
 	if state_manager.get_item('video_memory_strategy') in [ 'strict', 'moderate' ]:
 		clear_inference_pool()
 	if state_manager.get_item('video_memory_strategy') == 'strict':
@@ -334,31 +345,68 @@ def post_process() -> None:
 
 
 def enhance_frame(temp_vision_frame : VisionFrame) -> VisionFrame:
-	model_size = get_model_options().get('size')
 	model_scale = get_model_options().get('scale')
+	frame_enhancer_batch_size = state_manager.get_item('frame_enhancer_batch_size')
+	tile_size = resolve_tile_size()
+	merge_size = (tile_size[0] * model_scale, tile_size[1] * model_scale, tile_size[2] * model_scale)
 	temp_height, temp_width = temp_vision_frame.shape[:2]
-	tile_vision_frames, pad_width, pad_height = create_tile_frames(temp_vision_frame, model_size)
+	tile_vision_frames, pad_width, pad_height = create_tile_frames(temp_vision_frame, tile_size)
+	tiles_per_row = calc_tiles_per_row(pad_width, tile_size, len(tile_vision_frames))
+	merge_vision_frame = numpy.empty((pad_height * model_scale, pad_width * model_scale, 3), dtype = numpy.uint8)
+
+	for index in range(0, len(tile_vision_frames), frame_enhancer_batch_size):
+		batch_vision_frames = [ prepare_tile_frame(tile_vision_frame) for tile_vision_frame in tile_vision_frames[index:index + frame_enhancer_batch_size] ]
 
-	for index, tile_vision_frame in enumerate(tile_vision_frames):
-		tile_vision_frame = prepare_tile_frame(tile_vision_frame)
-		tile_vision_frame = forward(tile_vision_frame)
-		tile_vision_frames[index] = normalize_tile_frame(tile_vision_frame)
+		for tile_index, tile_vision_frame in enumerate(forward(batch_vision_frames), index):
+			write_tile_frame(merge_vision_frame, normalize_tile_frame(tile_vision_frame), tile_index, tiles_per_row, merge_size)
 
-	merge_vision_frame = merge_tile_frames(tile_vision_frames, temp_width * model_scale, temp_height * model_scale, pad_width * model_scale, pad_height * model_scale, (model_size[0] * model_scale, model_size[1] * model_scale, model_size[2] * model_scale))
+	merge_vision_frame = crop_merge_frame(merge_vision_frame, temp_width * model_scale, temp_height * model_scale, merge_size)
 	temp_vision_frame = blend_frame(temp_vision_frame, merge_vision_frame)
 	return temp_vision_frame
 
 
-def forward(tile_vision_frame : VisionFrame) -> VisionFrame:
+def resolve_tile_size() -> Size:
+	if state_manager.get_item('frame_enhancer_tile_size') == 'auto':
+		with TILE_SIZE_LOCK:
+			return calc_tile_size(state_manager.get_item('frame_enhancer_model'), state_manager.get_item('frame_enhancer_batch_size'), state_manager.get_item('execution_device_id'), tuple(state_manager.get_item('execution_providers')), state_manager.get_item('execution_thread_count'))
+	return get_model_options().get('size')
+
+
+@lru_cache(maxsize = None)
+def calc_tile_size(frame_enhancer_model : FrameEnhancerModel, frame_enhancer_batch_size : int, execution_device_id : str, execution_providers : Tuple[ExecutionProviderKey, ...], execution_thread_count : int) -> Size:
+	model_size = get_model_options().get('size')
+	model_scale = get_model_options().get('scale')
+	frame_enhancer = get_inference_pool().get('frame_enhancer')
+	tile_sizes = [ model_size ]
+
+	if not all(isinstance(input_dimension, int) for input_dimension in frame_enhancer.get_inputs()[0].shape[2:]):
+		available_memory = detect_available_memory(execution_device_id, list(execution_providers)) // execution_thread_count
+		tile_sizes.extend((model_size[0] * tile_factor, model_size[1], model_size[2]) for tile_factor in [ 2, 4 ] if frame_enhancer_batch_size * (model_size[0] * tile_factor * model_scale) ** 2 * TILE_BYTES_PER_PIXEL < available_memory)
+
+	tile_size = max(tile_sizes, key = lambda candidate_size: measure_tile_throughput(candidate_size, frame_enhancer_batch_size))
+	logger.debug(wording.get('frame_enhancer_tile_size_picked').format(tile_size = tile_size[0]), __name__)
+	return tile_size
+
+
+def measure_tile_throughput(tile_size : Size, frame_enhancer_batch_size : int) -> float:
+	tile_vision_frame = prepare_tile_frame(numpy.zeros((tile_size[0], tile_size[0], 3), dtype = numpy.uint8))
+	forward([ tile_vision_frame ])
+	start_time = time()
+	forward([ tile_vision_frame ] * frame_enhancer_batch_size)
+	return frame_enhancer_batch_size * tile_size[0] ** 2 / max(time() - start_time, 1e-6)
+
+
+def forward(tile_vision_frames : List[VisionFrame]) -> List[VisionFrame]:
 	frame_enhancer = get_inference_pool().get('frame_enhancer')
 
-	with conditional_thread_semaphore():
-		tile_vision_frame = frame_enhancer.run(None,
+	predictions = inference_manager.run_batch(frame_enhancer,
+	[
 		{
 			'input': tile_vision_frame
-		})[0]
+		} for tile_vision_frame in tile_vision_frames
+	])
 
-	return tile_vision_frame
+	return [ prediction[0] for prediction in predictions ]
 
 
 def prepare_tile_frame(vision_tile_frame : VisionFrame) -> VisionFrame:
@@ -392,13 +440,12 @@ def process_frame(inputs : FrameEnhancerInputs) -> VisionFrame:
 
 def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
 	for queue_payload in process_manager.manage(queue_payloads):
-		target_vision_path = queue_payload['frame_path']
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
@@ -12,17 +12,16 @@ from faceweave.audio import create_empty_audio_frame, get_voice_frame, read_stat
 from faceweave.common_helper import get_first
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.face_analyser import get_many_faces, get_one_face
-from faceweave.face_helper import create_bounding_box, paste_back, warp_face_by_bounding_box, warp_face_by_face_landmark_5
-from faceweave.face_masker import create_mouth_mask, create_occlusion_mask, create_static_box_mask
+from faceweave.face_helper import create_bounding_box, paste_back_many, warp_face_by_bounding_box, warp_face_by_face_landmark_5
+from faceweave.face_masker import create_mouth_mask, create_static_box_mask, get_occlusion_mask
 from faceweave.face_selector import find_similar_faces, sort_and_filter_faces
 from faceweave.face_store import get_reference_faces
 from faceweave.filesystem import filter_audio_paths, has_audio, in_directory, is_image, is_video, resolve_relative_path, same_file_extension
 from faceweave.processors import choices as processors_choices
 from faceweave.processors.typing import LipSyncerInputs
 from faceweave.program_helper import find_argument_group
-from faceweave.thread_helper import conditional_thread_semaphore
-from faceweave.typing import ApplyStateItem, Args, AudioFrame, Face, InferencePool, ModelOptions, ModelSet, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
-from faceweave.vision import read_image, read_static_image, restrict_video_fps, write_image
+from faceweave.typing import ApplyStateItem, Args, AudioFrame, Face, InferencePool, ModelOptions, ModelSet, PastePatch, ProcessMode, QueuePayload, UpdateProgress, VisionFrame
+from faceweave.vision import read_static_image, restrict_video_fps, write_image
 
 MODEL_SET : ModelSet =\
 {
@@ -136,8 +135,17 @@ def post_process() -> None:
 
 
 def sync_lip(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_frame : VisionFrame) -> VisionFrame:
-	model_size = get_model_options().get('size')
+	return sync_many_lips([ target_face ], temp_audio_frame, temp_vision_frame)
+
+
+def sync_many_lips(target_faces : List[Face], temp_audio_frame : AudioFrame, temp_vision_frame : VisionFrame) -> VisionFrame:
 	temp_audio_frame = prepare_audio_frame(temp_audio_frame)
+	paste_patches = [ create_lip_patch(target_face, temp_audio_frame, temp_vision_frame) for target_face in target_faces ]
+	return paste_back_many(temp_vision_frame, paste_patches)
+
+
+def create_lip_patch(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_frame : VisionFrame) -> PastePatch:
+	model_size = get_model_options().get('size')
 	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, target_face.landmark_set.get('5/68'), 'ffhq_512', (512, 512))
 	face_landmark_68 = cv2.transform(target_face.landmark_set.get('68').reshape(1, -1, 2), affine_matrix).reshape(-1, 2)
 	bounding_box = create_bounding_box(face_landmark_68)
@@ -151,7 +159,7 @@ def sync_lip(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_fram
 	]
 
 	if 'occlusion' in state_manager.get_item('face_mask_types'):
-		occlusion_mask = create_occlusion_mask(crop_vision_frame)
+		occlusion_mask = get_occlusion_mask(target_face, crop_vision_frame, affine_matrix)
 		crop_masks.append(occlusion_mask)
 
 	close_vision_frame, close_matrix = warp_face_by_bounding_box(crop_vision_frame, bounding_box, model_size)
@@ -160,19 +168,17 @@ def sync_lip(target_face : Face, temp_audio_frame : AudioFrame, temp_vision_fram
 	close_vision_frame = normalize_close_frame(close_vision_frame)
 	crop_vision_frame = cv2.warpAffine(close_vision_frame, cv2.invertAffineTransform(close_matrix), (512, 512), borderMode = cv2.BORDER_REPLICATE)
 	crop_mask = numpy.minimum.reduce(crop_masks)
-	paste_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
-	return paste_vision_frame
+	return crop_vision_frame, crop_mask, affine_matrix
 
 
 def forward(temp_audio_frame : AudioFrame, close_vision_frame : VisionFrame) -> VisionFrame:
 	lip_syncer = get_inference_pool().get('lip_syncer')
 
-	with conditional_thread_semaphore():
-		close_vision_frame = lip_syncer.run(None,
-		{
-			'source': temp_audio_frame,
-			'target': close_vision_frame
-		})[0]
+	close_vision_frame = inference_manager.run_inference(lip_syncer,
+	{
+		'source': temp_audio_frame,
+		'target': close_vision_frame
+	})[0]
 
 	return close_vision_frame
 
@@ -209,12 +215,11 @@ def process_frame(inputs : LipSyncerInputs) -> VisionFrame:
 	reference_faces = inputs.get('reference_faces')
 	source_audio_frame = inputs.get('source_audio_frame')
 	target_vision_frame = inputs.get('target_vision_frame')
-	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ]))
+	many_faces = sort_and_filter_faces(get_many_faces([ target_vision_frame ], inputs.get('frame_number')))
 
 	if state_manager.get_item('face_selector_mode') == 'many':
 		if many_faces:
-			for target_face in many_faces:
-				target_vision_frame = sync_lip(target_face, source_audio_frame, target_vision_frame)
+			target_vision_frame = sync_many_lips(many_faces, source_audio_frame, target_vision_frame)
 	if state_manager.get_item('face_selector_mode') == 'one':
 		target_face = get_one_face(many_faces)
 		if target_face:
@@ -222,8 +227,7 @@ def process_frame(inputs : LipSyncerInputs) -> VisionFrame:
 	if state_manager.get_item('face_selector_mode') == 'reference':
 		similar_faces = find_similar_faces(many_faces, reference_faces, state_manager.get_item('reference_face_distance'))
 		if similar_faces:
-			for similar_face in similar_faces:
-				target_vision_frame = sync_lip(similar_face, source_audio_frame, target_vision_frame)
+			target_vision_frame = sync_many_lips(similar_faces, source_audio_frame, target_vision_frame)
 	return target_vision_frame
 
 
@@ -234,27 +238,28 @@ def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload]
 
 	for queue_payload in process_manager.manage(queue_payloads):
 		frame_number = queue_payload.get('frame_number')
-		target_vision_path = queue_payload.get('frame_path')
 		source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number)
 		if not numpy.any(source_audio_frame):
 			source_audio_frame = create_empty_audio_frame()
-		target_vision_frame = read_image(target_vision_path)
+		target_vision_frame = processors.read_queue_frame(queue_payload)
 		output_vision_frame = process_frame(
 		{
+			'frame_number': queue_payload.get('frame_number'),
 			'reference_faces': reference_faces,
 			'source_audio_frame': source_audio_frame,
 			'target_vision_frame': target_vision_frame
 		})
-		write_image(target_vision_path, output_vision_frame)
+		processors.write_queue_frame(queue_payload, output_vision_frame)
 		update_progress(1)
 
 
 def process_image(source_paths : List[str], target_path : str, output_path : str) -> None:
 	reference_faces = get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None
 	source_audio_frame = create_empty_audio_frame()
-	target_vision_frame = read_static_image(target_path)
+	target_vision_frame = read_static_image(target_path).copy()
 	output_vision_frame = process_frame(
 	{
+		'frame_number': 0,
 		'reference_faces': reference_faces,
 		'source_audio_frame': source_audio_frame,
 		'target_vision_frame': target_vision_frame
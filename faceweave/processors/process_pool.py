@@ -0,0 +1,187 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.shared_memory import SharedMemory
+from queue import Queue
+from time import time
+from typing import Any, Dict, List, Tuple
+
+import numpy
+
+from faceweave import process_manager, state_manager
+from faceweave.face_analyser import get_many_faces, release_many_frame_faces
+from faceweave.face_store import append_reference_face, clear_static_faces, get_reference_faces, set_static_faces
+from faceweave.filesystem import filter_image_paths
+from faceweave.typing import FaceSet, FrameRing, FrameSlot, ProcessFrames, QueuePayload, VisionFrame, WorkerStatistics
+from faceweave.vision import read_image, read_static_image
+
+PROCESS_POOLS : Dict[int, ProcessPoolExecutor] = {}
+PROCESS_POOL_LOCK : threading.Lock = threading.Lock()
+WORKER_SHARED_MEMORIES : Dict[str, SharedMemory] = {}
+WORKER_SOURCE_FACE_SET : FaceSet = {}
+WORKER_FRAME_STAGES : Dict[str, int] = {}
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+	execution_thread_count = state_manager.get_item('execution_thread_count')
+
+	with PROCESS_POOL_LOCK:
+		if execution_thread_count not in PROCESS_POOLS:
+			PROCESS_POOLS[execution_thread_count] = create_process_pool(state_manager.get_item('source_paths'))
+		return PROCESS_POOLS.get(execution_thread_count)
+
+
+def clear_process_pools() -> None:
+	with PROCESS_POOL_LOCK:
+		for process_pool in PROCESS_POOLS.values():
+			process_pool.shutdown(cancel_futures = True)
+		PROCESS_POOLS.clear()
+
+
+def create_process_pool(source_paths : List[str]) -> ProcessPoolExecutor:
+	worker_state : Dict[str, Any] = dict(state_manager.get_state())
+	reference_face_set = get_reference_faces() or {}
+	source_face_set = create_source_face_set(source_paths)
+	return ProcessPoolExecutor(max_workers = state_manager.get_item('execution_thread_count'), mp_context = multiprocessing.get_context('spawn'), initializer = init_process_worker, initargs = (worker_state, reference_face_set, source_face_set))
+
+
+def create_source_face_set(source_paths : List[str]) -> FaceSet:
+	source_face_set : FaceSet = {}
+
+	if source_paths and 'face_swapper' in state_manager.get_item('processors'):
+		for source_path in filter_image_paths(source_paths):
+			source_face_set[source_path] = get_many_faces([ read_static_image(source_path) ])
+	return source_face_set
+
+
+def init_process_worker(worker_state : Dict[str, Any], reference_face_set : FaceSet, source_face_set : FaceSet) -> None:
+	for key, value in worker_state.items():
+		state_manager.init_item(key, value) #type:ignore[arg-type]
+
+	for reference_name, reference_faces in reference_face_set.items():
+		for reference_face in reference_faces:
+			append_reference_face(reference_name, reference_face)
+
+	WORKER_SOURCE_FACE_SET.update(source_face_set)
+	seed_source_faces()
+	process_manager.start()
+
+
+def seed_source_faces() -> None:
+	for source_path, source_faces in WORKER_SOURCE_FACE_SET.items():
+		set_static_faces(read_static_image(source_path), source_faces)
+
+
+def process_worker_payloads(process_frames : ProcessFrames, source_paths : List[str], queue_payloads : List[QueuePayload], frame_stage : int) -> Tuple[int, WorkerStatistics]:
+	if WORKER_FRAME_STAGES.setdefault('frame_stage', frame_stage) != frame_stage:
+		clear_static_faces()
+		seed_source_faces()
+		WORKER_FRAME_STAGES['frame_stage'] = frame_stage
+	start_time = time()
+	process_frames(source_paths, queue_payloads, lambda _: None)
+	release_many_frame_faces(read_image(queue_payloads[0].get('frame_path')), [ queue_payload.get('frame_number') for queue_payload in queue_payloads ])
+	worker_statistic : WorkerStatistics =\
+	{
+		'frame_total': len(queue_payloads),
+		'busy_time': time() - start_time,
+		'utilization': 0.0
+	}
+	return os.getpid(), worker_statistic
+
+
+def process_ring_payloads(process_frames : ProcessFrames, source_paths : List[str], shared_memory_name : str, slot_size : int, frame_slots : List[FrameSlot]) -> List[FrameSlot]:
+	shared_memory = attach_shared_memory(shared_memory_name)
+	output_slots = []
+	queue_payloads : List[QueuePayload] =\
+	[
+		{
+			'frame_number': frame_slot.get('frame_number'),
+			'frame_path': None,
+			'vision_frame': create_slot_frame(shared_memory, slot_size, frame_slot.get('slot_index'), frame_slot.get('shape')).copy()
+		} for frame_slot in frame_slots
+	]
+	process_frames(source_paths, queue_payloads, lambda _: None)
+
+	for frame_slot, queue_payload in zip(frame_slots, queue_payloads):
+		vision_frame = queue_payload.get('vision_frame')
+		output_slot : FrameSlot =\
+		{
+			'frame_number': frame_slot.get('frame_number'),
+			'slot_index': frame_slot.get('slot_index'),
+			'shape': vision_frame.shape,
+			'overflow_name': None
+		}
+
+		if vision_frame.size <= slot_size:
+			create_slot_frame(shared_memory, slot_size, frame_slot.get('slot_index'), vision_frame.shape)[:] = vision_frame
+		else:
+			overflow_memory = SharedMemory(create = True, size = vision_frame.size)
+			create_slot_frame(overflow_memory, 0, 0, vision_frame.shape)[:] = vision_frame
+			output_slot['overflow_name'] = overflow_memory.name
+			overflow_memory.close()
+		output_slots.append(output_slot)
+	return output_slots
+
+
+def attach_shared_memory(shared_memory_name : str) -> SharedMemory:
+	if shared_memory_name not in WORKER_SHARED_MEMORIES:
+		WORKER_SHARED_MEMORIES[shared_memory_name] = SharedMemory(name = shared_memory_name)
+	return WORKER_SHARED_MEMORIES.get(shared_memory_name)
+
+
+def create_frame_ring(slot_size : int, slot_total : int) -> FrameRing:
+	free_slots : Queue[int] = Queue()
+
+	for slot_index in range(slot_total):
+		free_slots.put(slot_index)
+	return\
+	{
+		'shared_memory': SharedMemory(create = True, size = slot_size * slot_total),
+		'slot_size': slot_size,
+		'free_slots': free_slots
+	}
+
+
+def destroy_frame_ring(frame_ring : FrameRing) -> None:
+	frame_ring.get('shared_memory').close()
+	frame_ring.get('shared_memory').unlink()
+
+
+def write_frame_ring(frame_ring : FrameRing, queue_payload : QueuePayload) -> FrameSlot:
+	vision_frame = queue_payload.get('vision_frame')
+	slot_index = frame_ring.get('free_slots').get()
+	create_slot_frame(frame_ring.get('shared_memory'), frame_ring.get('slot_size'), slot_index, vision_frame.shape)[:] = vision_frame
+	return\
+	{
+		'frame_number': queue_payload.get('frame_number'),
+		'slot_index': slot_index,
+		'shape': vision_frame.shape,
+		'overflow_name': None
+	}
+
+
+def read_frame_ring(frame_ring : FrameRing, frame_slots : List[FrameSlot]) -> List[QueuePayload]:
+	queue_payloads = []
+
+	for frame_slot in frame_slots:
+		if frame_slot.get('overflow_name'):
+			overflow_memory = SharedMemory(name = frame_slot.get('overflow_name'))
+			vision_frame = create_slot_frame(overflow_memory, 0, 0, frame_slot.get('shape')).copy()
+			overflow_memory.close()
+			overflow_memory.unlink()
+		else:
+			vision_frame = create_slot_frame(frame_ring.get('shared_memory'), frame_ring.get('slot_size'), frame_slot.get('slot_index'), frame_slot.get('shape')).copy()
+		frame_ring.get('free_slots').put(frame_slot.get('slot_index'))
+		queue_payload : QueuePayload =\
+		{
+			'frame_number': frame_slot.get('frame_number'),
+			'frame_path': None,
+			'vision_frame': vision_frame
+		}
+		queue_payloads.append(queue_payload)
+	return queue_payloads
+
+
+def create_slot_frame(shared_memory : SharedMemory, slot_size : int, slot_index : int, shape : Tuple[int, ...]) -> VisionFrame:
+	return numpy.ndarray(shape, dtype = numpy.uint8, buffer = shared_memory.buf, offset = slot_size * slot_index)
@@ -12,38 +12,45 @@ FaceEnhancerModel = Literal['codeformer', 'gfpgan_1.2', 'gfpgan_1.3', 'gfpgan_1.
 FaceSwapperModel = Literal['blendswap_256', 'ghost_256_unet_1', 'ghost_256_unet_2', 'ghost_256_unet_3', 'inswapper_128', 'inswapper_128_fp16', 'simswap_256', 'simswap_512_unofficial', 'uniface_256']
 FrameColorizerModel = Literal['ddcolor', 'ddcolor_artistic', 'deoldify', 'deoldify_artistic', 'deoldify_stable']
 FrameEnhancerModel = Literal['clear_reality_x4', 'lsdir_x4', 'nomos8k_sc_x4', 'real_esrgan_x2', 'real_esrgan_x2_fp16', 'real_esrgan_x4', 'real_esrgan_x4_fp16', 'real_hatgan_x4', 'real_esrgan_x8', 'real_esrgan_x8_fp16', 'span_kendata_x4', 'ultra_sharp_x4']
+FrameEnhancerTileSize = Literal['model', 'auto']
 LipSyncerModel = Literal['wav2lip', 'wav2lip_gan']
 
 FaceSwapperSet = Dict[FaceSwapperModel, List[str]]
 
 AgeModifierInputs = TypedDict('AgeModifierInputs',
 {
+	'frame_number' : int,
 	'reference_faces' : FaceSet,
 	'target_vision_frame' : VisionFrame
 })
 ExpressionRestorerInputs = TypedDict('ExpressionRestorerInputs',
 {
+	'frame_number' : int,
 	'reference_faces' : FaceSet,
 	'source_vision_frame' : VisionFrame,
 	'target_vision_frame' : VisionFrame
 })
 FaceDebuggerInputs = TypedDict('FaceDebuggerInputs',
 {
+	'frame_number' : int,
 	'reference_faces' : FaceSet,
 	'target_vision_frame' : VisionFrame
 })
 FaceEditorInputs = TypedDict('FaceEditorInputs',
 {
+	'frame_number' : int,
 	'reference_faces' : FaceSet,
 	'target_vision_frame' : VisionFrame
 })
 FaceEnhancerInputs = TypedDict('FaceEnhancerInputs',
 {
+	'frame_number' : int,
 	'reference_faces' : FaceSet,
 	'target_vision_frame' : VisionFrame
 })
 FaceSwapperInputs = TypedDict('FaceSwapperInputs',
 {
+	'frame_number' : int,
 	'reference_faces' : FaceSet,
 	'source_face' : Face,
 	'target_vision_frame' : VisionFrame
@@ -58,6 +65,7 @@ FrameEnhancerInputs = TypedDict('FrameEnhancerInputs',
 })
 LipSyncerInputs = TypedDict('LipSyncerInputs',
 {
+	'frame_number' : int,
 	'reference_faces' : FaceSet,
 	'source_audio_frame' : AudioFrame,
 	'target_vision_frame' : VisionFrame
@@ -94,6 +102,8 @@ ProcessorStateKey = Literal\
 	'frame_colorizer_size',
 	'frame_enhancer_model',
 	'frame_enhancer_blend',
+	'frame_enhancer_batch_size',
+	'frame_enhancer_tile_size',
 	'lip_syncer_model'
 ]
 ProcessorState = TypedDict('ProcessorState',
@@ -110,6 +120,8 @@ ProcessorState = TypedDict('ProcessorState',
 	'frame_colorizer_size' : str,
 	'frame_enhancer_model' : FrameEnhancerModel,
 	'frame_enhancer_blend' : int,
+	'frame_enhancer_batch_size' : int,
+	'frame_enhancer_tile_size' : FrameEnhancerTileSize,
 	'lip_syncer_model' : LipSyncerModel
 })
 ProcessorStateSet = Dict[AppContext, ProcessorState]
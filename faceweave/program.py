@@ -62,6 +62,15 @@ def create_face_landmarker_program() -> ArgumentParser:
 	return program
 
 
+def create_face_tracker_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_face_tracker = program.add_argument_group('face tracker')
+	group_face_tracker.add_argument('--face-tracker-interval', help = wording.get('help.face_tracker_interval'), type = int, default = config.get_int_value('face_tracker.face_tracker_interval', '1'), choices = faceweave.choices.face_tracker_interval_range, metavar = create_int_metavar(faceweave.choices.face_tracker_interval_range))
+	group_face_tracker.add_argument('--face-tracker-verify-interval', help = wording.get('help.face_tracker_verify_interval'), type = int, default = config.get_int_value('face_tracker.face_tracker_verify_interval', '30'), choices = faceweave.choices.face_tracker_verify_interval_range, metavar = create_int_metavar(faceweave.choices.face_tracker_verify_interval_range))
+	job_store.register_step_keys([ 'face_tracker_interval', 'face_tracker_verify_interval' ])
+	return program
+
+
 def create_face_selector_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_face_selector = program.add_argument_group('face selector')
@@ -85,7 +94,8 @@ def create_face_masker_program() -> ArgumentParser:
 	group_face_masker.add_argument('--face-mask-blur', help = wording.get('help.face_mask_blur'), type = float, default = config.get_float_value('face_masker.face_mask_blur', '0.3'), choices = faceweave.choices.face_mask_blur_range, metavar = create_float_metavar(faceweave.choices.face_mask_blur_range))
 	group_face_masker.add_argument('--face-mask-padding', help = wording.get('help.face_mask_padding'), type = int, default = config.get_int_list('face_masker.face_mask_padding', '0 0 0 0'), nargs = '+')
 	group_face_masker.add_argument('--face-mask-regions', help = wording.get('help.face_mask_regions').format(choices = ', '.join(faceweave.choices.face_mask_regions)), default = config.get_str_list('face_masker.face_mask_regions', ' '.join(faceweave.choices.face_mask_regions)), choices = faceweave.choices.face_mask_regions, nargs = '+', metavar = 'FACE_MASK_REGIONS')
-	job_store.register_step_keys([ 'face_mask_types', 'face_mask_blur', 'face_mask_padding', 'face_mask_regions' ])
+	group_face_masker.add_argument('--face-mask-interval', help = wording.get('help.face_mask_interval'), type = int, default = config.get_int_value('face_masker.face_mask_interval', '1'), choices = faceweave.choices.face_mask_interval_range, metavar = create_int_metavar(faceweave.choices.face_mask_interval_range))
+	job_store.register_step_keys([ 'face_mask_types', 'face_mask_blur', 'face_mask_padding', 'face_mask_regions', 'face_mask_interval' ])
 	return program
 
 
@@ -96,7 +106,9 @@ def create_frame_extraction_program() -> ArgumentParser:
 	group_frame_extraction.add_argument('--trim-frame-end',	help = wording.get('help.trim_frame_end'), type = int, default = faceweave.config.get_int_value('frame_extraction.trim_frame_end'))
 	group_frame_extraction.add_argument('--temp-frame-format', help = wording.get('help.temp_frame_format'), default = config.get_str_value('frame_extraction.temp_frame_format', 'png'), choices = faceweave.choices.temp_frame_formats)
 	group_frame_extraction.add_argument('--keep-temp', help = wording.get('help.keep_temp'), action = 'store_true',	default = config.get_bool_value('frame_extraction.keep_temp'))
-	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp' ])
+	group_frame_extraction.add_argument('--video-process-mode', help = wording.get('help.video_process_mode'), default = config.get_str_value('frame_extraction.video_process_mode', 'disk'), choices = faceweave.choices.video_process_modes)
+	group_frame_extraction.add_argument('--duplicate-frame-threshold', help = wording.get('help.duplicate_frame_threshold'), type = int, default = config.get_int_value('frame_extraction.duplicate_frame_threshold'), choices = faceweave.choices.duplicate_frame_threshold_range, metavar = create_int_metavar(faceweave.choices.duplicate_frame_threshold_range))
+	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp', 'video_process_mode', 'duplicate_frame_threshold' ])
 	return program
 
 
@@ -145,7 +157,11 @@ def create_execution_program() -> ArgumentParser:
 	group_execution.add_argument('--execution-providers', help = wording.get('help.execution_providers').format(choices = ', '.join(execution_providers)), default = config.get_str_list('execution.execution_providers', 'cpu'), choices = execution_providers, nargs = '+', metavar = 'EXECUTION_PROVIDERS')
 	group_execution.add_argument('--execution-thread-count', help = wording.get('help.execution_thread_count'), type = int, default = config.get_int_value('execution.execution_thread_count', '4'), choices = faceweave.choices.execution_thread_count_range, metavar = create_int_metavar(faceweave.choices.execution_thread_count_range))
 	group_execution.add_argument('--execution-queue-count', help = wording.get('help.execution_queue_count'), type = int, default = config.get_int_value('execution.execution_queue_count', '1'), choices = faceweave.choices.execution_queue_count_range, metavar = create_int_metavar(faceweave.choices.execution_queue_count_range))
-	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count' ])
+	group_execution.add_argument('--execution-batch-size', help = wording.get('help.execution_batch_size'), type = int, default = config.get_int_value('execution.execution_batch_size', '1'), choices = faceweave.choices.execution_batch_size_range, metavar = create_int_metavar(faceweave.choices.execution_batch_size_range))
+	group_execution.add_argument('--execution-batch-timeout', help = wording.get('help.execution_batch_timeout'), type = int, default = config.get_int_value('execution.execution_batch_timeout', '5'), choices = faceweave.choices.execution_batch_timeout_range, metavar = create_int_metavar(faceweave.choices.execution_batch_timeout_range))
+	group_execution.add_argument('--execution-concurrency-policy', help = wording.get('help.execution_concurrency_policy'), default = config.get_str_value('execution.execution_concurrency_policy', 'auto'), choices = faceweave.choices.execution_concurrency_policies)
+	group_execution.add_argument('--execution-mode', help = wording.get('help.execution_mode'), default = config.get_str_value('execution.execution_mode', 'thread'), choices = faceweave.choices.execution_modes)
+	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count', 'execution_batch_size', 'execution_batch_timeout', 'execution_concurrency_policy', 'execution_mode' ])
 	return program
 
 
@@ -154,7 +170,10 @@ def create_memory_program() -> ArgumentParser:
 	group_memory = program.add_argument_group('memory')
 	group_memory.add_argument('--video-memory-strategy', help = wording.get('help.video_memory_strategy'), default = config.get_str_value('memory.video_memory_strategy', 'strict'), choices = faceweave.choices.video_memory_strategies)
 	group_memory.add_argument('--system-memory-limit', help = wording.get('help.system_memory_limit'), type = int, default = config.get_int_value('memory.system_memory_limit', '0'), choices = faceweave.choices.system_memory_limit_range, metavar = create_int_metavar(faceweave.choices.system_memory_limit_range))
-	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit' ])
+	group_memory.add_argument('--cache-memory-limit', help = wording.get('help.cache_memory_limit'), type = int, default = config.get_int_value('memory.cache_memory_limit', '4'), choices = faceweave.choices.cache_memory_limit_range, metavar = create_int_metavar(faceweave.choices.cache_memory_limit_range))
+	group_memory.add_argument('--crop-cache-tolerance', help = wording.get('help.crop_cache_tolerance'), type = int, default = config.get_int_value('memory.crop_cache_tolerance'), choices = faceweave.choices.crop_cache_tolerance_range, metavar = create_int_metavar(faceweave.choices.crop_cache_tolerance_range))
+	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit', 'cache_memory_limit' ])
+	job_store.register_step_keys([ 'crop_cache_tolerance' ])
 	return program
 
 
@@ -194,7 +213,7 @@ def create_step_index_program() -> ArgumentParser:
 
 
 def collect_step_program() -> ArgumentParser:
-	return ArgumentParser(parents= [ create_config_program(), create_jobs_path_program(), create_paths_program(), create_face_detector_program(), create_face_landmarker_program(), create_face_selector_program(), create_face_masker_program(), create_frame_extraction_program(), create_output_creation_program(), create_processors_program() ], add_help = False)
+	return ArgumentParser(parents= [ create_config_program(), create_jobs_path_program(), create_paths_program(), create_face_detector_program(), create_face_landmarker_program(), create_face_tracker_program(), create_face_selector_program(), create_face_masker_program(), create_frame_extraction_program(), create_output_creation_program(), create_processors_program() ], add_help = False)
 
 
 def collect_job_program() -> ArgumentParser:
@@ -3,7 +3,10 @@ from typing import Any, Dict
 import numpy
 
 from faceweave import logger, state_manager
-from faceweave.face_store import get_face_store
+from faceweave.cache_manager import get_cache_statistics
+from faceweave.crop_cache import get_crop_cache_hit_rate
+from faceweave.face_store import get_static_face_set
+from faceweave.frame_deduplicator import count_duplicate_frames
 from faceweave.typing import FaceSet
 
 
@@ -20,11 +23,14 @@ def create_statistics(static_faces : FaceSet) -> Dict[str, Any]:
 		'average_face_landmarker_score': 0,
 		'total_face_landmark_5_fallbacks': 0,
 		'total_frames_with_faces': 0,
-		'total_faces': 0
+		'total_faces': 0,
+		'total_reused_frames': count_duplicate_frames(),
+		'crop_cache_hit_rate': get_crop_cache_hit_rate()
 	}
 
 	for faces in static_faces.values():
-		statistics['total_frames_with_faces'] = statistics.get('total_frames_with_faces') + 1
+		if faces:
+			statistics['total_frames_with_faces'] = statistics.get('total_frames_with_faces') + 1
 		for face in faces:
 			statistics['total_faces'] = statistics.get('total_faces') + 1
 			face_detector_scores.append(face.score_set.get('detector'))
@@ -45,7 +51,10 @@ def create_statistics(static_faces : FaceSet) -> Dict[str, Any]:
 
 def conditional_log_statistics() -> None:
 	if state_manager.get_item('log_level') == 'debug':
-		statistics = create_statistics(get_face_store().get('static_faces'))
+		statistics = create_statistics(get_static_face_set())
 
 		for name, value in statistics.items():
 			logger.debug(str(name) + ': ' + str(value), __name__)
+		for cache_name, cache_statistics in get_cache_statistics().items():
+			for name, value in cache_statistics.items():
+				logger.debug(cache_name + '_cache_' + name + ': ' + str(value), __name__)
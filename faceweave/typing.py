@@ -1,5 +1,9 @@
 from collections import namedtuple
-from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, TypedDict
+from concurrent.futures import Future
+from multiprocessing.shared_memory import SharedMemory
+from queue import Queue
+from threading import RLock, Semaphore, Thread
+from typing import Any, Callable, Dict, Hashable, List, Literal, Optional, Tuple, TypedDict
 
 import numpy
 from numpy.typing import NDArray
@@ -28,6 +32,8 @@ FaceScoreSet = TypedDict('FaceScoreSet',
 	'landmarker' : Score
 })
 Embedding = NDArray[numpy.float64]
+EmbeddingMatrix = NDArray[numpy.float64]
+FaceDistanceMatrix = NDArray[numpy.float64]
 Gender = Literal['female', 'male']
 Age = range
 Race = Literal['white', 'black', 'latino', 'asian', 'indian', 'arabic']
@@ -44,9 +50,18 @@ Face = namedtuple('Face',
 	'race'
 ])
 FaceSet = Dict[str, List[Face]]
+FaceAttribute = Literal['landmark', 'embedding', 'classification']
+TrackId = int
+FaceMatches = Dict[str, List[bool]]
+TrackIdentity = TypedDict('TrackIdentity',
+{
+	'face_distance' : float,
+	'face_matches' : FaceMatches,
+	'verify_count' : int,
+	'verify_analysis' : int
+})
 FaceStore = TypedDict('FaceStore',
 {
-	'static_faces' : FaceSet,
 	'reference_faces': FaceSet
 })
 
@@ -55,8 +70,21 @@ Mask = NDArray[Any]
 Points = NDArray[Any]
 Distance = NDArray[Any]
 Matrix = NDArray[Any]
+PastePatch = Tuple[VisionFrame, Mask, Matrix]
 Anchors = NDArray[Any]
 Translation = NDArray[Any]
+FaceAnalysis = TypedDict('FaceAnalysis',
+{
+	'vision_frame' : Optional[VisionFrame],
+	'frame_thumbnail' : VisionFrame,
+	'bounding_boxes' : List[BoundingBox],
+	'face_scores' : List[Score],
+	'face_landmarks_5' : List[FaceLandmark5],
+	'track_ids' : List[TrackId],
+	'face_indices' : List[int],
+	'face_attributes' : Dict[FaceAttribute, Dict[int, Any]],
+	'lock' : RLock
+})
 
 AudioBuffer = bytes
 Audio = NDArray[Any]
@@ -75,7 +103,33 @@ ProcessState = Literal['checking', 'processing', 'stopping', 'pending']
 QueuePayload = TypedDict('QueuePayload',
 {
 	'frame_number' : int,
-	'frame_path' : str
+	'frame_path' : Optional[str],
+	'vision_frame' : Optional[VisionFrame]
+})
+WorkerStatistics = TypedDict('WorkerStatistics',
+{
+	'frame_total' : int,
+	'busy_time' : float,
+	'utilization' : float
+})
+FrameRing = TypedDict('FrameRing',
+{
+	'shared_memory' : SharedMemory,
+	'slot_size' : int,
+	'free_slots' : Queue[int]
+})
+FrameSlot = TypedDict('FrameSlot',
+{
+	'frame_number' : int,
+	'slot_index' : int,
+	'shape' : Tuple[int, ...],
+	'overflow_name' : Optional[str]
+})
+FrameGroups = Dict[str, List[str]]
+CropCacheStatistics = TypedDict('CropCacheStatistics',
+{
+	'hits' : int,
+	'misses' : int
 })
 Args = Dict[str, Any]
 UpdateProgress = Callable[[int], None]
@@ -104,6 +158,7 @@ FaceSelectorOrder = Literal['left-right', 'right-left', 'top-bottom', 'bottom-to
 FaceMaskType = Literal['box', 'occlusion', 'region']
 FaceMaskRegion = Literal['skin', 'left-eyebrow', 'right-eyebrow', 'left-eye', 'right-eye', 'glasses', 'nose', 'mouth', 'upper-lip', 'lower-lip']
 TempFrameFormat = Literal['jpg', 'png', 'bmp']
+VideoProcessMode = Literal['disk', 'fused', 'stream']
 OutputAudioEncoder = Literal['aac', 'libmp3lame', 'libopus', 'libvorbis']
 OutputVideoEncoder = Literal['libx264', 'libx265', 'libvpx-vp9', 'h264_nvenc', 'hevc_nvenc', 'h264_amf', 'hevc_amf', 'h264_videotoolbox', 'hevc_videotoolbox']
 OutputVideoPreset = Literal['ultrafast', 'superfast', 'veryfast', 'faster', 'fast', 'medium', 'slow', 'slower', 'veryslow']
@@ -115,6 +170,30 @@ Download = TypedDict('Download',
 })
 DownloadSet = Dict[str, Download]
 
+SizeEstimator = Callable[[Any], int]
+CacheKey = Tuple[str, Hashable]
+CacheEntry = TypedDict('CacheEntry',
+{
+	'value' : Any,
+	'size' : int
+})
+Cache = TypedDict('Cache',
+{
+	'size_estimator' : SizeEstimator,
+	'size' : int,
+	'hits' : int,
+	'misses' : int,
+	'evictions' : int
+})
+CacheSet = Dict[str, Cache]
+CacheStatistics = TypedDict('CacheStatistics',
+{
+	'size' : int,
+	'hits' : int,
+	'misses' : int,
+	'evictions' : int
+})
+
 ModelOptions = Dict[str, Any]
 ModelSet = Dict[str, ModelOptions]
 ModelInitializer = NDArray[Any]
@@ -122,6 +201,8 @@ ModelInitializer = NDArray[Any]
 ExecutionProviderKey = Literal['cpu', 'coreml', 'cuda', 'directml', 'openvino', 'rocm', 'tensorrt']
 ExecutionProviderValue = Literal['CPUExecutionProvider', 'CoreMLExecutionProvider', 'CUDAExecutionProvider', 'DmlExecutionProvider', 'OpenVINOExecutionProvider', 'ROCMExecutionProvider', 'TensorrtExecutionProvider']
 ExecutionProviderSet = Dict[ExecutionProviderKey, ExecutionProviderValue]
+ExecutionConcurrencyPolicy = Literal['auto', 'replica', 'semaphore']
+ExecutionMode = Literal['thread', 'process']
 
 ValueAndUnit = TypedDict('ValueAndUnit',
 {
@@ -160,7 +241,29 @@ ExecutionDevice = TypedDict('ExecutionDevice',
 AppContext = Literal['cli', 'ui']
 
 InferencePool = Dict[str, InferenceSession]
+InferenceInputs = Dict[str, NDArray[Any]]
+InferenceOutputs = List[NDArray[Any]]
 InferencePoolSet = Dict[AppContext, Dict[str, InferencePool]]
+InferenceRequest = TypedDict('InferenceRequest',
+{
+	'input_feed' : InferenceInputs,
+	'future' : Future[InferenceOutputs]
+})
+InferenceBatcher = TypedDict('InferenceBatcher',
+{
+	'queue' : Queue[Optional[InferenceRequest]],
+	'thread' : Thread
+})
+InferenceBatcherSet = Dict[InferenceSession, InferenceBatcher]
+InferenceConcurrency = TypedDict('InferenceConcurrency',
+{
+	'policy' : ExecutionConcurrencyPolicy,
+	'semaphore' : Semaphore,
+	'session_queue' : Queue[InferenceSession],
+	'session_factory' : Callable[[], InferenceSession],
+	'batch_factory' : Callable[[], InferenceSession]
+})
+InferenceConcurrencySet = Dict[InferenceSession, InferenceConcurrency]
 
 UiWorkflow = Literal['instant_runner', 'job_runner', 'job_manager']
 
@@ -201,6 +304,8 @@ StateKey = Literal\
 	'face_detector_score',
 	'face_landmarker_model',
 	'face_landmarker_score',
+	'face_tracker_interval',
+	'face_tracker_verify_interval',
 	'face_selector_mode',
 	'face_selector_order',
 	'face_selector_gender',
@@ -214,10 +319,13 @@ StateKey = Literal\
 	'face_mask_blur',
 	'face_mask_padding',
 	'face_mask_regions',
+	'face_mask_interval',
 	'trim_frame_start',
 	'trim_frame_end',
 	'temp_frame_format',
 	'keep_temp',
+	'video_process_mode',
+	'duplicate_frame_threshold',
 	'output_image_quality',
 	'output_image_resolution',
 	'output_audio_encoder',
@@ -235,8 +343,14 @@ StateKey = Literal\
 	'execution_providers',
 	'execution_thread_count',
 	'execution_queue_count',
+	'execution_batch_size',
+	'execution_batch_timeout',
+	'execution_concurrency_policy',
+	'execution_mode',
 	'video_memory_strategy',
 	'system_memory_limit',
+	'cache_memory_limit',
+	'crop_cache_tolerance',
 	'skip_download',
 	'log_level',
 	'job_id',
@@ -257,6 +371,8 @@ State = TypedDict('State',
 	'face_detector_score' : Score,
 	'face_landmarker_model' : FaceLandmarkerModel,
 	'face_landmarker_score' : Score,
+	'face_tracker_interval' : int,
+	'face_tracker_verify_interval' : int,
 	'face_selector_mode' : FaceSelectorMode,
 	'face_selector_order' : FaceSelectorOrder,
 	'face_selector_race': Race,
@@ -270,10 +386,13 @@ State = TypedDict('State',
 	'face_mask_blur' : float,
 	'face_mask_padding' : Padding,
 	'face_mask_regions' : List[FaceMaskRegion],
+	'face_mask_interval' : int,
 	'trim_frame_start' : int,
 	'trim_frame_end' : int,
 	'temp_frame_format' : TempFrameFormat,
 	'keep_temp' : bool,
+	'video_process_mode' : VideoProcessMode,
+	'duplicate_frame_threshold' : int,
 	'output_image_quality' : int,
 	'output_image_resolution' : str,
 	'output_audio_encoder' : OutputAudioEncoder,
@@ -291,8 +410,14 @@ State = TypedDict('State',
 	'execution_providers': List[ExecutionProviderKey],
 	'execution_thread_count': int,
 	'execution_queue_count': int,
+	'execution_batch_size': int,
+	'execution_batch_timeout': int,
+	'execution_concurrency_policy': ExecutionConcurrencyPolicy,
+	'execution_mode': ExecutionMode,
 	'video_memory_strategy': VideoMemoryStrategy,
 	'system_memory_limit': int,
+	'cache_memory_limit': int,
+	'crop_cache_tolerance': int,
 	'skip_download': bool,
 	'log_level': LogLevel,
 	'job_id': str,
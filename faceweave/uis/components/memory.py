@@ -9,11 +9,13 @@ from faceweave.typing import VideoMemoryStrategy
 
 VIDEO_MEMORY_STRATEGY_DROPDOWN : Optional[gradio.Dropdown] = None
 SYSTEM_MEMORY_LIMIT_SLIDER : Optional[gradio.Slider] = None
+CACHE_MEMORY_LIMIT_SLIDER : Optional[gradio.Slider] = None
 
 
 def render() -> None:
 	global VIDEO_MEMORY_STRATEGY_DROPDOWN
 	global SYSTEM_MEMORY_LIMIT_SLIDER
+	global CACHE_MEMORY_LIMIT_SLIDER
 
 	VIDEO_MEMORY_STRATEGY_DROPDOWN = gradio.Dropdown(
 		label = wording.get('uis.video_memory_strategy_dropdown'),
@@ -27,11 +29,19 @@ def render() -> None:
 		maximum = faceweave.choices.system_memory_limit_range[-1],
 		value = state_manager.get_item('system_memory_limit')
 	)
+	CACHE_MEMORY_LIMIT_SLIDER = gradio.Slider(
+		label = wording.get('uis.cache_memory_limit_slider'),
+		step = calc_int_step(faceweave.choices.cache_memory_limit_range),
+		minimum = faceweave.choices.cache_memory_limit_range[0],
+		maximum = faceweave.choices.cache_memory_limit_range[-1],
+		value = state_manager.get_item('cache_memory_limit')
+	)
 
 
 def listen() -> None:
 	VIDEO_MEMORY_STRATEGY_DROPDOWN.change(update_video_memory_strategy, inputs = VIDEO_MEMORY_STRATEGY_DROPDOWN)
 	SYSTEM_MEMORY_LIMIT_SLIDER.release(update_system_memory_limit, inputs = SYSTEM_MEMORY_LIMIT_SLIDER)
+	CACHE_MEMORY_LIMIT_SLIDER.release(update_cache_memory_limit, inputs = CACHE_MEMORY_LIMIT_SLIDER)
 
 
 def update_video_memory_strategy(video_memory_strategy : VideoMemoryStrategy) -> None:
@@ -40,3 +50,7 @@ def update_video_memory_strategy(video_memory_strategy : VideoMemoryStrategy) ->
 
 def update_system_memory_limit(system_memory_limit : float) -> None:
 	state_manager.set_item('system_memory_limit', int(system_memory_limit))
+
+
+def update_cache_memory_limit(cache_memory_limit : float) -> None:
+	state_manager.set_item('cache_memory_limit', int(cache_memory_limit))
@@ -1,18 +1,20 @@
-from typing import Optional
+from typing import Optional, Tuple
 
 import gradio
 
 import faceweave.choices
 from faceweave import state_manager, wording
 from faceweave.filesystem import is_video
-from faceweave.typing import TempFrameFormat
+from faceweave.typing import TempFrameFormat, VideoProcessMode
 from faceweave.uis.core import get_ui_component
 
 TEMP_FRAME_FORMAT_DROPDOWN : Optional[gradio.Dropdown] = None
+VIDEO_PROCESS_MODE_DROPDOWN : Optional[gradio.Dropdown] = None
 
 
 def render() -> None:
 	global TEMP_FRAME_FORMAT_DROPDOWN
+	global VIDEO_PROCESS_MODE_DROPDOWN
 
 	TEMP_FRAME_FORMAT_DROPDOWN = gradio.Dropdown(
 		label = wording.get('uis.temp_frame_format_dropdown'),
@@ -20,23 +22,33 @@ def render() -> None:
 		value = state_manager.get_item('temp_frame_format'),
 		visible = is_video(state_manager.get_item('target_path'))
 	)
+	VIDEO_PROCESS_MODE_DROPDOWN = gradio.Dropdown(
+		label = wording.get('uis.video_process_mode_dropdown'),
+		choices = faceweave.choices.video_process_modes,
+		value = state_manager.get_item('video_process_mode'),
+		visible = is_video(state_manager.get_item('target_path'))
+	)
 
 
 def listen() -> None:
 	TEMP_FRAME_FORMAT_DROPDOWN.change(update_temp_frame_format, inputs = TEMP_FRAME_FORMAT_DROPDOWN)
+	VIDEO_PROCESS_MODE_DROPDOWN.change(update_video_process_mode, inputs = VIDEO_PROCESS_MODE_DROPDOWN)
 
 	target_video = get_ui_component('target_video')
 	if target_video:
 		for method in [ 'upload', 'change', 'clear' ]:
-			getattr(target_video, method)(remote_update, outputs = TEMP_FRAME_FORMAT_DROPDOWN)
+			getattr(target_video, method)(remote_update, outputs = [ TEMP_FRAME_FORMAT_DROPDOWN, VIDEO_PROCESS_MODE_DROPDOWN ])
 
 
-def remote_update() -> gradio.Dropdown:
+def remote_update() -> Tuple[gradio.Dropdown, gradio.Dropdown]:
 	if is_video(state_manager.get_item('target_path')):
-		return gradio.Dropdown(visible = True)
-	return gradio.Dropdown(visible = False)
+		return gradio.Dropdown(visible = True), gradio.Dropdown(visible = True)
+	return gradio.Dropdown(visible = False), gradio.Dropdown(visible = False)
 
 
 def update_temp_frame_format(temp_frame_format : TempFrameFormat) -> None:
 	state_manager.set_item('temp_frame_format', temp_frame_format)
 
+
+def update_video_process_mode(video_process_mode : VideoProcessMode) -> None:
+	state_manager.set_item('video_process_mode', video_process_mode)
@@ -8,6 +8,7 @@ import gradio
 from gradio.themes import Size
 
 from faceweave import logger, metadata, state_manager, wording
+from faceweave.app_context import scope_app_context
 from faceweave.exit_helper import hard_exit
 from faceweave.filesystem import resolve_relative_path
 from faceweave.uis import overrides
@@ -78,6 +79,7 @@ def register_ui_component(component_name : ComponentName, component: Component)
 	UI_COMPONENTS[component_name] = component
 
 
+@scope_app_context('ui')
 def launch() -> None:
 	ui_layouts_total = len(state_manager.get_item('ui_layouts'))
 	with gradio.Blocks(theme = get_theme(), css = get_css(), title = metadata.get('name') + ' ' + metadata.get('version'), fill_width = True) as ui:
@@ -92,11 +94,19 @@ def launch() -> None:
 					ui_layout_module.render()
 					ui_layout_module.listen()
 
+	scope_ui_functions(ui)
+
 	for ui_layout in state_manager.get_item('ui_layouts'):
 		ui_layout_module = load_ui_layout_module(ui_layout)
 		ui_layout_module.run(ui)
 
 
+def scope_ui_functions(ui : gradio.Blocks) -> None:
+	for block_function in ui.fns.values():
+		if block_function.fn:
+			block_function.fn = scope_app_context('ui')(block_function.fn)
+
+
 def get_theme() -> gradio.Theme:
 	return gradio.themes.Base(
 		primary_hue = gradio.themes.colors.red,
@@ -1,17 +1,17 @@
-from functools import lru_cache
 from typing import List, Optional, Tuple
 
 import cv2
 import numpy
 from cv2.typing import Size
 
+from faceweave.cache_manager import estimate_size, static_cache
 from faceweave.choices import image_template_sizes, video_template_sizes
 from faceweave.common_helper import is_windows
 from faceweave.filesystem import is_image, is_video, sanitize_path_for_windows
 from faceweave.typing import Fps, Orientation, Resolution, VisionFrame
 
 
-@lru_cache(maxsize = 128)
+@static_cache('static_image', estimate_size)
 def read_static_image(image_path : str) -> Optional[VisionFrame]:
 	return read_image(image_path)
 
@@ -99,6 +99,19 @@ def count_video_frame_total(video_path : str) -> int:
 	return 0
 
 
+def predict_video_frame_total(video_path : str, fps : Fps, trim_frame_start : Optional[int], trim_frame_end : Optional[int]) -> int:
+	if is_video(video_path):
+		video_fps = detect_video_fps(video_path)
+		video_frame_total = count_video_frame_total(video_path)
+		if isinstance(trim_frame_end, int):
+			video_frame_total = min(trim_frame_end, video_frame_total)
+		if isinstance(trim_frame_start, int):
+			video_frame_total = max(video_frame_total - trim_frame_start, 0)
+		if video_fps:
+			return int(video_frame_total * fps / video_fps)
+	return 0
+
+
 def detect_video_fps(video_path : str) -> Optional[float]:
 	if is_video(video_path):
 		if is_windows():
@@ -224,18 +237,29 @@ def create_tile_frames(vision_frame : VisionFrame, size : Size) -> Tuple[List[Vi
 
 
 def merge_tile_frames(tile_vision_frames : List[VisionFrame], temp_width : int, temp_height : int, pad_width : int, pad_height : int, size : Size) -> VisionFrame:
-	merge_vision_frame = numpy.zeros((pad_height, pad_width, 3)).astype(numpy.uint8)
-	tile_width = tile_vision_frames[0].shape[1] - 2 * size[2]
-	tiles_per_row = min(pad_width // tile_width, len(tile_vision_frames))
+	merge_vision_frame = numpy.zeros((pad_height, pad_width, 3), dtype = numpy.uint8)
+	tiles_per_row = calc_tiles_per_row(pad_width, size, len(tile_vision_frames))
 
 	for index, tile_vision_frame in enumerate(tile_vision_frames):
-		tile_vision_frame = tile_vision_frame[size[2]:-size[2], size[2]:-size[2]]
-		row_index = index // tiles_per_row
-		col_index = index % tiles_per_row
-		top = row_index * tile_vision_frame.shape[0]
-		bottom = top + tile_vision_frame.shape[0]
-		left = col_index * tile_vision_frame.shape[1]
-		right = left + tile_vision_frame.shape[1]
-		merge_vision_frame[top:bottom, left:right, :] = tile_vision_frame
-	merge_vision_frame = merge_vision_frame[size[1] : size[1] + temp_height, size[1]: size[1] + temp_width, :]
-	return merge_vision_frame
+		write_tile_frame(merge_vision_frame, tile_vision_frame, index, tiles_per_row, size)
+	return crop_merge_frame(merge_vision_frame, temp_width, temp_height, size)
+
+
+def calc_tiles_per_row(pad_width : int, size : Size, tile_total : int) -> int:
+	tile_width = size[0] - 2 * size[2]
+	return min(pad_width // tile_width, tile_total)
+
+
+def write_tile_frame(merge_vision_frame : VisionFrame, tile_vision_frame : VisionFrame, index : int, tiles_per_row : int, size : Size) -> None:
+	tile_vision_frame = tile_vision_frame[size[2]:-size[2], size[2]:-size[2]]
+	row_index = index // tiles_per_row
+	col_index = index % tiles_per_row
+	top = row_index * tile_vision_frame.shape[0]
+	bottom = top + tile_vision_frame.shape[0]
+	left = col_index * tile_vision_frame.shape[1]
+	right = left + tile_vision_frame.shape[1]
+	merge_vision_frame[top:bottom, left:right, :] = tile_vision_frame
+
+
+def crop_merge_frame(merge_vision_frame : VisionFrame, temp_width : int, temp_height : int, size : Size) -> VisionFrame:
+	return merge_vision_frame[size[1] : size[1] + temp_height, size[1]: size[1] + temp_width, :]
@@ -6,7 +6,6 @@ import scipy
 from faceweave import inference_manager
 from faceweave.download import conditional_download_hashes, conditional_download_sources
 from faceweave.filesystem import resolve_relative_path
-from faceweave.thread_helper import thread_semaphore
 from faceweave.typing import Audio, AudioChunk, InferencePool, ModelOptions, ModelSet
 
 MODEL_SET : ModelSet =\
@@ -82,11 +81,10 @@ def extract_voice(temp_audio_chunk : AudioChunk) -> AudioChunk:
 def forward(temp_audio_chunk : AudioChunk) -> AudioChunk:
 	voice_extractor = get_inference_pool().get('voice_extractor')
 
-	with thread_semaphore():
-		temp_audio_chunk = voice_extractor.run(None,
-		{
-			'input': temp_audio_chunk
-		})[0]
+	temp_audio_chunk = inference_manager.run_inference(voice_extractor,
+	{
+		'input': temp_audio_chunk
+	})[0]
 
 	return temp_audio_chunk
 
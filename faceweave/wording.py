@@ -23,11 +23,17 @@ WORDING : Dict[str, Any] =\
 	'merging_video': 'Merging video with a resolution of {resolution} and {fps} frames per second',
 	'merging_video_succeed': 'Merging video succeed',
 	'merging_video_failed': 'Merging video failed',
+	'streaming_video': 'Streaming video with a resolution of {resolution} and {fps} frames per second',
+	'streaming_video_succeed': 'Streaming video succeed',
+	'streaming_video_failed': 'Streaming video failed',
 	'skipping_audio': 'Skipping audio',
 	'restoring_audio_succeed': 'Restoring audio succeed',
 	'restoring_audio_skipped': 'Restoring audio skipped',
 	'clearing_temp': 'Clearing temporary resources',
 	'processing_stopped': 'Processing stopped',
+	'worker_utilization': 'Worker {worker_index} processed {frame_total} frames with a utilization of {utilization}',
+	'frame_enhancer_tile_size_picked': 'Picked a frame enhancer tile size of {tile_size} pixels',
+	'dynamic_batch_not_supported': 'Model {model_name} cannot run batches and falls back to one inference per request',
 	'processing_image_succeed': 'Processing to image succeed in {seconds} seconds',
 	'processing_image_failed': 'Processing to image failed',
 	'processing_video_succeed': 'Processing to video succeed in {seconds} seconds',
@@ -103,6 +109,8 @@ WORDING : Dict[str, Any] =\
 		'face_detector_score': 'filter the detected faces base on the confidence score',
 		'face_landmarker_model': 'choose the model responsible for detecting the face landmarks',
 		'face_landmarker_score': 'filter the detected face landmarks base on the confidence score',
+		'face_tracker_interval': 'specify the frame interval of the full face detection while tracking the faces in between',
+		'face_tracker_verify_interval': 'specify the frame interval of the reference face verification for the tracked faces',
 		# face selector
 		'face_selector_mode': 'use reference based tracking or simple matching',
 		'face_selector_order': 'specify the order of the detected faces',
@@ -118,11 +126,14 @@ WORDING : Dict[str, Any] =\
 		'face_mask_blur': 'specify the degree of blur applied the box mask',
 		'face_mask_padding': 'apply top, right, bottom and left padding to the box mask',
 		'face_mask_regions': 'choose the facial features used for the region mask (choices: {choices})',
+		'face_mask_interval': 'specify the frame interval of the occlusion and region mask inference while propagating the masks in between',
 		# frame extraction
 		'trim_frame_start': 'specify the the start frame of the target video',
 		'trim_frame_end': 'specify the the end frame of the target video',
 		'temp_frame_format': 'specify the temporary resources format',
 		'keep_temp': 'keep the temporary resources after processing',
+		'video_process_mode': 'choose between one disk pass per processor, one fused disk pass for all processors or streaming frames through memory',
+		'duplicate_frame_threshold': 'process consecutive frames that differ within the threshold only once and reuse the result',
 		# output creation
 		'output_image_quality': 'specify the image quality which translates to the compression factor',
 		'output_image_resolution': 'specify the image output resolution based on the target image',
@@ -164,6 +175,8 @@ WORDING : Dict[str, Any] =\
 		'frame_colorizer_size': 'specify the size of the frame provided to the frame colorizer',
 		'frame_enhancer_model': 'choose the model responsible for enhancing the frame',
 		'frame_enhancer_blend': 'blend the enhanced into the previous frame',
+		'frame_enhancer_batch_size': 'specify the amount of tiles the frame enhancer runs per inference',
+		'frame_enhancer_tile_size': 'choose whether the tile size comes from the model or is picked from the available memory and measured throughput',
 		'lip_syncer_model': 'choose the model responsible for syncing the lips',
 		# uis
 		'open_browser': 'open the browser once the program is ready',
@@ -174,9 +187,15 @@ WORDING : Dict[str, Any] =\
 		'execution_providers': 'accelerate the model inference using different providers (choices: {choices}, ...)',
 		'execution_thread_count': 'specify the amount of parallel threads while processing',
 		'execution_queue_count': 'specify the amount of frames each thread is processing',
+		'execution_batch_size': 'specify the maximum amount of inference requests merged into one batch, models with a fixed batch layout run one request at a time',
+		'execution_batch_timeout': 'specify the milliseconds to wait for further inference requests before running a batch',
+		'execution_concurrency_policy': 'choose whether parallel threads run a model through session replicas or a per model semaphore',
+		'execution_mode': 'choose whether the frame workers run as threads or as separate processes',
 		# memory
 		'video_memory_strategy': 'balance fast processing and low VRAM usage',
 		'system_memory_limit': 'limit the available RAM that can be used while processing',
+		'cache_memory_limit': 'limit the RAM that the static caches can share before evicting the least recently used entries',
+		'crop_cache_tolerance': 'reuse the model output of a face crop whose pixels changed within the tolerance',
 		# misc
 		'skip_download': 'omit downloads and remote lookups',
 		'log_level': 'adjust the message severity displayed in the terminal',
@@ -217,6 +236,7 @@ WORDING : Dict[str, Any] =\
 		'apply_button': 'APPLY',
 		'benchmark_cycles_slider': 'BENCHMARK CYCLES',
 		'benchmark_runs_checkbox_group': 'BENCHMARK RUNS',
+		'cache_memory_limit_slider': 'CACHE MEMORY LIMIT',
 		'clear_button': 'CLEAR',
 		'common_options_checkbox_group': 'OPTIONS',
 		'execution_providers_checkbox_group': 'EXECUTION PROVIDERS',
@@ -301,6 +321,7 @@ WORDING : Dict[str, Any] =\
 		'trim_frame_slider': 'TRIM FRAME',
 		'ui_workflow': 'UI WORKFLOW',
 		'video_memory_strategy_dropdown': 'VIDEO MEMORY STRATEGY',
+		'video_process_mode_dropdown': 'VIDEO PROCESS MODE',
 		'webcam_fps_slider': 'WEBCAM FPS',
 		'webcam_image': 'WEBCAM',
 		'webcam_mode_radio': 'WEBCAM MODE',
@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import timeit
+from typing import Callable, Iterator, List
+
+import pytest
+
+from faceweave import state_manager
+from faceweave.app_context import detect_app_context, scope_app_context, use_app_context
+from faceweave.typing import AppContext
+
+
+def test_detect_app_context() -> None:
+	assert detect_app_context() == 'cli'
+
+	with use_app_context('ui'):
+		assert detect_app_context() == 'ui'
+
+		with use_app_context('cli'):
+			assert detect_app_context() == 'cli'
+		assert detect_app_context() == 'ui'
+
+	assert detect_app_context() == 'cli'
+
+
+def test_detect_app_context_in_thread() -> None:
+	app_contexts : List[AppContext] = []
+
+	with use_app_context('ui'):
+		thread = threading.Thread(target = lambda: app_contexts.append(detect_app_context()))
+		thread.start()
+		thread.join()
+
+	assert app_contexts == [ 'cli' ]
+
+
+def test_scope_app_context() -> None:
+	@scope_app_context('ui')
+	def detect_function() -> AppContext:
+		return detect_app_context()
+
+	@scope_app_context('ui')
+	def detect_generator() -> Iterator[AppContext]:
+		yield detect_app_context()
+		yield detect_app_context()
+
+	assert detect_function() == 'ui'
+	assert list(detect_generator()) == [ 'ui', 'ui' ]
+	assert detect_app_context() == 'cli'
+
+
+def test_get_item_with_app_context() -> None:
+	state_manager.init_item('execution_thread_count', 4)
+
+	with use_app_context('ui'):
+		state_manager.set_item('execution_thread_count', 8)
+
+		assert state_manager.get_item('execution_thread_count') == 8
+
+	assert state_manager.get_item('execution_thread_count') == 4
+
+	with use_app_context('ui'):
+		thread = threading.Thread(target = lambda: state_manager.set_item('execution_thread_count', 16))
+		thread.start()
+		thread.join()
+
+		assert state_manager.get_item('execution_thread_count') == 8
+
+	assert state_manager.get_item('execution_thread_count') == 16
+
+
+def detect_app_context_by_stack() -> AppContext:
+	frame = sys._getframe(1)
+
+	while frame:
+		if os.path.join('faceweave', 'jobs') in frame.f_code.co_filename:
+			return 'cli'
+		if os.path.join('faceweave', 'uis') in frame.f_code.co_filename:
+			return 'ui'
+		frame = frame.f_back
+	return 'cli'
+
+
+def call_nested(function : Callable[[], AppContext], depth : int) -> AppContext:
+	if depth:
+		return call_nested(function, depth - 1)
+	return function()
+
+
+@pytest.mark.skip(reason = 'wall clock benchmark, run on demand')
+def test_detect_app_context_benchmark() -> None:
+	stack_time = min(timeit.repeat(lambda: call_nested(detect_app_context_by_stack, 20), number = 10000, repeat = 5))
+	context_time = min(timeit.repeat(lambda: call_nested(detect_app_context, 20), number = 10000, repeat = 5))
+
+	assert context_time < stack_time
@@ -0,0 +1,63 @@
+import numpy
+import pytest
+
+from faceweave import state_manager
+from faceweave.cache_manager import clear_cache, estimate_size, get_cache_item, get_cache_items, get_cache_statistics, register_cache, set_cache_item, static_cache
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	register_cache('test_frames', estimate_size)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	state_manager.init_item('cache_memory_limit', 0)
+	clear_cache('test_frames')
+
+
+def test_estimate_size() -> None:
+	assert estimate_size(numpy.zeros((2, 2, 3), dtype = numpy.uint8)) == 12
+	assert estimate_size([ numpy.zeros(8, dtype = numpy.float32) ]) > 32
+
+
+def test_get_and_set_cache_item() -> None:
+	assert get_cache_item('test_frames', 'frame') == (False, None)
+
+	set_cache_item('test_frames', 'frame', None)
+
+	assert get_cache_item('test_frames', 'frame') == (True, None)
+	assert 'frame' in get_cache_items('test_frames')
+
+
+def test_evict_cache_entries() -> None:
+	state_manager.init_item('cache_memory_limit', 1)
+	cache_statistics = get_cache_statistics().get('test_frames')
+	evictions = cache_statistics.get('evictions')
+
+	for index in range(3):
+		set_cache_item('test_frames', index, numpy.zeros((512, 1024, 1024), dtype = numpy.uint8))
+	get_cache_item('test_frames', 2)
+
+	assert list(get_cache_items('test_frames').keys()) == [ 1, 2 ]
+	assert get_cache_statistics().get('test_frames').get('evictions') == evictions + 1
+	assert get_cache_statistics().get('test_frames').get('size') == 1024 ** 3
+
+
+def test_static_cache() -> None:
+	calls = []
+
+	@static_cache('test_calls', estimate_size)
+	def calc_square(value : int) -> int:
+		calls.append(value)
+		return value * value
+
+	assert calc_square(2) == 4
+	assert calc_square(2) == 4
+	assert calls == [ 2 ]
+	assert get_cache_statistics().get('test_calls').get('hits') == 1
+
+	calc_square.cache_clear() #type:ignore[attr-defined]
+
+	assert calc_square(2) == 4
+	assert calls == [ 2, 2 ]
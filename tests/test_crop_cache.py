@@ -0,0 +1,53 @@
+import numpy
+import pytest
+
+from faceweave import state_manager
+from faceweave.cache_manager import clear_cache
+from faceweave.crop_cache import create_crop_key, get_crop_cache_hit_rate, get_crop_output, reset_crop_cache_statistics, set_crop_output
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('cache_memory_limit', 0)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_cache('crop_outputs')
+	reset_crop_cache_statistics()
+
+
+def test_create_crop_key() -> None:
+	face_landmark_5 = numpy.array([ [ 8.0, 20.0 ], [ 32.0, 20.0 ], [ 20.0, 32.0 ], [ 12.0, 40.0 ], [ 28.0, 40.0 ] ])
+	state_manager.init_item('crop_cache_tolerance', None)
+
+	assert create_crop_key([ 'face_enhancer' ], face_landmark_5) is None
+
+	state_manager.init_item('crop_cache_tolerance', 3)
+
+	assert create_crop_key([ 'face_enhancer' ], face_landmark_5) == create_crop_key([ 'face_enhancer' ], face_landmark_5 + 1)
+	assert create_crop_key([ 'face_enhancer' ], face_landmark_5) != create_crop_key([ 'face_enhancer' ], face_landmark_5 + 4)
+	assert create_crop_key([ 'face_enhancer' ], face_landmark_5) != create_crop_key([ 'age_modifier' ], face_landmark_5)
+
+	state_manager.init_item('crop_cache_tolerance', 0)
+
+	assert create_crop_key([ 'face_enhancer' ], face_landmark_5) == create_crop_key([ 'face_enhancer' ], face_landmark_5 + 1)
+
+
+def test_crop_output() -> None:
+	state_manager.init_item('crop_cache_tolerance', 3)
+	crop_vision_frame = numpy.full((64, 64, 3), 100, dtype = numpy.uint8)
+	crop_output_frame = numpy.full((64, 64, 3), 199.6, dtype = numpy.float64)
+
+	assert get_crop_output(('face_enhancer',), crop_vision_frame) is None
+
+	set_crop_output(('face_enhancer',), crop_vision_frame, crop_output_frame)
+
+	assert get_crop_output(('face_enhancer',), crop_vision_frame + 2).dtype == numpy.uint8
+	assert get_crop_output(('face_enhancer',), crop_vision_frame + 2).max() == 200
+	assert get_crop_output(('face_enhancer',), crop_vision_frame + 20) is None
+	assert get_crop_cache_hit_rate() == 0.5
+
+	reset_crop_cache_statistics()
+
+	assert get_crop_cache_hit_rate() == 0.0
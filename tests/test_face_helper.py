@@ -0,0 +1,76 @@
+import timeit
+from typing import Tuple
+
+import cv2
+import numpy
+import pytest
+
+from faceweave.face_helper import calc_paste_area, paste_back, paste_back_many, warp_face_by_face_landmark_5
+from faceweave.typing import Mask, Matrix, Resolution, VisionFrame
+
+
+def paste_back_full_frame(temp_vision_frame : VisionFrame, crop_vision_frame : VisionFrame, crop_mask : Mask, affine_matrix : Matrix) -> VisionFrame:
+	inverse_matrix = cv2.invertAffineTransform(affine_matrix)
+	temp_size = temp_vision_frame.shape[:2][::-1]
+	inverse_mask = cv2.warpAffine(crop_mask, inverse_matrix, temp_size).clip(0, 1)
+	inverse_vision_frame = cv2.warpAffine(crop_vision_frame, inverse_matrix, temp_size, borderMode = cv2.BORDER_REPLICATE)
+	paste_vision_frame = temp_vision_frame.copy()
+	paste_vision_frame[:, :, 0] = inverse_mask * inverse_vision_frame[:, :, 0] + (1 - inverse_mask) * temp_vision_frame[:, :, 0]
+	paste_vision_frame[:, :, 1] = inverse_mask * inverse_vision_frame[:, :, 1] + (1 - inverse_mask) * temp_vision_frame[:, :, 1]
+	paste_vision_frame[:, :, 2] = inverse_mask * inverse_vision_frame[:, :, 2] + (1 - inverse_mask) * temp_vision_frame[:, :, 2]
+	return paste_vision_frame
+
+
+def create_paste_input(resolution : Resolution) -> Tuple[VisionFrame, VisionFrame, Mask, Matrix]:
+	temp_vision_frame : VisionFrame = numpy.random.RandomState(0).randint(0, 255, (resolution[1], resolution[0], 3), dtype = numpy.uint8)
+	temp_vision_frame = cv2.GaussianBlur(temp_vision_frame, (0, 0), 4)
+	face_landmark_5 = numpy.array([ [ 900, 500 ], [ 1000, 500 ], [ 950, 560 ], [ 910, 610 ], [ 990, 610 ] ], dtype = numpy.float32)
+	crop_vision_frame, affine_matrix = warp_face_by_face_landmark_5(temp_vision_frame, face_landmark_5, 'arcface_128_v2', (256, 256))
+	crop_vision_frame = 255 - crop_vision_frame
+	crop_mask : Mask = numpy.zeros((256, 256), dtype = numpy.float32)
+	crop_mask[32:224, 32:224] = 1
+	crop_mask = cv2.GaussianBlur(crop_mask, (0, 0), 8)
+	return temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix
+
+
+def test_calc_paste_area() -> None:
+	inverse_matrix = numpy.array([ [ 0.5, 0, 100 ], [ 0, 0.5, 50 ] ], dtype = numpy.float32)
+
+	assert calc_paste_area(inverse_matrix, (256, 256), (1920, 1080)) == (99, 49, 229, 179)
+	assert calc_paste_area(inverse_matrix, (256, 256), (200, 100)) == (99, 49, 200, 100)
+
+
+@pytest.mark.parametrize('resolution', [ (1920, 1080), (3840, 2160) ])
+def test_paste_back(resolution : Resolution) -> None:
+	temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix = create_paste_input(resolution)
+	full_vision_frame = paste_back_full_frame(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
+	paste_vision_frame = paste_back(temp_vision_frame, crop_vision_frame, crop_mask, affine_matrix)
+
+	assert paste_vision_frame is temp_vision_frame
+	assert numpy.abs(paste_vision_frame.astype(int) - full_vision_frame.astype(int)).max() <= 2
+
+
+def test_paste_back_many() -> None:
+	temp_vision_frame = numpy.zeros((100, 100, 3), dtype = numpy.uint8)
+	affine_matrix = numpy.array([ [ 1, 0, -20 ], [ 0, 1, -20 ] ], dtype = numpy.float64)
+	crop_mask = numpy.ones((40, 40), dtype = numpy.float32)
+	paste_patches =\
+	[
+		(numpy.full((40, 40, 3), 10, dtype = numpy.uint8), crop_mask, affine_matrix),
+		(numpy.full((40, 40, 3), 20, dtype = numpy.uint8), crop_mask * 0.5, affine_matrix)
+	]
+	paste_vision_frame = paste_back_many(temp_vision_frame, paste_patches)
+
+	assert paste_vision_frame is temp_vision_frame
+	assert paste_vision_frame[40, 40].tolist() == [ 15, 15, 15 ]
+	assert paste_vision_frame[10, 10].tolist() == [ 0, 0, 0 ]
+
+
+@pytest.mark.skip(reason = 'wall clock benchmark, run on demand')
+@pytest.mark.parametrize('resolution', [ (1920, 1080), (3840, 2160) ])
+def test_paste_back_benchmark(resolution : Resolution) -> None:
+	paste_input = create_paste_input(resolution)
+	paste_time = min(timeit.repeat(lambda: paste_back(*paste_input), number = 2, repeat = 2))
+	full_time = min(timeit.repeat(lambda: paste_back_full_frame(*paste_input), number = 2, repeat = 2))
+
+	assert paste_time * 4 < full_time
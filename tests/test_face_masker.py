@@ -0,0 +1,91 @@
+import threading
+
+import numpy
+import pytest
+
+from faceweave import state_manager
+from faceweave.cache_manager import clear_cache, set_cache_item
+from faceweave.face_analyser import LazyFace
+from faceweave.face_masker import get_occlusion_mask, get_region_mask, propagate_face_mask
+from faceweave.typing import Face, FaceAnalysis, FaceLandmark68
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('face_mask_interval', 3)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_cache('face_masks')
+	clear_cache('track_face_masks')
+
+
+def create_face(face_landmark_68 : FaceLandmark68) -> Face:
+	face_landmark_5 = face_landmark_68[:5]
+	face_analysis : FaceAnalysis =\
+	{
+		'vision_frame': numpy.ones((64, 64, 3), dtype = numpy.uint8),
+		'frame_thumbnail': numpy.zeros((32, 32), dtype = numpy.float32),
+		'bounding_boxes': [ numpy.array([ 0, 0, 64, 64 ]) ],
+		'face_scores': [ 0.9 ],
+		'face_landmarks_5': [ face_landmark_5 ],
+		'track_ids': [ 7 ],
+		'face_indices': [ 0 ],
+		'face_attributes':
+		{
+			'landmark':
+			{
+				0: ({ '5': face_landmark_5, '5/68': face_landmark_5, '68': face_landmark_68, '68/5': face_landmark_68 }, { 'detector': 0.9, 'landmarker': 0.9 }, 0)
+			}
+		},
+		'lock': threading.RLock()
+	}
+	return LazyFace(face_analysis, 0)
+
+
+def test_get_face_mask() -> None:
+	target_face = create_face(numpy.random.RandomState(0).rand(68, 2).astype(numpy.float32) * 40 + 10)
+	crop_vision_frame = numpy.zeros((64, 64, 3), dtype = numpy.uint8)
+	crop_matrix = numpy.array([ [ 1, 0, 0 ], [ 0, 1, 0 ] ], dtype = numpy.float64)
+	crop_mask = numpy.zeros((64, 64), dtype = numpy.float32)
+	crop_mask[:, 32:] = 1
+	set_cache_item('face_masks', ('occlusion', target_face.landmark_set.get('5/68').tobytes()), (crop_mask, crop_matrix))
+
+	assert get_occlusion_mask(target_face, crop_vision_frame, crop_matrix) is crop_mask
+
+	affine_matrix = numpy.array([ [ 1, 0, -16 ], [ 0, 1, 0 ] ], dtype = numpy.float64)
+	occlusion_mask = get_occlusion_mask(target_face, crop_vision_frame, affine_matrix)
+
+	assert occlusion_mask[:, :16].max() == 0
+	assert occlusion_mask[:, 16:].min() == 1
+
+	set_cache_item('face_masks', ('region', 'skin', target_face.landmark_set.get('5/68').tobytes()), (crop_mask, crop_matrix))
+
+	assert get_region_mask(target_face, crop_vision_frame, crop_matrix, [ 'skin' ]) is crop_mask
+	assert get_region_mask(target_face, numpy.zeros((32, 32, 3), dtype = numpy.uint8), crop_matrix, [ 'skin' ]).shape == (32, 32)
+
+
+def test_propagate_face_mask() -> None:
+	face_landmark_68 = numpy.random.RandomState(0).rand(68, 2).astype(numpy.float32) * 40 + 10
+	crop_matrix = numpy.array([ [ 1, 0, 0 ], [ 0, 1, 0 ] ], dtype = numpy.float64)
+	crop_mask = numpy.zeros((64, 64), dtype = numpy.float32)
+	crop_mask[:, 32:] = 1
+	set_cache_item('track_face_masks', ('occlusion', 7), (crop_mask, face_landmark_68, 0, 0))
+	occlusion_mask = propagate_face_mask([ 'occlusion' ], create_face(face_landmark_68 + [ 4, 0 ]), (64, 64), crop_matrix)
+
+	assert occlusion_mask[:, :36].max() == 0
+	assert occlusion_mask[:, 36:].min() == 1
+	assert propagate_face_mask([ 'occlusion' ], create_face(face_landmark_68 - [ 4, 0 ]), (64, 64), crop_matrix)[:, 28:].min() == 1
+	assert propagate_face_mask([ 'occlusion' ], create_face(face_landmark_68 + [ 4, 0 ]), (64, 64), crop_matrix) is None
+
+	set_cache_item('track_face_masks', ('occlusion', 7), (crop_mask, face_landmark_68, 0, 0))
+
+	assert propagate_face_mask([ 'occlusion' ], create_face(face_landmark_68[::-1].copy()), (64, 64), crop_matrix) is None
+	assert propagate_face_mask([ 'region', 'skin' ], create_face(face_landmark_68), (64, 64), crop_matrix) is None
+
+	set_cache_item('track_face_masks', ('occlusion', 7), (crop_mask, face_landmark_68, 0, 0))
+	target_face = create_face(face_landmark_68 + [ 4, 0 ])
+
+	for _ in range(3):
+		assert propagate_face_mask([ 'occlusion' ], target_face, (64, 64), crop_matrix)[:, 36:].min() == 1
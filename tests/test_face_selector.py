@@ -0,0 +1,98 @@
+import threading
+from typing import List
+
+import numpy
+import pytest
+
+from faceweave import state_manager
+from faceweave.face_analyser import LazyFace
+from faceweave.face_selector import find_similar_faces
+from faceweave.face_store import clear_track_identities, get_track_identity
+from faceweave.typing import Embedding, Face, FaceAnalysis, TrackId
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('cache_memory_limit', 0)
+	state_manager.init_item('face_tracker_verify_interval', 30)
+
+
+def create_face_analysis(track_ids : List[TrackId]) -> FaceAnalysis:
+	return\
+	{
+		'vision_frame': None,
+		'frame_thumbnail': numpy.zeros((32, 32), dtype = numpy.float32),
+		'bounding_boxes': [ numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 50, 0, 60, 10 ]) ],
+		'face_scores': [ 0.9, 0.9 ],
+		'face_landmarks_5': [ numpy.zeros((5, 2)), numpy.zeros((5, 2)) ],
+		'track_ids': track_ids,
+		'face_indices': [ 0, 1 ],
+		'face_attributes': {},
+		'lock': threading.RLock()
+	}
+
+
+def create_reference_face(normed_embedding : Embedding) -> Face:
+	return Face(None, None, None, None, normed_embedding, normed_embedding, None, None, None)
+
+
+def test_find_similar_faces() -> None:
+	clear_track_identities()
+	reference_faces =\
+	{
+		'reference': [ create_reference_face(numpy.array([ 0.0, 1.0 ])) ]
+	}
+	face_analysis = create_face_analysis([ 3, 4 ])
+	face_analysis['face_attributes']['embedding'] =\
+	{
+		0: (numpy.array([ 1.0, 0.0 ]), numpy.array([ 1.0, 0.0 ])),
+		1: (numpy.array([ 0.0, 1.0 ]), numpy.array([ 0.0, 1.0 ]))
+	}
+	similar_faces = find_similar_faces([ LazyFace(face_analysis, 0), LazyFace(face_analysis, 1) ], reference_faces, 0.6)
+
+	assert [ similar_face.face_index for similar_face in similar_faces if isinstance(similar_face, LazyFace) ] == [ 1 ]
+	assert get_track_identity(3).get('face_matches') == { 'reference': [ False ] }
+
+	face_analysis = create_face_analysis([ 4, 3 ])
+	similar_faces = find_similar_faces([ LazyFace(face_analysis, 0), LazyFace(face_analysis, 1) ], reference_faces, 0.6)
+
+	assert [ similar_face.face_index for similar_face in similar_faces if isinstance(similar_face, LazyFace) ] == [ 0 ]
+	assert get_track_identity(4).get('verify_count') == 1
+
+	find_similar_faces([ LazyFace(face_analysis, 0), LazyFace(face_analysis, 1) ], reference_faces, 0.6)
+
+	assert get_track_identity(4).get('verify_count') == 1
+
+	state_manager.init_item('face_tracker_verify_interval', 1)
+	face_analysis = create_face_analysis([ 4, 3 ])
+	face_analysis['face_attributes']['embedding'] =\
+	{
+		0: (numpy.array([ 1.0, 0.0 ]), numpy.array([ 1.0, 0.0 ])),
+		1: (numpy.array([ 0.0, 1.0 ]), numpy.array([ 0.0, 1.0 ]))
+	}
+	similar_faces = find_similar_faces([ LazyFace(face_analysis, 0), LazyFace(face_analysis, 1) ], reference_faces, 0.6)
+
+	assert [ similar_face.face_index for similar_face in similar_faces if isinstance(similar_face, LazyFace) ] == [ 1 ]
+	assert get_track_identity(4).get('verify_count') == 0
+
+	state_manager.init_item('face_tracker_verify_interval', 30)
+
+
+def test_find_similar_faces_order() -> None:
+	clear_track_identities()
+	reference_faces =\
+	{
+		'empty': [],
+		'reference': [ create_reference_face(numpy.array([ 0.0, 1.0 ])), create_reference_face(numpy.array([ 1.0, 0.0 ])) ],
+		'other': [ create_reference_face(numpy.array([ 1.0, 0.0 ])) ]
+	}
+	face_analysis = create_face_analysis([ 5, 6 ])
+	face_analysis['face_attributes']['embedding'] =\
+	{
+		0: (numpy.array([ 1.0, 0.0 ]), numpy.array([ 1.0, 0.0 ])),
+		1: (numpy.array([ 0.0, 1.0 ]), numpy.array([ 0.0, 1.0 ]))
+	}
+	similar_faces = find_similar_faces([ LazyFace(face_analysis, 0), LazyFace(face_analysis, 1) ], reference_faces, 0.6)
+
+	assert [ similar_face.face_index for similar_face in similar_faces if isinstance(similar_face, LazyFace) ] == [ 1, 0 ]
+	assert get_track_identity(5).get('face_matches') == { 'empty': [], 'reference': [ False, True ], 'other': [ True ] }
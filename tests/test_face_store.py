@@ -0,0 +1,142 @@
+import pickle
+import threading
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from faceweave import state_manager
+from faceweave.face_analyser import LazyFace, get_face_detector_score, get_one_face, release_frame_faces, release_many_frame_faces
+from faceweave.face_selector import sort_by_order
+from faceweave.face_store import clear_static_faces, create_frame_key, estimate_faces_size, get_static_faces, remove_static_faces, set_static_faces
+from faceweave.typing import Face, FaceAnalysis
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('target_path', 'target.mp4')
+	state_manager.init_item('face_detector_model', 'yoloface')
+	state_manager.init_item('face_detector_size', '640x640')
+	state_manager.init_item('face_detector_angles', [ 0 ])
+	state_manager.init_item('face_detector_score', 0.5)
+	state_manager.init_item('face_landmarker_model', '2dfan4')
+	state_manager.init_item('face_landmarker_score', 0.5)
+	state_manager.init_item('face_tracker_interval', 1)
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_static_faces()
+
+
+def test_create_frame_key() -> None:
+	vision_frame = numpy.ones((240, 426, 3), dtype = numpy.uint8)
+	other_vision_frame = numpy.full((240, 426, 3), 2, dtype = numpy.uint8)
+
+	assert create_frame_key(vision_frame, 1) == create_frame_key(other_vision_frame, 1)
+	assert create_frame_key(vision_frame, 1) != create_frame_key(vision_frame, 2)
+	assert create_frame_key(vision_frame, 1) != create_frame_key(numpy.ones((480, 852, 3), dtype = numpy.uint8), 1)
+	assert create_frame_key(vision_frame, None) == create_frame_key(vision_frame.copy(), None)
+	assert create_frame_key(vision_frame, None) != create_frame_key(other_vision_frame, None)
+	assert create_frame_key(numpy.zeros((240, 426, 3), dtype = numpy.uint8), None) is None
+
+
+def test_static_faces() -> None:
+	vision_frame = numpy.ones((240, 426, 3), dtype = numpy.uint8)
+	set_static_faces(vision_frame, [], 1)
+
+	assert get_static_faces(vision_frame, 1) == []
+	assert get_static_faces(vision_frame, 2) is None
+	assert get_static_faces(vision_frame) is None
+
+	state_manager.init_item('face_detector_score', 0.7)
+
+	assert get_static_faces(vision_frame, 1) is None
+
+	state_manager.init_item('face_detector_score', 0.5)
+	remove_static_faces(vision_frame, 1)
+
+	assert get_static_faces(vision_frame, 1) is None
+
+
+def create_face_analysis() -> FaceAnalysis:
+	return\
+	{
+		'vision_frame': numpy.ones((240, 426, 3), dtype = numpy.uint8),
+		'frame_thumbnail': numpy.zeros((32, 32), dtype = numpy.float32),
+		'bounding_boxes': [ numpy.array([ 10, 20, 30, 40 ]), numpy.array([ 50, 60, 90, 100 ]) ],
+		'face_scores': [ 0.6, 0.9 ],
+		'face_landmarks_5': [ numpy.zeros((5, 2)), numpy.ones((5, 2)) ],
+		'track_ids': [ 0, 1 ],
+		'face_indices': [ 0, 1 ],
+		'face_attributes':
+		{
+			'landmark':
+			{
+				1: ({ '5': numpy.ones((5, 2)) }, { 'detector': 0.9, 'landmarker': 0.0 }, 0)
+			},
+			'embedding':
+			{
+				1: (numpy.ones(4), numpy.full(4, 0.5))
+			}
+		},
+		'lock': threading.RLock()
+	}
+
+
+def test_lazy_face() -> None:
+	face_analysis = create_face_analysis()
+	lazy_face = LazyFace(face_analysis, 1)
+
+	assert lazy_face.bounding_box.tolist() == [ 50, 60, 90, 100 ]
+	assert get_face_detector_score(LazyFace(face_analysis, 0)) == 0.6
+	assert 0 not in face_analysis.get('face_attributes').get('landmark')
+	assert estimate_faces_size([ lazy_face ]) > face_analysis.get('vision_frame').nbytes
+
+	face_analysis['face_attributes']['classification'] = { 1: ('female', range(20, 30), 'white') }
+	face = pickle.loads(pickle.dumps(lazy_face))
+
+	assert type(face) is Face
+	assert face.gender == 'female'
+	assert face.embedding.tolist() == [ 1 ] * 4
+	assert tuple(lazy_face)[7] == range(20, 30)
+	assert lazy_face._asdict().get('race') == 'white'
+	assert type(lazy_face._replace(angle = 90)) is Face
+	assert lazy_face._replace(angle = 90).angle == 90
+	assert lazy_face._replace(angle = 90).gender == 'female'
+
+
+def test_release_frame_faces() -> None:
+	vision_frame = numpy.ones((240, 426, 3), dtype = numpy.uint8)
+	face_analysis = create_face_analysis()
+	face_analysis['face_attributes']['landmark'][0] = ({ '5/68': numpy.zeros((5, 2)) }, { 'detector': 0.6, 'landmarker': 0.0 }, 0)
+	state_manager.init_item('face_tracker_interval', 3)
+	set_static_faces(vision_frame, [ LazyFace(face_analysis, 0), LazyFace(face_analysis, 1) ], 1)
+	set_static_faces(vision_frame, [], 2)
+	release_frame_faces(vision_frame, 1)
+
+	with patch('faceweave.face_analyser.calc_many_embeddings', return_value = [ (numpy.full(4, 2), numpy.full(4, 0.25)) ]) as calc_many_embeddings:
+		assert get_static_faces(vision_frame, 1)[0].embedding.tolist() == [ 2 ] * 4
+		assert calc_many_embeddings.call_args[0][0] is face_analysis.get('vision_frame')
+
+	release_frame_faces(vision_frame, 2)
+
+	assert get_static_faces(vision_frame, 1) is None
+	assert get_static_faces(vision_frame, 2) is None
+
+	state_manager.init_item('face_tracker_interval', 1)
+	set_static_faces(vision_frame, [], 4)
+	release_many_frame_faces(vision_frame, [ 4 ])
+
+	assert get_static_faces(vision_frame, 4) is None
+
+
+def test_plan_face_analysis() -> None:
+	face_analysis = create_face_analysis()
+	faces = sort_by_order([ LazyFace(face_analysis, 0), LazyFace(face_analysis, 1) ], 'best-worst')
+
+	assert get_one_face(faces) is faces[0]
+	assert faces[0].bounding_box.tolist() == [ 50, 60, 90, 100 ]
+	assert face_analysis.get('face_indices') == [ 1 ]
+	assert get_one_face(faces).normed_embedding.tolist() == [ 0.5 ] * 4
+	assert 0 not in face_analysis.get('face_attributes').get('landmark')
@@ -0,0 +1,91 @@
+import os
+import tempfile
+from typing import List
+from unittest.mock import patch
+
+import numpy
+import pytest
+from onnx import TensorProto, helper, save_model
+
+from faceweave import inference_manager, state_manager
+from faceweave.cache_manager import clear_cache
+from faceweave.processors.modules.face_swapper import forward_swap_faces, get_source_input
+from faceweave.typing import Face, VisionFrame
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('cache_memory_limit', 0)
+	state_manager.init_item('execution_batch_size', 1)
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_concurrency_policy', 'auto')
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	state_manager.init_item('face_swapper_model', 'inswapper_128')
+	state_manager.init_item('source_paths', [ 'source.jpg' ])
+	clear_cache('source_inputs')
+
+
+def create_source_face(value : float) -> Face:
+	return Face(
+		bounding_box = None,
+		score_set = None,
+		landmark_set = None,
+		angle = None,
+		embedding = numpy.full(512, value, dtype = numpy.float32),
+		normed_embedding = None,
+		gender = None,
+		age = None,
+		race = None
+	)
+
+
+def test_get_source_input() -> None:
+	prepare_calls : List[Face] = []
+
+	def prepare_source_input(source_face : Face) -> VisionFrame:
+		prepare_calls.append(source_face)
+		return source_face.embedding * len(prepare_calls)
+
+	source_face = create_source_face(1.0)
+
+	with patch('faceweave.processors.modules.face_swapper.prepare_source_input', side_effect = prepare_source_input):
+		assert get_source_input(source_face).max() == 1
+		assert get_source_input(source_face).max() == 1
+		assert len(prepare_calls) == 1
+
+		state_manager.init_item('source_paths', [ 'other_source.jpg' ])
+
+		assert get_source_input(source_face).max() == 2
+
+		state_manager.init_item('face_swapper_model', 'simswap_256')
+
+		assert get_source_input(source_face).max() == 3
+		assert get_source_input(create_source_face(2.0)).max() == 8
+		assert len(prepare_calls) == 4
+
+
+def test_forward_swap_faces() -> None:
+	model_path = os.path.join(tempfile.mkdtemp(), 'swapper.onnx')
+	model_source = helper.make_tensor_value_info('source', TensorProto.FLOAT, [ 1, 4 ])
+	model_target = helper.make_tensor_value_info('target', TensorProto.FLOAT, [ 1, 3, 2, 2 ])
+	model_output = helper.make_tensor_value_info('output', TensorProto.FLOAT, [ 1, 3, 2, 2 ])
+	model_graph = helper.make_graph([ helper.make_node('Neg', [ 'target' ], [ 'output' ]) ], 'swapper', [ model_source, model_target ], [ model_output ])
+	model = helper.make_model(model_graph, opset_imports = [ helper.make_opsetid('', 13) ])
+	model.ir_version = 8
+	save_model(model, model_path)
+	face_swapper = inference_manager.create_inference_session(model_path, '0', [ 'cpu' ])
+	crop_vision_frames = [ numpy.full((1, 3, 2, 2), tile_index, dtype = numpy.float32) for tile_index in range(4) ]
+
+	assert inference_manager.get_batch_session(face_swapper) is not face_swapper
+
+	with patch('faceweave.processors.modules.face_swapper.get_inference_pool', return_value = { 'face_swapper': face_swapper }), patch('faceweave.processors.modules.face_swapper.get_source_input', return_value = numpy.zeros((1, 4), dtype = numpy.float32)), patch('faceweave.inference_manager.run_session', wraps = inference_manager.run_session) as run_session:
+		swap_vision_frames = forward_swap_faces(create_source_face(1.0), crop_vision_frames)
+
+	assert [ swap_vision_frame.min() for swap_vision_frame in swap_vision_frames ] == [ 0, -1, -2, -3 ]
+	assert run_session.call_count == 1
+
+	inference_manager.clear_batch_session(face_swapper)
+	inference_manager.clear_inference_concurrency(face_swapper)
@@ -0,0 +1,141 @@
+from typing import List, Optional, Tuple
+from unittest.mock import patch
+
+import numpy
+import pytest
+
+from faceweave import state_manager
+from faceweave.face_analyser import LazyFace, create_face_analysis, create_faces, get_face_track_id, get_many_frame_faces
+from faceweave.face_store import clear_static_faces, get_track_identity, set_track_identity
+from faceweave.face_tracker import calc_bounding_box_iou, calc_face_landmark_distance, create_frame_thumbnail, has_untracked_change, is_keyframe, is_scene_cut, match_track_ids, track_bounding_box
+from faceweave.typing import BoundingBox, Face, FaceLandmark5, Score, VisionFrame
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('face_tracker_interval', 5)
+
+
+def test_is_keyframe() -> None:
+	assert is_keyframe(None) is True
+	assert is_keyframe(0) is True
+	assert is_keyframe(3) is False
+	assert is_keyframe(10) is True
+
+	state_manager.set_item('face_tracker_interval', 1)
+
+	assert is_keyframe(3) is True
+
+	state_manager.set_item('face_tracker_interval', 5)
+
+
+def test_is_scene_cut() -> None:
+	vision_frame = numpy.full((240, 426, 3), 100, dtype = numpy.uint8)
+
+	assert create_frame_thumbnail(vision_frame).shape == (32, 32)
+	assert is_scene_cut(create_frame_thumbnail(vision_frame), create_frame_thumbnail(vision_frame + 10)) is False
+	assert is_scene_cut(create_frame_thumbnail(vision_frame), create_frame_thumbnail(vision_frame + 100)) is True
+
+
+def test_has_untracked_change() -> None:
+	previous_vision_frame = numpy.zeros((240, 426, 3), dtype = numpy.uint8)
+	vision_frame = previous_vision_frame.copy()
+	vision_frame[100:140, 100:140] = 255
+	bounding_boxes = [ numpy.array([ 100, 100, 140, 140 ]) ]
+
+	assert has_untracked_change(create_frame_thumbnail(vision_frame), create_frame_thumbnail(previous_vision_frame), bounding_boxes, (426, 240)) is False
+
+	vision_frame[20:80, 300:360] = 255
+
+	assert has_untracked_change(create_frame_thumbnail(vision_frame), create_frame_thumbnail(previous_vision_frame), bounding_boxes, (426, 240)) is True
+	assert is_scene_cut(create_frame_thumbnail(vision_frame), create_frame_thumbnail(previous_vision_frame)) is False
+
+
+def test_track_bounding_box() -> None:
+	bounding_box = numpy.array([ 10, 20, 50, 80 ])
+	previous_face_landmark_68 = numpy.array([ [ 20, 40 ], [ 40, 40 ], [ 30, 70 ] ])
+
+	assert track_bounding_box(bounding_box, previous_face_landmark_68, previous_face_landmark_68 + [ 5, -5 ]).tolist() == [ 15, 15, 55, 75 ]
+	assert track_bounding_box(bounding_box, previous_face_landmark_68, (previous_face_landmark_68 - 30) * 2 + 30).tolist() == [ -10, 10, 70, 130 ]
+
+
+def test_match_track_ids() -> None:
+	previous_bounding_boxes = [ numpy.array([ 0, 0, 10, 10 ]), numpy.array([ 100, 100, 120, 120 ]) ]
+	previous_face_landmarks_5 = [ numpy.full((5, 2), 5), numpy.full((5, 2), 110) ]
+	bounding_boxes = [ numpy.array([ 101, 101, 121, 121 ]), numpy.array([ 300, 300, 310, 310 ]), numpy.array([ 1, 0, 11, 10 ]) ]
+	face_landmarks_5 = [ numpy.full((5, 2), 111), numpy.full((5, 2), 305), numpy.full((5, 2), 5) ]
+	track_ids = match_track_ids(bounding_boxes, face_landmarks_5, previous_bounding_boxes, previous_face_landmarks_5, [ 7, 9 ])
+
+	assert calc_bounding_box_iou(bounding_boxes[2], previous_bounding_boxes[0]) == pytest.approx(90 / 110)
+	assert calc_face_landmark_distance(face_landmarks_5[0], previous_face_landmarks_5[1], previous_bounding_boxes[1]) == pytest.approx(numpy.sqrt(2) / 20)
+	assert track_ids[0] == 9
+	assert track_ids[1] not in [ 7, 9 ]
+	assert track_ids[2] == 7
+
+	face_landmarks_5[0] = numpy.full((5, 2), 118)
+	track_ids = match_track_ids(bounding_boxes, face_landmarks_5, previous_bounding_boxes, previous_face_landmarks_5, [ 7, 9 ])
+
+	assert track_ids[0] not in [ 7, 9 ]
+	assert track_ids[2] == 7
+
+
+def test_create_faces() -> None:
+	state_manager.init_item('face_detector_model', 'yoloface')
+	state_manager.init_item('face_detector_angles', [ 0 ])
+	state_manager.init_item('face_detector_score', 0.5)
+	vision_frame = numpy.zeros((240, 426, 3), dtype = numpy.uint8)
+	previous_face_analysis = create_face_analysis(vision_frame, create_frame_thumbnail(vision_frame), [ numpy.array([ 100, 100, 140, 140 ]) ], [ 0.9 ], [ numpy.full((5, 2), 120.0) ], [ 11 ])
+	set_track_identity(11,
+	{
+		'face_distance': 0.6,
+		'face_matches': { 'reference': [ True ] },
+		'verify_count': 0,
+		'verify_analysis': id(previous_face_analysis)
+	})
+	faces = create_faces(vision_frame, [ numpy.array([ 102, 100, 142, 140 ]) ], [ 0.9 ], [ numpy.full((5, 2), 121.0) ], [ LazyFace(previous_face_analysis, 0) ])
+
+	assert get_face_track_id(faces[0]) == 11
+	assert get_track_identity(11)
+
+	faces = create_faces(vision_frame, [ numpy.array([ 102, 100, 142, 140 ]) ], [ 0.9 ], [ numpy.full((5, 2), 135.0) ], [ LazyFace(previous_face_analysis, 0) ])
+
+	assert get_face_track_id(faces[0]) != 11
+	assert get_track_identity(11) is None
+
+
+def test_get_many_frame_faces() -> None:
+	state_manager.init_item('target_path', 'target.mp4')
+	state_manager.init_item('face_detector_model', 'yoloface')
+	state_manager.init_item('face_detector_size', '640x640')
+	state_manager.init_item('face_detector_angles', [ 0 ])
+	state_manager.init_item('face_detector_score', 0.5)
+	state_manager.init_item('face_landmarker_model', '2dfan4')
+	state_manager.init_item('face_landmarker_score', 0.5)
+	clear_static_faces()
+	vision_frames = [ numpy.full((24, 24, 3), frame_number + 1, dtype = numpy.uint8) for frame_number in range(3) ]
+	detect_frames : List[int] = []
+	track_frames : List[int] = []
+
+	def detect_many_frame_faces(vision_frames : List[VisionFrame]) -> List[Tuple[List[BoundingBox], List[Score], List[FaceLandmark5]]]:
+		detect_frames.extend(int(vision_frame.max()) - 1 for vision_frame in vision_frames)
+		return [ ([], [], []) for _ in vision_frames ]
+
+	def track_faces(vision_frame : VisionFrame, previous_faces : List[Face]) -> Optional[List[Face]]:
+		track_frames.append(int(vision_frame.max()) - 1)
+		return None
+
+	with patch('faceweave.face_analyser.detect_many_frame_faces', side_effect = detect_many_frame_faces), patch('faceweave.face_analyser.track_faces', side_effect = track_faces):
+		assert get_many_frame_faces(vision_frames, [ 0, 1, 2 ]) == [ [], [], [] ]
+		assert detect_frames == [ 0, 1, 2 ]
+		assert track_frames == [ 1, 2 ]
+
+		clear_static_faces()
+		detect_frames.clear()
+		track_frames.clear()
+		state_manager.init_item('face_landmarker_score', 0)
+
+		assert get_many_frame_faces(vision_frames, [ 0, 1, 2 ]) == [ [], [], [] ]
+		assert detect_frames == [ 0, 1, 2 ]
+		assert track_frames == []
+
+	state_manager.init_item('face_landmarker_score', 0.5)
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+import numpy
+import pytest
+
+from faceweave import state_manager
+from faceweave.frame_deduplicator import count_duplicate_frames, group_duplicate_frames, is_duplicate_frame, reuse_duplicate_frames
+from faceweave.vision import read_image, write_image
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('processors', [ 'face_swapper' ])
+
+
+def test_group_duplicate_frames() -> None:
+	temp_directory_path = tempfile.mkdtemp()
+	temp_frame_paths = [ os.path.join(temp_directory_path, str(frame_number).zfill(8) + '.png') for frame_number in range(5) ]
+
+	for temp_frame_path, frame_value in zip(temp_frame_paths, [ 100, 101, 100, 180, 180 ]):
+		write_image(temp_frame_path, numpy.full((64, 64, 3), frame_value, dtype = numpy.uint8))
+
+	state_manager.init_item('duplicate_frame_threshold', None)
+
+	assert group_duplicate_frames(temp_frame_paths) == {}
+	assert count_duplicate_frames() == 0
+
+	state_manager.init_item('duplicate_frame_threshold', 2)
+
+	assert group_duplicate_frames(temp_frame_paths) ==\
+	{
+		temp_frame_paths[0]: [ temp_frame_paths[1], temp_frame_paths[2] ],
+		temp_frame_paths[3]: [ temp_frame_paths[4] ]
+	}
+	assert count_duplicate_frames() == 3
+	assert is_duplicate_frame(temp_frame_paths[0]) is False
+	assert is_duplicate_frame(temp_frame_paths[1]) is True
+
+	write_image(temp_frame_paths[0], numpy.zeros((64, 64, 3), dtype = numpy.uint8))
+	reuse_duplicate_frames()
+
+	assert numpy.array_equal(read_image(temp_frame_paths[2]), numpy.zeros((64, 64, 3), dtype = numpy.uint8))
+
+	state_manager.init_item('processors', [ 'face_swapper', 'lip_syncer' ])
+
+	assert group_duplicate_frames(temp_frame_paths) == {}
+	assert count_duplicate_frames() == 0
+
+	state_manager.init_item('processors', [ 'face_swapper' ])
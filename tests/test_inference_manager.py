@@ -0,0 +1,176 @@
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Queue
+from typing import Optional, Union
+
+import numpy
+import pytest
+from onnx import ModelProto, TensorProto, helper, save_model
+from onnxruntime import InferenceSession, SessionOptions
+
+from faceweave import state_manager
+from faceweave.inference_manager import INFERENCE_BATCHERS, INFERENCE_BATCH_SESSIONS, INFERENCE_CONCURRENCIES, clear_batch_session, clear_inference_concurrency, create_concurrency_semaphore, create_inference_session, has_dynamic_batch, resolve_dynamic_batch_session, run_batch, run_inference, stop_inference_batcher
+from faceweave.thread_helper import thread_semaphore
+from faceweave.typing import InferenceOutputs, InferenceRequest
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_batch_size', 1)
+	state_manager.init_item('execution_batch_timeout', 5)
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_queue_count', 1)
+	state_manager.init_item('execution_concurrency_policy', 'auto')
+
+
+def create_relu_model(batch_dimension : Union[int, str]) -> ModelProto:
+	model_input = helper.make_tensor_value_info('input', TensorProto.FLOAT, [ batch_dimension, 3 ])
+	model_output = helper.make_tensor_value_info('output', TensorProto.FLOAT, [ batch_dimension, 3 ])
+	model_graph = helper.make_graph([ helper.make_node('Relu', [ 'input' ], [ 'output' ]) ], 'relu', [ model_input ], [ model_output ])
+	model = helper.make_model(model_graph, opset_imports = [ helper.make_opsetid('', 13) ])
+	model.ir_version = 8
+	return model
+
+
+def create_relu_session(batch_dimension : Union[int, str]) -> InferenceSession:
+	return InferenceSession(create_relu_model(batch_dimension).SerializeToString(), providers = [ 'CPUExecutionProvider' ])
+
+
+def create_flatten_model() -> ModelProto:
+	model_input = helper.make_tensor_value_info('input', TensorProto.FLOAT, [ 1, 3 ])
+	model_output = helper.make_tensor_value_info('output', TensorProto.FLOAT, [ 1, 3 ])
+	model_shape = helper.make_tensor('shape', TensorProto.INT64, [ 2 ], [ 1, -1 ])
+	model_graph = helper.make_graph([ helper.make_node('Reshape', [ 'input', 'shape' ], [ 'output' ]) ], 'flatten', [ model_input ], [ model_output ], [ model_shape ])
+	model = helper.make_model(model_graph, opset_imports = [ helper.make_opsetid('', 13) ])
+	model.ir_version = 8
+	return model
+
+
+def test_has_dynamic_batch() -> None:
+	assert has_dynamic_batch(create_relu_session('batch')) is True
+	assert has_dynamic_batch(create_relu_session(1)) is False
+
+
+def test_resolve_dynamic_batch_session() -> None:
+	temp_directory_path = tempfile.mkdtemp()
+
+	for model_name, model, is_dynamic in [ ('relu', create_relu_model(1), True), ('flatten', create_flatten_model(), False) ]:
+		model_path = os.path.join(temp_directory_path, model_name + '.onnx')
+		save_model(model, model_path)
+		inference_session = InferenceSession(model_path, providers = [ 'CPUExecutionProvider' ])
+		resolve_model_path, resolve_session = resolve_dynamic_batch_session(model_path, inference_session, SessionOptions(), [ 'CPUExecutionProvider' ])
+
+		assert (resolve_model_path == os.path.join(temp_directory_path, model_name + '.dynamic.onnx')) is is_dynamic
+		assert has_dynamic_batch(resolve_session) is is_dynamic
+
+
+def test_run_batch() -> None:
+	batch_inputs =\
+	[
+		{
+			'input': numpy.array([ [ 1, -1, 2 ] ], dtype = numpy.float32)
+		},
+		{
+			'input': numpy.array([ [ -3, 4, 5 ] ], dtype = numpy.float32)
+		}
+	]
+
+	for inference_session in [ create_relu_session('batch'), create_relu_session(1) ]:
+		batch_outputs = run_batch(inference_session, batch_inputs)
+
+		assert len(batch_outputs) == 2
+		assert batch_outputs[0][0].tolist() == [ [ 1, 0, 2 ] ]
+		assert batch_outputs[1][0].tolist() == [ [ 0, 4, 5 ] ]
+
+
+def test_run_batch_with_fixed_batch() -> None:
+	temp_directory_path = tempfile.mkdtemp()
+	batch_inputs =\
+	[
+		{
+			'input': numpy.array([ [ 1, -1, 2 ] ], dtype = numpy.float32)
+		},
+		{
+			'input': numpy.array([ [ -3, 4, 5 ] ], dtype = numpy.float32)
+		}
+	]
+
+	for model_name, model, batch_outputs in [ ('relu', create_relu_model(1), [ [ [ 1, 0, 2 ] ], [ [ 0, 4, 5 ] ] ]), ('flatten', create_flatten_model(), [ [ [ 1, -1, 2 ] ], [ [ -3, 4, 5 ] ] ]) ]:
+		model_path = os.path.join(temp_directory_path, model_name + '.onnx')
+		save_model(model, model_path)
+		inference_session = create_inference_session(model_path, '0', [ 'cpu' ])
+
+		assert [ batch_output[0].tolist() for batch_output in run_batch(inference_session, batch_inputs) ] == batch_outputs
+		assert has_dynamic_batch(INFERENCE_BATCH_SESSIONS.get(inference_session)) is (model_name == 'relu')
+
+		clear_batch_session(inference_session)
+		clear_inference_concurrency(inference_session)
+
+		assert inference_session not in INFERENCE_BATCH_SESSIONS
+
+
+def test_run_inference_with_batcher() -> None:
+	inference_session = create_relu_session('batch')
+	state_manager.set_item('execution_batch_size', 4)
+
+	with ThreadPoolExecutor(max_workers = 4) as executor:
+		outputs = list(executor.map(lambda value: run_inference(inference_session, { 'input': numpy.full((1, 3), value, dtype = numpy.float32) }), range(-4, 4)))
+
+	assert inference_session in INFERENCE_BATCHERS
+	assert [ output[0].tolist() for output in outputs ] == [ [ [ max(value, 0) ] * 3 ] for value in range(-4, 4) ]
+
+	stop_inference_batcher(inference_session)
+	state_manager.set_item('execution_batch_size', 1)
+
+	assert inference_session not in INFERENCE_BATCHERS
+
+
+def test_stop_inference_batcher() -> None:
+	inference_session = create_relu_session('batch')
+	inference_queue : Queue[Optional[InferenceRequest]] = Queue()
+	inference_future : Future[InferenceOutputs] = Future()
+	inference_queue.put(
+	{
+		'input_feed': { 'input': numpy.zeros((1, 3), dtype = numpy.float32) },
+		'future': inference_future
+	})
+	INFERENCE_BATCHERS[inference_session] =\
+	{
+		'queue': inference_queue,
+		'thread': threading.Thread()
+	}
+	stop_inference_batcher(inference_session)
+
+	assert isinstance(inference_future.exception(timeout = 1), RuntimeError)
+	assert inference_queue.get_nowait() is None
+	assert inference_session not in INFERENCE_BATCHERS
+
+
+@pytest.mark.parametrize('execution_concurrency_policy', [ 'replica', 'semaphore' ])
+def test_run_inference_with_concurrency_policy(execution_concurrency_policy : str) -> None:
+	model_path = os.path.join(tempfile.mkdtemp(), 'relu.onnx')
+	save_model(create_relu_model(1), model_path)
+	state_manager.set_item('execution_concurrency_policy', execution_concurrency_policy)
+	inference_session = create_inference_session(model_path, '0', [ 'cpu' ])
+
+	with ThreadPoolExecutor(max_workers = 8) as executor:
+		outputs = list(executor.map(lambda value: run_inference(inference_session, { 'input': numpy.full((1, 3), value, dtype = numpy.float32) }), range(-8, 8)))
+
+	inference_concurrency = INFERENCE_CONCURRENCIES.get(inference_session)
+
+	assert inference_concurrency.get('policy') == execution_concurrency_policy
+	assert inference_concurrency.get('session_queue').qsize() <= 4
+	assert [ output[0].tolist() for output in outputs ] == [ [ [ max(value, 0) ] * 3 ] for value in range(-8, 8) ]
+
+	clear_inference_concurrency(inference_session)
+	state_manager.set_item('execution_concurrency_policy', 'auto')
+
+	assert inference_session not in INFERENCE_CONCURRENCIES
+
+
+def test_create_concurrency_semaphore() -> None:
+	assert create_concurrency_semaphore([ 'directml' ], 1) is thread_semaphore()
+	assert create_concurrency_semaphore([ 'rocm' ], 1) is create_concurrency_semaphore([ 'rocm' ], 1)
+	assert create_concurrency_semaphore([ 'cpu' ], 4) is not create_concurrency_semaphore([ 'cpu' ], 4)
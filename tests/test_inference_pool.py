@@ -12,6 +12,8 @@ def before_all() -> None:
 	content_analyser.pre_check()
 	state_manager.init_item('execution_device_id', 0)
 	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_concurrency_policy', 'auto')
 
 
 def test_get_inference_pool() -> None:
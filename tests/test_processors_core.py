@@ -0,0 +1,114 @@
+import os
+import tempfile
+from time import sleep
+from typing import List
+
+import numpy
+import pytest
+
+from faceweave import process_manager, state_manager
+from faceweave.processors.core import calc_queue_grain, get_frame_executor, get_worker_statistics, multi_process_frames
+from faceweave.processors.process_pool import PROCESS_POOLS, WORKER_SHARED_MEMORIES, clear_process_pools, create_frame_ring, destroy_frame_ring, get_process_pool, process_ring_payloads, read_frame_ring, write_frame_ring
+from faceweave.typing import QueuePayload, UpdateProgress
+from faceweave.vision import read_image, write_image
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('execution_thread_count', 4)
+	state_manager.init_item('execution_queue_count', 1)
+	state_manager.init_item('log_level', 'error')
+
+
+def test_calc_queue_grain() -> None:
+	assert calc_queue_grain(1000) == 62
+	assert calc_queue_grain(10) == 1
+	assert calc_queue_grain(0) == 1
+
+
+def test_multi_process_frames() -> None:
+	frame_numbers : List[int] = []
+
+	def process_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+		for queue_payload in queue_payloads:
+			if queue_payload.get('frame_number') < 10:
+				sleep(0.01)
+			frame_numbers.append(queue_payload.get('frame_number'))
+			update_progress(1)
+
+	process_manager.start()
+	multi_process_frames([], [ str(frame_number).zfill(4) + '.bmp' for frame_number in range(200) ], process_frames)
+	process_manager.end()
+
+	assert sorted(frame_numbers) == list(range(200))
+	assert len(get_worker_statistics()) == 4
+	assert sum(worker_statistics.get('frame_total') for worker_statistics in get_worker_statistics()) == 200
+	assert get_frame_executor(4) is get_frame_executor(4)
+
+
+def upscale_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload in queue_payloads:
+		queue_payload['vision_frame'] = numpy.repeat(queue_payload.get('vision_frame') + 1, queue_payload.get('frame_number') + 1, axis = 0)
+
+
+def test_process_ring_payloads() -> None:
+	frame_ring = create_frame_ring(4 * 4 * 3, 4)
+	queue_payloads : List[QueuePayload] =\
+	[
+		{
+			'frame_number': frame_number,
+			'frame_path': None,
+			'vision_frame': numpy.full((4, 4, 3), frame_number, dtype = numpy.uint8)
+		} for frame_number in range(2)
+	]
+	frame_slots = process_ring_payloads(upscale_frames, [], frame_ring.get('shared_memory').name, frame_ring.get('slot_size'), [ write_frame_ring(frame_ring, queue_payload) for queue_payload in queue_payloads ])
+
+	assert frame_ring.get('free_slots').qsize() == 2
+	assert frame_slots[0].get('overflow_name') is None
+	assert frame_slots[1].get('overflow_name')
+
+	queue_payloads = read_frame_ring(frame_ring, frame_slots)
+	WORKER_SHARED_MEMORIES.pop(frame_ring.get('shared_memory').name).close()
+	destroy_frame_ring(frame_ring)
+
+	assert frame_ring.get('free_slots').qsize() == 4
+	assert queue_payloads[0].get('vision_frame').tolist() == numpy.full((4, 4, 3), 1).tolist()
+	assert queue_payloads[1].get('vision_frame').tolist() == numpy.full((8, 4, 3), 2).tolist()
+
+
+def invert_frames(source_paths : List[str], queue_payloads : List[QueuePayload], update_progress : UpdateProgress) -> None:
+	for queue_payload in queue_payloads:
+		write_image(queue_payload.get('frame_path'), 255 - read_image(queue_payload.get('frame_path')))
+
+
+def test_multi_process_frames_with_process_pool() -> None:
+	temp_directory_path = tempfile.mkdtemp()
+	temp_frame_paths = [ os.path.join(temp_directory_path, str(frame_number).zfill(4) + '.png') for frame_number in range(8) ]
+
+	for frame_number, temp_frame_path in enumerate(temp_frame_paths):
+		write_image(temp_frame_path, numpy.full((4, 4, 3), frame_number, dtype = numpy.uint8))
+
+	state_manager.init_item('execution_mode', 'process')
+	state_manager.init_item('execution_thread_count', 2)
+	state_manager.init_item('processors', [])
+	state_manager.init_item('source_paths', [])
+	process_manager.start()
+	multi_process_frames([], temp_frame_paths, invert_frames)
+	process_pool = get_process_pool()
+
+	assert [ read_image(temp_frame_path).max() for temp_frame_path in temp_frame_paths ] == [ 255 - frame_number for frame_number in range(8) ]
+	assert 0 < len(get_worker_statistics()) <= 2
+	assert sum(worker_statistics.get('frame_total') for worker_statistics in get_worker_statistics()) == 8
+
+	multi_process_frames([], temp_frame_paths, invert_frames)
+	process_manager.end()
+
+	assert get_process_pool() is process_pool
+	assert [ read_image(temp_frame_path).max() for temp_frame_path in temp_frame_paths ] == list(range(8))
+
+	clear_process_pools()
+	state_manager.init_item('execution_mode', 'thread')
+	state_manager.init_item('execution_thread_count', 4)
+
+	assert PROCESS_POOLS == {}
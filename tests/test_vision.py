@@ -1,9 +1,10 @@
 import subprocess
 
+import numpy
 import pytest
 
 from faceweave.download import conditional_download
-from faceweave.vision import count_video_frame_total, create_image_resolutions, create_video_resolutions, detect_image_resolution, detect_video_fps, detect_video_resolution, get_video_frame, normalize_resolution, pack_resolution, restrict_image_resolution, restrict_video_fps, restrict_video_resolution, unpack_resolution
+from faceweave.vision import calc_tiles_per_row, count_video_frame_total, create_image_resolutions, create_tile_frames, create_video_resolutions, crop_merge_frame, detect_image_resolution, detect_video_fps, detect_video_resolution, get_video_frame, normalize_resolution, pack_resolution, predict_video_frame_total, restrict_image_resolution, restrict_video_fps, restrict_video_resolution, unpack_resolution, write_tile_frame
 from .helper import get_test_example_file, get_test_examples_directory
 
 
@@ -60,6 +61,15 @@ def test_count_video_frame_total() -> None:
 	assert count_video_frame_total('invalid') == 0
 
 
+def test_predict_video_frame_total() -> None:
+	assert predict_video_frame_total(get_test_example_file('target-240p-25fps.mp4'), 30.0, None, None) == 324
+	assert predict_video_frame_total(get_test_example_file('target-240p-30fps.mp4'), 30.0, None, None) == 324
+	assert predict_video_frame_total(get_test_example_file('target-240p-60fps.mp4'), 30.0, None, None) == 324
+	assert predict_video_frame_total(get_test_example_file('target-240p-25fps.mp4'), 30.0, 224, None) == 55
+	assert predict_video_frame_total(get_test_example_file('target-240p-60fps.mp4'), 30.0, 124, 224) == 50
+	assert predict_video_frame_total('invalid', 30.0, None, None) == 0
+
+
 def test_detect_video_fps() -> None:
 	assert detect_video_fps(get_test_example_file('target-240p-25fps.mp4')) == 25.0
 	assert detect_video_fps(get_test_example_file('target-240p-30fps.mp4')) == 30.0
@@ -109,3 +119,15 @@ def test_pack_resolution() -> None:
 def test_unpack_resolution() -> None:
 	assert unpack_resolution('0x0') == (0, 0)
 	assert unpack_resolution('2x2') == (2, 2)
+
+
+def test_merge_tile_frames() -> None:
+	vision_frame = numpy.random.RandomState(0).randint(0, 255, (300, 500, 3), dtype = numpy.uint8)
+	tile_vision_frames, pad_width, pad_height = create_tile_frames(vision_frame, (128, 8, 4))
+	tiles_per_row = calc_tiles_per_row(pad_width, (128, 8, 4), len(tile_vision_frames))
+	merge_vision_frame = numpy.empty((pad_height, pad_width, 3), dtype = numpy.uint8)
+
+	for index, tile_vision_frame in enumerate(tile_vision_frames):
+		write_tile_frame(merge_vision_frame, tile_vision_frame, index, tiles_per_row, (128, 8, 4))
+
+	assert numpy.array_equal(crop_merge_frame(merge_vision_frame, 500, 300, (128, 8, 4)), vision_frame)